@@ -3,9 +3,8 @@
 import streamlit as st
 from utils.sessao import inicializar_app
 
-inicializar_app()
-
 st.set_page_config(page_title="Sistema de Análise Vendas", layout="wide")
+inicializar_app()
 
 st.title("📦 Sistema de Análise Vendas")
 
@@ -0,0 +1,155 @@
+"""
+Compara o agrupamento de notas (`construir_df_vendas_agrupado`, sobre o df_vendas
+compacto) com o groupby original, sobre os mesmos itens no formato em que a versão
+original os carregava (`itens_como_original`). Vale o menor tempo de `--repeticoes`
+execuções, e os resultados são conferidos valor a valor. `--embaralhar` tira os itens da
+ordem de controle.
+
+    python -m benchmarks.agrupamento_notas --linhas 10000000 [--embaralhar]
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils.agregacao import construir_df_vendas_agrupado
+from utils.calendario import COLUNAS_ROTULOS, anexar_calendario
+from utils.constantes import DIAS_SEMANA_PT
+
+def itens_como_original(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Itens de `gerar_itens` no formato em que a versão original carregava df_vendas: 'Data'
+    como datetime e os rótulos de período como texto, uma coluna por rótulo em cada linha.
+    """
+    df = df.drop(columns="ChaveData").assign(
+        Bairro=df["Bairro"].astype(object),
+        Data=pd.to_datetime(df["ChaveData"], unit="D"),
+    )
+    # Mesmas expressões do carregamento original
+    df["Ano"] = df["Data"].dt.year
+    df["Semestre"] = df["Data"].dt.month.apply(lambda m: "S1" if m <= 6 else "S2")
+    df["Trimestre"] = df["Data"].dt.to_period("Q").astype(str)
+    df["MesPeriodo"] = df["Data"].dt.to_period("M").astype(str)
+    df["SemanaInicioDt"] = df["Data"].dt.to_period("W").astype(str)
+    df["Dia"] = df["Data"].dt.strftime("%Y-%m-%d")
+    df["DiaSemana"] = df["Data"].dt.day_name().map(DIAS_SEMANA_PT)
+    return df
+
+def agrupar_como_original(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrupamento original de df_vendas_agrupado, sobre `itens_como_original`."""
+    df_vendas_agrupado = (
+        df.groupby("Controle", as_index=False)
+          .agg({
+              "Cliente": "first",
+              "TotalItem": "sum",
+              "Data": "first",
+              "ProCod": "count",
+              "Controle": "first",
+              "Ano": "first",
+              "Semestre": "first",
+              "Trimestre": "first",
+              "MesPeriodo": "first",
+              "SemanaInicioDt": "first",
+              "Dia": "first",
+              "DiaSemana": "first",
+              "Bairro": "first",
+          })
+          .rename(columns={
+              "TotalItem": "TotalVenda",
+              "ProCod": "QuantidadeItens"
+          })
+    )
+
+    df_vendas_agrupado["Ano"] = df_vendas_agrupado["Data"].dt.year
+    df_vendas_agrupado["MesPeriodo"] = df_vendas_agrupado["Data"].dt.to_period("M").astype(str)
+    df_vendas_agrupado["DiaSemana"] = df_vendas_agrupado["Data"].dt.day_name().map(DIAS_SEMANA_PT)
+    return df_vendas_agrupado
+
+def agrupar_com_groupby(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Referência de resultado sobre o df_vendas compacto: groupby por controle com uma
+    redução "first" por atributo e os rótulos do calendário.
+    """
+    df_vendas_agrupado = (
+        df.groupby("Controle", as_index=False)
+          .agg({
+              "Cliente": "first",
+              "TotalItem": "sum",
+              "ChaveData": "first",
+              "ProCod": "count",
+              "Controle": "first",
+              "Bairro": "first",
+          })
+          .rename(columns={
+              "TotalItem": "TotalVenda",
+              "ProCod": "QuantidadeItens"
+          })
+    )
+    return anexar_calendario(df_vendas_agrupado, ["Data"] + COLUNAS_ROTULOS)
+
+def gerar_itens(linhas: int, itens_por_nota: float = 4.0, semente: int = 0) -> pd.DataFrame:
+    """Gera itens de venda sintéticos já no esquema compacto de df_vendas."""
+    rng = np.random.default_rng(semente)
+    notas = max(1, int(linhas / itens_por_nota))
+    controle = np.sort(rng.integers(1, notas + 1, linhas)).astype(np.int32)
+
+    cliente_nota = rng.integers(1, max(2, notas // 20), notas + 1).astype(np.int32)
+    cliente_nota[rng.random(notas + 1) < 0.3] = 99999
+    chave_nota = (19000 + rng.integers(0, 3 * 365, notas + 1)).astype(np.int32)
+    bairros = pd.Categorical.from_codes(rng.integers(0, 80, notas + 1), [f"Bairro {i}" for i in range(80)])
+
+    return pd.DataFrame({
+        "Controle": controle,
+        "Cliente": cliente_nota[controle],
+        "ProCod": rng.integers(1, 20000, linhas).astype(np.int32),
+        "Quantidade": rng.integers(1, 6, linhas).astype(np.float64),
+        "TotalItem": rng.random(linhas).round(2) * 50,
+        "Bairro": bairros.take(controle),
+        "ChaveData": chave_nota[controle],
+    })
+
+def medir(funcao, df: pd.DataFrame, repeticoes: int) -> tuple:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+def comparar_com_original(obtido: pd.DataFrame, original: pd.DataFrame) -> None:
+    """Mesmos valores nas colunas do original; rótulos comparados como texto."""
+    numericas = ["Cliente", "TotalVenda", "QuantidadeItens", "Controle"]
+    pd.testing.assert_frame_equal(
+        obtido[numericas], original[numericas], check_dtype=False, check_exact=False
+    )
+    assert (obtido["Data"].to_numpy() == original["Data"].to_numpy()).all()
+    for coluna in ["Bairro", "Ano"] + [c for c in COLUNAS_ROTULOS if c != "Ano"]:
+        assert obtido[coluna].astype(str).tolist() == original[coluna].astype(str).tolist(), coluna
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara o agrupamento de notas com o groupby original.")
+    parser.add_argument("--linhas", type=int, default=10_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--embaralhar", action="store_true", help="Itens fora da ordem de controle")
+    args = parser.parse_args()
+
+    df = gerar_itens(args.linhas)
+    if args.embaralhar:
+        df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    original = itens_como_original(df)
+    print(f"Itens: {len(df):,} | Notas: {df['Controle'].nunique():,}")
+    print(
+        f"df_vendas: {original.memory_usage(deep=True).sum() / 1024 ** 2:,.0f} MB no original, "
+        f"{df.memory_usage(deep=True).sum() / 1024 ** 2:,.0f} MB compacto"
+    )
+
+    tempo_anterior, esperado = medir(agrupar_como_original, original, args.repeticoes)
+    tempo_novo, obtido = medir(construir_df_vendas_agrupado, df, args.repeticoes)
+
+    comparar_com_original(obtido, esperado)
+    print(f"groupby original:   {tempo_anterior:8.3f} s")
+    print(f"cabeçalho de notas: {tempo_novo:8.3f} s")
+    print(f"aceleração:         {tempo_anterior / tempo_novo:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Tempo e pico de memória de cada etapa das páginas, sem Streamlit.
+
+Cada etapa roda `--repeticoes` vezes e vale o menor tempo. O pico de memória vem de uma
+execução à parte com tracemalloc (que também acompanha os buffers do NumPy), fora da
+medição de tempo. Sem `--frio`, a leitura das vendas usa o cache colunar, gravado antes
+da medição se não existir; com `--frio`, ele é apagado antes de cada leitura. O relatório
+JSON (`--saida`) pode ser comparado com um anterior (`--comparar`), etapa a etapa.
+
+    python -m benchmarks.etapas --gerar 10000000 --saida relatorio.json
+    python -m benchmarks.etapas --vendas dados/sintetico/NotasFW_ProdInfo.csv \\
+        --cadastro dados/sintetico/prodMercado.csv --frio --comparar relatorio.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import utils.analise as analise
+from benchmarks.gerador import gerar_cadastro, gerar_vendas
+from utils.agregacao import (
+    construir_df_vendas_agrupado,
+    montar_cubo_produto_dia,
+    montar_grao_dia_cliente,
+    montar_indice_produtos,
+)
+from utils.cache_colunar import diretorio_cache
+from utils.leitura import ler_df_cadastro, ler_df_vendas
+
+VERSAO_RELATORIO = 1
+
+def _linhas(resultado: Any) -> Optional[int]:
+    if isinstance(resultado, pd.DataFrame):
+        return len(resultado)
+    if isinstance(resultado, tuple):
+        return sum(len(r) for r in resultado if isinstance(r, pd.DataFrame))
+    return None
+
+def medir_etapa(
+    nome: str,
+    funcao: Callable[[], Any],
+    repeticoes: int,
+    antes: Optional[Callable[[], None]] = None,
+    medir_memoria: bool = True
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Executa `funcao` `repeticoes` vezes medindo o tempo e, com `medir_memoria`, uma vez a mais
+    medindo o pico de memória alocada (tracemalloc, que também acompanha os buffers do NumPy).
+    A execução com tracemalloc é mais lenta e fica fora da medição de tempo.
+
+    `antes` roda antes de cada execução, fora da medição (ex.: apagar o cache em disco).
+    Retorna a medição e o resultado da última execução.
+    """
+    pico_mb = None
+    if medir_memoria:
+        if antes is not None:
+            antes()
+        tracemalloc.start()
+        funcao()
+        pico_mb = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 1)
+        tracemalloc.stop()
+
+    tempos: List[float] = []
+    resultado = None
+    for _ in range(repeticoes):
+        if antes is not None:
+            antes()
+        resultado = None
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    etapa = {
+        "etapa": nome,
+        "segundos": min(tempos),
+        "segundos_execucoes": tempos,
+        "pico_memoria_mb": pico_mb,
+        "linhas_saida": _linhas(resultado),
+    }
+    memoria = f"{pico_mb:9.1f} MB" if pico_mb is not None else ""
+    print(f"⏱️ {nome:<34} {etapa['segundos']:8.3f} s  {memoria}")
+    return etapa, resultado
+
+def executar(
+    caminho_vendas: str,
+    caminho_cadastro: str,
+    repeticoes: int = 3,
+    frio: bool = False,
+    periodo: str = "Mês",
+    medir_memoria: bool = True
+) -> Dict[str, Any]:
+    """
+    Mede as etapas das páginas na mesma ordem em que são usadas, sem Streamlit.
+
+    Com `frio`, o cache colunar do arquivo de vendas é apagado antes de cada leitura,
+    medindo o CSV; sem ele, a leitura mede o cache colunar (gravado se não existir).
+    """
+    if not frio and not os.path.exists(diretorio_cache(caminho_vendas)):
+        ler_df_vendas(caminho_vendas)
+
+    def apagar_cache() -> None:
+        shutil.rmtree(diretorio_cache(caminho_vendas), ignore_errors=True)
+
+    etapas = []
+
+    def medir(nome: str, funcao: Callable[[], Any], antes: Optional[Callable[[], None]] = None) -> Any:
+        etapa, resultado = medir_etapa(nome, funcao, repeticoes, antes, medir_memoria)
+        etapas.append(etapa)
+        return resultado
+
+    df_vendas = medir("carregar_df_vendas", lambda: ler_df_vendas(caminho_vendas), apagar_cache if frio else None)
+    df_cadastro = medir("carregar_df_cadastro", lambda: ler_df_cadastro(caminho_cadastro))
+    df_agrupado = medir("processa_df_venda_agrupado", lambda: construir_df_vendas_agrupado(df_vendas))
+
+    grao = medir("montar_grao_dia_cliente", lambda: montar_grao_dia_cliente(df_agrupado))
+    grao_identificado = grao[grao["Cliente"] != 99999]
+    medir("agrupar_tabelas_temporais", lambda: analise.agrupar_tabelas_temporais(grao_identificado))
+
+    medir("preparar_produtos", lambda: analise.preparar_produtos(df_vendas, df_cadastro))
+    cubo = medir("montar_cubo_produto_dia", lambda: montar_cubo_produto_dia(df_vendas))
+    medir("detalhar_giro_vendas", lambda: analise.detalhar_giro_vendas(cubo, df_cadastro, periodo))
+
+    indice = medir("montar_indice_produtos", lambda: montar_indice_produtos(df_vendas))
+    medir("obter_produtos_nao_vendidos", lambda: analise.obter_produtos_nao_vendidos(indice, df_cadastro))
+
+    agrupado_identificado = df_agrupado[df_agrupado["Cliente"] != 99999]
+    medir("calcular_metricas_clientes", lambda: analise.calcular_metricas_clientes(agrupado_identificado))
+    medir("calcular_coortes", lambda: analise.calcular_coortes(agrupado_identificado))
+    medir("calcular_intervalos_compras", lambda: analise.calcular_intervalos_compras(agrupado_identificado))
+    medir("calcular_rfm", lambda: analise.calcular_rfm(agrupado_identificado))
+    medir("calcular_vendas_por_localizacao", lambda: analise.calcular_vendas_por_localizacao(df_agrupado, "Bairro"))
+
+    return {
+        "versao_relatorio": VERSAO_RELATORIO,
+        "criado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "pyarrow": pa.__version__,
+        },
+        "dados": {
+            "vendas": os.path.abspath(caminho_vendas),
+            "tamanho_vendas_mb": round(os.path.getsize(caminho_vendas) / 1024 ** 2, 1),
+            "linhas_vendas": len(df_vendas),
+            "notas": len(df_agrupado),
+            "produtos_cadastro": len(df_cadastro),
+        },
+        "parametros": {
+            "repeticoes": repeticoes, "frio": frio, "periodo": periodo, "medir_memoria": medir_memoria
+        },
+        "etapas": etapas,
+    }
+
+def comparar(relatorio: Dict[str, Any], anterior: Dict[str, Any]) -> pd.DataFrame:
+    """Tempo e memória de cada etapa contra um relatório anterior (razão > 1 = mais rápido agora)."""
+    base = {e["etapa"]: e for e in anterior["etapas"]}
+    linhas = []
+    for etapa in relatorio["etapas"]:
+        antes = base.get(etapa["etapa"])
+        linhas.append({
+            "Etapa": etapa["etapa"],
+            "Antes (s)": antes["segundos"] if antes else None,
+            "Agora (s)": etapa["segundos"],
+            "Aceleração": antes["segundos"] / etapa["segundos"] if antes and etapa["segundos"] else None,
+            "Memória antes (MB)": antes.get("pico_memoria_mb") if antes else None,
+            "Memória agora (MB)": etapa["pico_memoria_mb"],
+        })
+    return pd.DataFrame(linhas).round(3)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede tempo e memória de cada etapa do dashboard, sem Streamlit.")
+    parser.add_argument("--vendas", help="Arquivo de vendas (padrão: gerado com --gerar).")
+    parser.add_argument("--cadastro", help="Arquivo de cadastro de produtos.")
+    parser.add_argument("--gerar", type=int, metavar="LINHAS", help="Gera dados sintéticos com LINHAS itens em um diretório temporário.")
+    parser.add_argument("--assimetria", type=float, default=1.1, help="Assimetria dos dados gerados (ver benchmarks.gerador).")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--frio", action="store_true", help="Apaga o cache colunar antes de cada leitura.")
+    parser.add_argument("--periodo", default="Mês", help="Período usado em detalhar_giro_vendas.")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (uma execução a menos por etapa).")
+    parser.add_argument("--saida", help="Grava o relatório JSON neste arquivo.")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para comparação.")
+    args = parser.parse_args()
+
+    if bool(args.gerar) == bool(args.vendas and args.cadastro):
+        parser.error("informe --gerar ou então --vendas e --cadastro.")
+
+    temporario = None
+    if args.gerar:
+        temporario = tempfile.mkdtemp(prefix="benchmark_dashboard_")
+        args.vendas = os.path.join(temporario, "NotasFW_ProdInfo.csv")
+        args.cadastro = os.path.join(temporario, "prodMercado.csv")
+        gerar_cadastro(5000).to_csv(args.cadastro, sep=";", index=False)
+        gerar_vendas(args.vendas, args.gerar, assimetria=args.assimetria)
+        print(f"🧪 {args.gerar:,} itens sintéticos gerados em '{temporario}'.")
+
+    try:
+        relatorio = executar(
+            args.vendas, args.cadastro, args.repeticoes, args.frio, args.periodo, not args.sem_memoria
+        )
+    finally:
+        if temporario is not None:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    if args.gerar:
+        relatorio["dados"]["gerado"] = {"linhas": args.gerar, "assimetria": args.assimetria}
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"📝 Relatório gravado em '{args.saida}'.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            print(comparar(relatorio, json.load(f)).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
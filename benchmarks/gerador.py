@@ -0,0 +1,188 @@
+"""
+Gera arquivos de vendas e de cadastro sintéticos no mesmo formato dos exportados pelo ERP.
+
+Produtos e clientes são sorteados com pesos de Zipf (`--assimetria`; 0 = uniforme), o que
+concentra as vendas em poucos deles como nos dados reais, e `--fracao-balcao` das notas
+(30% por padrão) são do cliente 99999. `--fracao-divergente` cria itens com cliente e
+bairro diferentes dos da nota, para testar a escolha dos atributos de cada nota.
+
+    python -m benchmarks.gerador --linhas 10000000 --destino dados/sintetico
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+CLIENTE_BALCAO = 99999
+
+BAIRROS = [
+    "Centro", "Jardim América", "Vila Nova", "Santa Cruz", "São José", "Bela Vista",
+    "Boa Vista", "Industrial", "Jardim das Flores", "Parque das Árvores", "Vila Rica",
+    "Santo Antônio", "Alto da Colina", "Nossa Senhora Aparecida", "Jardim Europa",
+    "Vila Operária", "Cidade Nova", "Jardim Primavera", "Morada do Sol", "Planalto",
+]
+
+CATEGORIAS = [
+    "Arroz", "Feijão", "Açúcar", "Café", "Leite", "Óleo", "Macarrão", "Farinha", "Biscoito",
+    "Refrigerante", "Suco", "Cerveja", "Sabão", "Detergente", "Papel Higiênico", "Queijo",
+    "Presunto", "Carne Bovina", "Frango", "Banana", "Tomate", "Batata", "Cebola", "Pão",
+]
+MARCAS = ["Bom Preço", "Da Casa", "Sabor Real", "Nativa", "Primor", "Estrela", "Top", "Família"]
+
+def _pesos_zipf(quantidade: int, assimetria: float) -> np.ndarray:
+    """Probabilidades proporcionais a 1/rank^assimetria (0 = uniforme)."""
+    pesos = 1.0 / np.arange(1, quantidade + 1) ** assimetria
+    return pesos / pesos.sum()
+
+def _sortear(rng: np.random.Generator, acumulado: np.ndarray, quantidade: int) -> np.ndarray:
+    """Sorteia posições pela distribuição acumulada (mais rápido que `rng.choice` com `p`)."""
+    return np.minimum(np.searchsorted(acumulado, rng.random(quantidade)), len(acumulado) - 1)
+
+def gerar_cadastro(produtos: int, semente: int = 0) -> pd.DataFrame:
+    """Cadastro de produtos no formato do prodMercado.csv: 'ProCod' e 'ProNom'."""
+    rng = np.random.default_rng(semente)
+    categorias = np.asarray(CATEGORIAS, dtype=object)[rng.integers(0, len(CATEGORIAS), produtos)]
+    marcas = np.asarray(MARCAS, dtype=object)[rng.integers(0, len(MARCAS), produtos)]
+    codigos = np.arange(1, produtos + 1)
+    nomes = pd.Series(categorias) + " " + pd.Series(marcas) + " " + pd.Series(codigos).astype(str)
+    return pd.DataFrame({"ProCod": codigos, "ProNom": nomes})
+
+def gerar_vendas(
+    destino: str,
+    linhas: int,
+    produtos: int = 5000,
+    clientes: int = 20000,
+    dias: int = 3 * 365,
+    inicio: str = "2022-01-01",
+    itens_por_nota: float = 4.0,
+    fracao_balcao: float = 0.3,
+    assimetria: float = 1.1,
+    semente: int = 0,
+    linhas_por_bloco: int = 2_000_000,
+    fracao_divergente: float = 0.0,
+) -> int:
+    """
+    Grava um arquivo de vendas sintético no formato do NotasFW_ProdInfo.csv, em blocos.
+
+    As notas são numeradas em ordem crescente e distribuídas uniformemente pelos `dias`;
+    produtos, clientes e bairros seguem uma distribuição de Zipf com expoente `assimetria`.
+    `fracao_balcao` das notas são do cliente não identificado (99999), sem bairro.
+    `fracao_divergente` dos itens têm cliente e bairro diferentes dos da nota, ou vazios,
+    como em exportações com notas inconsistentes.
+    Retorna o número de notas geradas.
+    """
+    rng = np.random.default_rng(semente)
+    acumulado_produtos = np.cumsum(_pesos_zipf(produtos, assimetria))
+    acumulado_clientes = np.cumsum(_pesos_zipf(clientes, assimetria))
+    precos = np.round(rng.lognormal(mean=2.3, sigma=0.8, size=produtos), 2)
+    # Parte dos produtos é vendida a granel (quantidades fracionadas)
+    a_granel = rng.random(produtos) < 0.15
+
+    # Cada cliente mora em um bairro fixo, com bairros também assimétricos
+    bairro_cliente = _sortear(rng, np.cumsum(_pesos_zipf(len(BAIRROS), assimetria / 2)), clientes)
+    bairros = pa.array(BAIRROS)
+
+    notas_estimadas = max(1, int(linhas / itens_por_nota))
+    data_inicio = np.datetime64(inicio, "D")
+    escritas = 0
+    controle_inicial = 1
+
+    esquema = pa.schema([
+        ("Controle", pa.int64()), ("Cliente", pa.int64()), ("ProCod", pa.int64()),
+        ("Quantidade", pa.float64()), ("TotalItem", pa.float64()), ("Data", pa.date32()),
+        ("Bairro", pa.dictionary(pa.int32(), pa.string())),
+    ])
+    # Sem aspas, como no arquivo exportado pelo ERP (o cabeçalho é gravado à parte)
+    opcoes = pa_csv.WriteOptions(delimiter=";", quoting_style="none", include_header=False)
+    with open(destino, "wb") as arquivo, pa_csv.CSVWriter(arquivo, esquema, write_options=opcoes) as escritor:
+        arquivo.write((";".join(esquema.names) + "\n").encode("utf-8"))
+        while escritas < linhas:
+            # Notas do bloco com quantidade de itens geométrica (mínimo 1)
+            quantidade_notas = max(1, int(min(linhas_por_bloco, linhas - escritas) / itens_por_nota))
+            itens = rng.geometric(1 / itens_por_nota, quantidade_notas)
+            restantes = linhas - escritas
+            if itens.sum() > restantes:
+                itens = itens[: np.searchsorted(np.cumsum(itens), restantes) + 1]
+                itens[-1] -= itens.sum() - restantes
+            quantidade_notas = len(itens)
+
+            controles = np.arange(controle_inicial, controle_inicial + quantidade_notas)
+            balcao = rng.random(quantidade_notas) < fracao_balcao
+            posicao_cliente = _sortear(rng, acumulado_clientes, quantidade_notas)
+            cliente = np.where(balcao, CLIENTE_BALCAO, posicao_cliente + 1)
+            bairro = bairro_cliente[posicao_cliente]
+            dia = np.minimum((controles - 1) * dias // notas_estimadas, dias - 1).astype("timedelta64[D]")
+
+            produto = _sortear(rng, acumulado_produtos, int(itens.sum()))
+            quantidade = np.where(
+                a_granel[produto],
+                np.round(rng.uniform(0.1, 3.0, len(produto)), 3),
+                rng.geometric(0.6, len(produto)).astype(np.float64),
+            )
+            total = np.round(quantidade * precos[produto], 2)
+
+            cliente_item = np.repeat(cliente, itens)
+            bairro_item = np.repeat(bairro, itens)
+            sem_bairro = np.repeat(balcao, itens)
+            sem_cliente = np.zeros(len(produto), dtype=bool)
+            if fracao_divergente:
+                divergentes = np.flatnonzero(rng.random(len(produto)) < fracao_divergente)
+                outro_cliente = _sortear(rng, acumulado_clientes, len(divergentes))
+                cliente_item[divergentes] = outro_cliente + 1
+                bairro_item[divergentes] = bairro_cliente[outro_cliente]
+                sem_bairro[divergentes] = False
+                vazios = divergentes[rng.random(len(divergentes)) < 0.5]
+                sem_cliente[vazios] = sem_bairro[vazios] = True
+
+            escritor.write_table(pa.table({
+                "Controle": np.repeat(controles, itens),
+                "Cliente": pa.array(cliente_item, pa.int64(), mask=sem_cliente),
+                "ProCod": produto + 1,
+                "Quantidade": quantidade,
+                "TotalItem": total,
+                "Data": pa.array(np.repeat(data_inicio + dia, itens), pa.date32()),
+                "Bairro": pa.DictionaryArray.from_arrays(pa.array(bairro_item, pa.int32(), mask=sem_bairro), bairros),
+            }))
+            escritas += len(produto)
+            controle_inicial += quantidade_notas
+
+    return controle_inicial - 1
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera arquivos sintéticos de vendas e cadastro de produtos.")
+    parser.add_argument("--linhas", type=int, default=1_000_000, help="Itens de venda (ex.: 1000000, 10000000, 50000000).")
+    parser.add_argument("--destino", default="dados/sintetico", help="Diretório dos arquivos gerados.")
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--clientes", type=int, default=20000)
+    parser.add_argument("--dias", type=int, default=3 * 365)
+    parser.add_argument("--inicio", default="2022-01-01", help="Data da primeira nota.")
+    parser.add_argument("--itens-por-nota", type=float, default=4.0)
+    parser.add_argument("--fracao-balcao", type=float, default=0.3, help="Fração de notas do cliente 99999.")
+    parser.add_argument("--assimetria", type=float, default=1.1, help="Expoente de Zipf de produtos e clientes (0 = uniforme).")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--fracao-divergente", type=float, default=0.0, help="Fração de itens com cliente e bairro diferentes dos da nota.")
+    args = parser.parse_args()
+
+    os.makedirs(args.destino, exist_ok=True)
+    caminho_vendas = os.path.join(args.destino, "NotasFW_ProdInfo.csv")
+    caminho_cadastro = os.path.join(args.destino, "prodMercado.csv")
+
+    gerar_cadastro(args.produtos, args.semente).to_csv(caminho_cadastro, sep=";", index=False)
+
+    inicio = time.perf_counter()
+    notas = gerar_vendas(
+        caminho_vendas, args.linhas,
+        produtos=args.produtos, clientes=args.clientes, dias=args.dias, inicio=args.inicio,
+        itens_por_nota=args.itens_por_nota, fracao_balcao=args.fracao_balcao,
+        assimetria=args.assimetria, semente=args.semente, fracao_divergente=args.fracao_divergente,
+    )
+    print(f"✅ {args.linhas:,} itens em {notas:,} notas gravados em '{caminho_vendas}' "
+          f"({os.path.getsize(caminho_vendas) / 1024 ** 2:.0f} MB, {time.perf_counter() - inicio:.1f} s).")
+    print(f"✅ Cadastro com {args.produtos:,} produtos gravado em '{caminho_cadastro}'.")
+
+if __name__ == "__main__":
+    main()
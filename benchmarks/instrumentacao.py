@@ -0,0 +1,60 @@
+"""
+Resumo do log da instrumentação das páginas (DASHBOARD_INSTRUMENTACAO=1): p95 por etapa,
+taxa de acerto por cache e maior tamanho de cada dataset.
+
+    python -m benchmarks.instrumentacao --log .cache/instrumentacao.jsonl [--desde 2024-01-01]
+"""
+
+import argparse
+from typing import Optional
+import pandas as pd
+from utils.constantes import ARQUIVO_LOG_INSTRUMENTACAO
+
+def ler_log(caminho: str, desde: Optional[str] = None) -> pd.DataFrame:
+    """Eventos gravados pela instrumentação das páginas (DASHBOARD_INSTRUMENTACAO=1)."""
+    eventos = pd.read_json(caminho, lines=True, convert_dates=["instante"])
+    if desde is not None:
+        eventos = eventos[eventos["instante"] >= pd.Timestamp(desde)]
+    return eventos
+
+def resumo_etapas(eventos: pd.DataFrame) -> pd.DataFrame:
+    """Tempo (ms) de cada etapa: chamadas, mediana, p95 e máximo, das mais lentas para as mais rápidas."""
+    etapas = eventos[eventos["tipo"] == "etapa"]
+    resumo = etapas.groupby("nome")["duracao_ms"].agg(
+        Chamadas="count",
+        Mediana="median",
+        P95=lambda d: d.quantile(0.95),
+        Maximo="max",
+    )
+    return resumo.round(1).sort_values("P95", ascending=False)
+
+def resumo_caches(eventos: pd.DataFrame) -> pd.DataFrame:
+    """Consultas e taxa de acerto de cada cache."""
+    caches = eventos[eventos["tipo"] == "cache"]
+    resumo = caches["acerto"].astype(bool).groupby(caches["camada"]).agg(Consultas="count", Acertos="sum")
+    resumo["Taxa de acerto"] = (resumo["Acertos"] / resumo["Consultas"]).round(3)
+    return resumo
+
+def resumo_memoria(eventos: pd.DataFrame) -> pd.DataFrame:
+    """Maior tamanho (MB) observado de cada dataset."""
+    memoria = eventos[eventos["tipo"] == "memoria"]
+    return memoria.groupby("nome")["mb"].max().sort_values(ascending=False).to_frame("MB (máximo)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resume o log de instrumentação das páginas.")
+    parser.add_argument("--log", default=ARQUIVO_LOG_INSTRUMENTACAO)
+    parser.add_argument("--desde", help="considera só os eventos a partir desta data/hora")
+    args = parser.parse_args()
+
+    eventos = ler_log(args.log, args.desde)
+    print(f"📄 {len(eventos)} eventos, {eventos['sessao'].nunique()} sessões.\n")
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 120):
+        print("⏱️ Etapas (ms)")
+        print(resumo_etapas(eventos), end="\n\n")
+        print("🗃️ Caches")
+        print(resumo_caches(eventos), end="\n\n")
+        print("📦 Memória dos datasets")
+        print(resumo_memoria(eventos))
+
+if __name__ == "__main__":
+    main()
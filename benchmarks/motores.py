@@ -0,0 +1,110 @@
+"""
+Compara os motores pandas e DuckDB nos datasets intermediários (notas, grão dia ×
+cliente, cubo produto × dia e índice de produtos): tempo, pico de memória do processo e
+igualdade dos resultados.
+
+O DuckDB é medido duas vezes: sobre o CSV e, depois da leitura pelo pandas, sobre o cache
+colunar gravado por ela. `--gerar` cria dados sintéticos com notas inconsistentes, em que
+os motores precisam escolher os mesmos atributos. Como o pico de memória é do processo
+inteiro, `--apenas` roda um só motor para medi-lo sem a interferência do outro.
+
+    python -m benchmarks.motores --gerar 1000000
+    python -m benchmarks.motores --vendas dados/sintetico/NotasFW_ProdInfo.csv [--apenas duckdb]
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict
+import pandas as pd
+import utils.consultas_duckdb as consultas_duckdb
+from benchmarks.gerador import gerar_vendas
+from utils.agregacao import montar_grao_dia_cliente
+from utils.constantes import CLIENTE_NAO_IDENTIFICADO
+from utils.filtros import FiltroGlobal
+from utils.leitura import ler_df_vendas
+from utils.precomputo import montar_intermediarios
+
+def com_pandas(caminho: str, filtro: FiltroGlobal) -> Dict[str, pd.DataFrame]:
+    """Datasets intermediários montados pelo pandas a partir de df_vendas inteiro."""
+    df_vendas = ler_df_vendas(caminho)
+    if filtro.ativo:
+        df_vendas = df_vendas[df_vendas["Cliente"] != CLIENTE_NAO_IDENTIFICADO].reset_index(drop=True)
+    agrupado, cubo, indice = montar_intermediarios(df_vendas)
+    return {
+        "df_vendas_agrupado": agrupado,
+        "grao_dia_cliente": montar_grao_dia_cliente(agrupado),
+        "cubo_produto_dia": cubo,
+        "indice_produtos": indice,
+    }
+
+def com_duckdb(caminho: str, filtro: FiltroGlobal) -> Dict[str, pd.DataFrame]:
+    """Os mesmos datasets consultados pelo DuckDB, sem carregar df_vendas."""
+    return {nome: consulta(caminho, filtro if filtro.ativo else None)
+            for nome, consulta in consultas_duckdb.CONSULTAS.items()}
+
+def medir(funcao: Callable, caminho: str, filtro: FiltroGlobal) -> tuple:
+    inicio = time.perf_counter()
+    resultado = funcao(caminho, filtro)
+    return time.perf_counter() - inicio, resultado
+
+def pico_memoria_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def comparar_resultados(obtido: Dict[str, pd.DataFrame], esperado: Dict[str, pd.DataFrame]) -> None:
+    """Falha se algum dataset do DuckDB diferir do montado pelo pandas."""
+    for nome, df in esperado.items():
+        # Somas em ponto flutuante podem diferir na última casa pela ordem de soma
+        pd.testing.assert_frame_equal(obtido[nome], df, check_categorical=False, rtol=1e-9)
+        print(f"✅ {nome}: {len(df):,} linhas iguais")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara os motores pandas e DuckDB nos datasets intermediários.")
+    parser.add_argument("--vendas", help="Arquivo de vendas (padrão: gerado com --gerar).")
+    parser.add_argument("--gerar", type=int, metavar="LINHAS", help="Gera LINHAS itens sintéticos, com notas inconsistentes, em um diretório temporário.")
+    parser.add_argument("--sem-99999", action="store_true", help="Remove o cliente 99999 dos itens.")
+    parser.add_argument("--apenas", choices=["pandas", "duckdb"], help="Roda só um motor, para medir o pico de memória do processo.")
+    args = parser.parse_args()
+
+    if consultas_duckdb.duckdb is None:
+        parser.error('DuckDB não instalado (pip install "duckdb>=1.5.0").')
+    if bool(args.gerar) == bool(args.vendas):
+        parser.error("informe --gerar ou --vendas.")
+    filtro = FiltroGlobal(sem_nao_identificado=args.sem_99999)
+
+    temporario = None
+    if args.gerar:
+        temporario = tempfile.mkdtemp(prefix="benchmark_motores_")
+        args.vendas = os.path.join(temporario, "NotasFW_ProdInfo.csv")
+        # Itens com cliente e bairro diferentes dos da nota: os motores precisam escolher os mesmos
+        gerar_vendas(args.vendas, args.gerar, fracao_divergente=0.05)
+        print(f"🧪 {args.gerar:,} itens sintéticos gerados em '{temporario}'.")
+
+    try:
+        if args.apenas:
+            funcao = com_pandas if args.apenas == "pandas" else com_duckdb
+            tempo, _ = medir(funcao, args.vendas, filtro)
+            print(f"{args.apenas}: {tempo:8.2f} s | pico de memória do processo: {pico_memoria_mb():,.0f} MB")
+            return
+
+        # DuckDB antes do pandas lê o CSV; depois, o cache colunar gravado pelo pandas
+        tempo_duckdb, obtido = medir(com_duckdb, args.vendas, filtro)
+        tempo_pandas, esperado = medir(com_pandas, args.vendas, filtro)
+        print("DuckDB sobre o CSV:")
+        comparar_resultados(obtido, esperado)
+        tempo_duckdb_cache, obtido = medir(com_duckdb, args.vendas, filtro)
+        print("DuckDB sobre o cache colunar:")
+        comparar_resultados(obtido, esperado)
+    finally:
+        if temporario is not None:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    print(f"pandas:                  {tempo_pandas:8.2f} s")
+    print(f"duckdb (CSV):            {tempo_duckdb:8.2f} s")
+    print(f"duckdb (cache colunar):  {tempo_duckdb_cache:8.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,49 @@
 import streamlit as st
 import pandas as pd
 from typing import Tuple, Optional
-from utils.processamento import processa_df_venda_agrupado
+import utils.analise as analise
+from utils.agregacao import NIVEIS_TEMPORAIS, montar_grao_dia_cliente
+from utils.instrumentacao import cache_medido, medido
+from utils.precomputo import artefato_temporal, filtro_clientes
+from utils.processamento import consulta_filtrada, processa_df_venda_agrupado, processa_grao_dia_cliente
 from utils.moeda import formatar_moeda_brasileira
-from utils.sessao import inicializar_app
+from utils.sessao import DadosVersionados, inicializar_app, obter_agregado, obter_dados
+import utils.visualizacao as visualizacao
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
 st.set_page_config(page_title="Indicadores de Vendas", layout="wide")
 inicializar_app()
+visualizacao.exibir_filtro_global()
 st.title("📊 Indicadores Gerais de Vendas")
 
-# ---------------- CARREGAMENTO E VERIFICAÇÃO ----------------
-if "df_vendas_agrupado" not in st.session_state:
-    processa_df_venda_agrupado()
-
-df: Optional[pd.DataFrame] = st.session_state.get("df_vendas_agrupado")
-
-if not isinstance(df, pd.DataFrame) or df.empty:
-    st.error("❌ O DataFrame 'df_vendas_agrupado' não está disponível ou está vazio.")
-    st.stop()
-
-df_vendas_agrupado: pd.DataFrame = df.copy()
-
 # ---------------- FILTRAGEM OPCIONAL ----------------
 ignore_99999 = st.checkbox("Ignorar cliente não identificado (ID 99999)", value=True)
-if ignore_99999:
-    df_vendas_agrupado = df_vendas_agrupado[df_vendas_agrupado["Cliente"] != 99999]
+
+# ---------------- CARREGAMENTO E VERIFICAÇÃO ----------------
+
+@medido
+def carregar_grao() -> DadosVersionados:
+    """Grão dia × cliente (com os filtros escolhidos): todas as tabelas temporais partem dele."""
+    # O grão não tem bairro: com filtro de bairro, é remontado a partir das notas filtradas
+    return obter_dados(
+        "grao_dia_cliente",
+        processa_grao_dia_cliente,
+        sem_nao_identificado=ignore_99999,
+        origem=("df_vendas_agrupado", processa_df_venda_agrupado, montar_grao_dia_cliente),
+        consulta=consulta_filtrada("grao_dia_cliente")
+    )
 
 # ---------------- AGRUPAMENTO TEMPORAL ----------------
 
-@st.cache_data
-def agrupar_tabelas_temporais(df: pd.DataFrame) -> Tuple[pd.DataFrame, ...]:
-    """Agrupa dados por variações temporais padrão."""
-
-    def agrupar(coluna: str) -> pd.DataFrame:
-        if coluna not in df.columns:
-            return pd.DataFrame()
-
-        # Total por grupo
-        soma_vendas = df.groupby(coluna)["TotalVenda"].sum()
-        quant_clientes = df.groupby(coluna)["Cliente"].nunique()
-        media_por_venda = df.groupby(coluna)["TotalVenda"].mean()
-
-        agrupado = pd.DataFrame({
-            coluna: soma_vendas.index,
-            "TotalVenda": soma_vendas.values,
-            "QuantClientes": quant_clientes.values,
-            "QuantVendas": df.groupby(coluna)["Controle"].count().values,
-            "MediaPorCliente": soma_vendas.values / quant_clientes.values,
-            "MediaPorVenda": media_por_venda.values
-        })
-
-        return agrupado
-
-
-    anual     = agrupar("Ano")
-    semestre  = agrupar("Semestre")
-    trimestre = agrupar("Trimestre")
-    mensal    = agrupar("MesPeriodo").rename(columns={"MesPeriodo": "Mês"})
-    semanal   = agrupar("SemanaInicioDt").rename(columns={"SemanaInicioDt": "Semana"})
-    dia_sem   = agrupar("DiaSemana")
-    diario    = agrupar("Dia").rename(columns={"Dia": "Data"})
-
-    # Meses dentro da semana (legenda adicional)
-    if "Semana" in semanal.columns and "Data" in df.columns:
-        meses_semanais = (
-            df.groupby("SemanaInicioDt")["Data"]
-              .agg(lambda x: "-".join(sorted(set(x.dt.strftime("%b")))))
-              .reset_index(name="Meses")
-              .rename(columns={"SemanaInicioDt": "Semana"})
-        )
-        semanal = semanal.merge(meses_semanais, on="Semana", how="left")
+@cache_medido
+def agrupar_tabelas_temporais(versao: str, _grao: pd.DataFrame) -> Tuple[pd.DataFrame, ...]:
+    """Agrupa dados por variações temporais padrão, a partir do grão dia × cliente da `versao`."""
+    return analise.agrupar_tabelas_temporais(_grao)
 
-    return anual, semestre, trimestre, mensal, semanal, dia_sem, diario
+@medido
+def tabelas_temporais() -> Tuple[pd.DataFrame, ...]:
+    grao = carregar_grao()
+    return agrupar_tabelas_temporais(grao.versao, grao.df)
 
 # ---------------- EXIBIÇÃO DE TABELAS ----------------
 
@@ -96,18 +67,17 @@ def exibir_tabela(df: pd.DataFrame, titulo: Optional[str] = None) -> None:
         )
         df = df.sort_values("DiaSemana")
 
-    # Formatação de colunas monetárias
-    df["TotalVenda"] = df["TotalVenda"].map(formatar_moeda_brasileira)
-    df["MediaPorCliente"] = df["MediaPorCliente"].map(formatar_moeda_brasileira)
-
     if titulo:
         st.markdown(f"### 📈 {titulo}")
-    st.dataframe(df.style.hide(axis="index"), use_container_width=True)
+    visualizacao.exibir_tabela(df, moeda=["TotalVenda", "MediaPorCliente"], hide_index=True)
 
 # ---------------- KPIs GERAIS ----------------
 
-total_clientes = df_vendas_agrupado["Cliente"].nunique()
-total_vendas = df_vendas_agrupado["TotalVenda"].sum()
+# Lidos dos agregados pré-calculados; o grão só é carregado se estiverem desatualizados
+filtro = filtro_clientes(ignore_99999)
+resumo = obter_agregado(f"indicadores_{filtro}", lambda: analise.resumo_indicadores(carregar_grao().df))
+total_clientes = int(resumo["TotalClientes"].iloc[0])
+total_vendas = resumo["TotalVendas"].iloc[0]
 ticket_medio = total_vendas / total_clientes
 
 col1, col2, col3 = st.columns(3)
@@ -117,12 +87,12 @@ col3.metric("Média de Vendas/Cliente", formatar_moeda_brasileira(ticket_medio))
 
 # ---------------- TABELAS DETALHADAS ----------------
 
-tabelas = agrupar_tabelas_temporais(df_vendas_agrupado)
-nomes = [
-    "Ano", "Semestre", "Trimestre", "Mês",
-    "Semana", "Dia da Semana", "Data"
-]
+nomes = list(NIVEIS_TEMPORAIS)
 
-for nome, df_tab in zip(nomes, tabelas):
+for posicao, nome in enumerate(nomes):
+    df_tab = obter_agregado(
+        artefato_temporal(nome, ignore_99999),
+        lambda: tabelas_temporais()[posicao]
+    )
     with st.expander(f"Detalhamento por {nome}"):
         exibir_tabela(df_tab, titulo=nome)
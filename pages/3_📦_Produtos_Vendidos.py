@@ -1,102 +1,93 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from typing import Tuple, Optional
+from typing import Optional
+import utils.analise as analise
+from utils.agregacao import montar_cubo_produto_dia
 from utils.processamento import (
-    calcular_vendas_agrupadas,
-    adicionar_nomes_produtos,
     carregar_df_vendas,
-    carregar_df_cadastro
+    carregar_df_cadastro,
+    consulta_filtrada,
+    processa_cubo_produto_dia,
 )
-from utils.moeda import formatar_moeda_brasileira
-from utils.sessao import inicializar_app, validar_df
+from utils.calendario import COLUNA_POR_PERIODO
+from utils.graficos import ROTULO_OUTROS, reduzir_para_grafico
+from utils.instrumentacao import cache_medido, medido
+from utils.precomputo import artefato_giro
+from utils.sessao import DadosVersionados, dados_versionados, inicializar_app, obter_agregado, obter_dados
+from utils.visualizacao import exibir_filtro_global, exibir_tabela, mostrar_paginado
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
 st.set_page_config(page_title="Produtos Vendidos", layout="wide")
 inicializar_app()
+exibir_filtro_global()
 st.title("📦 Produtos Vendidos")
 
 # ---------------- CARREGAMENTO DOS DADOS ----------------
-df_vendas = validar_df("df_vendas", carregar_df_vendas)
-df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
+# Só necessários se os agregados pré-calculados estiverem desatualizados
+
+@medido
+def carregar_cadastro() -> DadosVersionados:
+    return dados_versionados("df_cadastro", carregar_df_cadastro)
+
+@medido
+def carregar_cubo() -> DadosVersionados:
+    """Cubo produto × dia, montado uma vez por versão das vendas (e combinação de filtros)."""
+    return obter_dados(
+        "cubo_produto_dia",
+        processa_cubo_produto_dia,
+        origem=("df_vendas", carregar_df_vendas, montar_cubo_produto_dia),
+        consulta=consulta_filtrada("cubo_produto_dia")
+    )
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-@st.cache_data
-def preparar_produtos(df_vendas: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.DataFrame:
-    df = calcular_vendas_agrupadas(df_vendas)
-    df = adicionar_nomes_produtos(df, df_cadastro)
-    df = df.rename(columns={"ProNom": "Produto"})
-    df = df.sort_values(by="TotalItem", ascending=False)
-    df["TotalFormatado"] = df["TotalItem"].map(formatar_moeda_brasileira)
-    return df
-
-@st.cache_data
-def detalhar_giro_vendas(df_vendas: pd.DataFrame, df_cadastro: pd.DataFrame, periodo: str) -> pd.DataFrame:
-    df = df_vendas.copy()
-
-    # Remover ProNom duplicado da tabela de vendas (evita conflito no merge)
-    if "ProNom" in df.columns:
-        df = df.drop(columns=["ProNom"])
-
-    # Merge com nome do produto
-    df = df.merge(df_cadastro[["ProCod", "ProNom"]], how="left", on="ProCod")
-    df = df.rename(columns={"ProNom": "Produto"})
-
-    # Verificações
-    if "Produto" not in df.columns or df["Produto"].isna().all():
-        st.error("❌ Coluna 'Produto' não existe ou está totalmente vazia após o merge.")
-        st.stop()
-
-    if "Quantidade" not in df.columns:
-        st.error("❌ Coluna 'Quantidade' não encontrada no DataFrame de vendas.")
-        st.stop()
-
-    if "Data" not in df.columns:
-        st.error("❌ Coluna 'Data' não encontrada no DataFrame de vendas.")
-        st.stop()
-
-    # Datas
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
-    df = df.dropna(subset=["Data"])
-
-    # Criar coluna de período
-    if periodo == "Ano":
-        df["Periodo"] = df["Data"].dt.year
-    elif periodo == "Semestre":
-        df["Periodo"] = df["Data"].dt.year.astype(str) + " - S" + ((df["Data"].dt.month - 1) // 6 + 1).astype(str)
-    elif periodo == "Trimestre":
-        df["Periodo"] = df["Data"].dt.year.astype(str) + " - T" + ((df["Data"].dt.month - 1) // 3 + 1).astype(str)
-    elif periodo == "Mês":
-        df["Periodo"] = df["Data"].dt.to_period("M").astype(str)
-    elif periodo == "Semana":
-        df["Periodo"] = df["Data"].dt.strftime("%Y - Semana %U")
-    elif periodo == "Dia da Semana":
-        df["Periodo"] = df["Data"].dt.day_name()
-    elif periodo == "Data":
-        df["Periodo"] = df["Data"].dt.date
-    else:
-        st.error("❌ Período inválido selecionado.")
+# As funções em cache recebem os tokens de versão dos dados; os DataFrames (`_df...`) não
+# entram no hash do Streamlit.
+
+@cache_medido
+def _preparar_produtos(versao: str, _cubo: pd.DataFrame, _df_cadastro: pd.DataFrame) -> pd.DataFrame:
+    return analise.preparar_produtos(_cubo, _df_cadastro)
+
+@medido
+def preparar_produtos() -> pd.DataFrame:
+    """Totais por produto somados do cubo produto × dia, sem voltar aos itens."""
+    cubo, cadastro = carregar_cubo(), carregar_cadastro()
+    return _preparar_produtos(f"{cubo.versao}|{cadastro.versao}", cubo.df, cadastro.df)
+
+@cache_medido
+def _detalhar_giro_vendas(versao: str, _cubo: pd.DataFrame, _df_cadastro: pd.DataFrame, periodo: str) -> pd.DataFrame:
+    try:
+        return analise.detalhar_giro_vendas(_cubo, _df_cadastro, periodo)
+    except ValueError as e:
+        st.error(f"❌ {e}")
         st.stop()
 
-    # Agrupamento
-    df_grouped = df.groupby(["Periodo", "Produto"]).agg(Quantidade=("Quantidade", "sum")).reset_index()
-
-    return df_grouped
+@medido
+def detalhar_giro_vendas(periodo: str) -> pd.DataFrame:
+    cubo, cadastro = carregar_cubo(), carregar_cadastro()
+    return _detalhar_giro_vendas(f"{cubo.versao}|{cadastro.versao}", cubo.df, cadastro.df, periodo)
 
 # ---------------- TABELA GERAL ----------------
-df_produtos = preparar_produtos(df_vendas, df_cadastro)
+df_produtos = obter_agregado("produtos", preparar_produtos)
 
 st.markdown("### 📝 Lista de Produtos Vendidos")
-st.dataframe(
-    df_produtos[["Produto", "Quantidade", "TotalFormatado"]]
-    .rename(columns={"Quantidade": "Qtd Vendida", "TotalFormatado": "Total R$"}),
-    use_container_width=True
+exibir_tabela(
+    df_produtos[["Produto", "Quantidade", "TotalItem"]]
+    .rename(columns={"Quantidade": "Qtd Vendida", "TotalItem": "Total R$"}),
+    moeda=["Total R$"]
 )
 
 # ---------------- TOP N ----------------
 top_n = st.slider("Número de produtos no Top", min_value=5, max_value=100, value=10)
-top_df = df_produtos.head(top_n)
+col_inicio, col_outros = st.columns(2)
+inicio_top = col_inicio.number_input(
+    "A partir da posição", min_value=1, max_value=max(1, len(df_produtos)), value=1, step=top_n, key="inicio_top"
+) - 1
+somar_outros = col_outros.checkbox(f"Somar os demais produtos em '{ROTULO_OUTROS}'", value=False)
+top_df = reduzir_para_grafico(
+    df_produtos, "Produto", ["TotalItem", "Quantidade"], top_n, inicio=inicio_top, incluir_outros=somar_outros
+)
 
 st.markdown(f"### 📊 Top {top_n} Produtos por Valor Vendido")
 bar_chart = (
@@ -114,29 +105,44 @@ bar_chart = (
     )
     .properties(height=400)
 )
-st.altair_chart(bar_chart, use_container_width=True)
+st.altair_chart(bar_chart, width="stretch")
 
 # ---------------- GIRO DE VENDAS ----------------
 st.markdown("### 🔄 Giro de Venda por Período")
 
-opcoes_periodo = [
-    "Ano", "Semestre", "Trimestre", "Mês", "Semana", "Dia da Semana", "Data"
-]
+opcoes_periodo = list(COLUNA_POR_PERIODO)
 periodo_selecionado = st.selectbox("Selecionar período de detalhamento:", opcoes_periodo)
 
-df_giro = detalhar_giro_vendas(df_vendas, df_cadastro, periodo_selecionado)
+df_giro = obter_agregado(
+    artefato_giro(periodo_selecionado),
+    lambda: detalhar_giro_vendas(periodo_selecionado)
+)
+
+# A tabela (período × produto) vai ao navegador uma página por vez; o download tem todas as linhas
+mostrar_paginado(
+    df_giro.rename(columns={"Periodo": "Período", "Quantidade": "Qtd Vendida"}),
+    f"giro_vendas_{COLUNA_POR_PERIODO[periodo_selecionado]}"
+)
 
-st.dataframe(
-    df_giro.rename(columns={
-        "Periodo": "Período",
-        "Produto": "Produto",
-        "Quantidade": "Qtd Vendida"
-    }),
-    use_container_width=True
+# O gráfico recebe só os produtos mais vendidos do período; os demais são somados em "Outros"
+# e podem ser detalhados avançando a posição inicial
+col_top, col_inicio = st.columns(2)
+top_giro = col_top.slider("Produtos no gráfico", min_value=5, max_value=50, value=15)
+total_produtos_giro = df_giro["Produto"].nunique()
+inicio_giro = col_inicio.number_input(
+    f"A partir da posição (detalha '{ROTULO_OUTROS}')",
+    min_value=1, max_value=max(1, total_produtos_giro), value=1, step=top_giro, key="inicio_giro"
+) - 1
+df_grafico_giro = reduzir_para_grafico(
+    df_giro, "Produto", ["Quantidade"], top_giro, serie="Periodo", inicio=inicio_giro
+)
+st.caption(
+    f"Posições {inicio_giro + 1} a {min(inicio_giro + top_giro, total_produtos_giro)} "
+    f"de {total_produtos_giro} produtos ({len(df_grafico_giro)} de {len(df_giro)} linhas no gráfico)."
 )
 
 grafico_giro = (
-    alt.Chart(df_giro)
+    alt.Chart(df_grafico_giro)
     .mark_bar()
     .encode(
         x=alt.X("Quantidade:Q", title="Qtd Vendida"),
@@ -147,4 +153,4 @@ grafico_giro = (
     .properties(height=500)
 )
 
-st.altair_chart(grafico_giro, use_container_width=True)
+st.altair_chart(grafico_giro, width="stretch")
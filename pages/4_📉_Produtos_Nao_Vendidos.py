@@ -1,25 +1,28 @@
 import streamlit as st
 import pandas as pd
 from typing import List, Optional
-from utils.processamento import calcular_vendas_agrupadas, carregar_df_vendas, carregar_df_cadastro
-from utils.sessao import inicializar_app, validar_df
+import utils.analise as analise
+from utils.agregacao import montar_cubo_produto_dia, montar_indice_produtos
+from utils.instrumentacao import medido
+from utils.processamento import (
+    carregar_df_cadastro,
+    carregar_df_vendas,
+    consulta_filtrada,
+    processa_cubo_produto_dia,
+    processa_indice_produtos,
+)
+from utils.sessao import dados_filtrados, inicializar_app, obter_agregado, validar_df
+from utils.visualizacao import exibir_filtro_global
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
 st.set_page_config(page_title="Produtos Não Vendidos", layout="wide")
 inicializar_app()
+exibir_filtro_global()
 st.title("📉 Produtos Não Vendidos")
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-def obter_produtos_nao_vendidos(
-    df_vendas: pd.DataFrame,
-    df_cadastro: pd.DataFrame
-) -> pd.DataFrame:
-    """Retorna os produtos do cadastro que não aparecem nas vendas."""
-    codigos_vendidos = set(df_vendas["ProCod"].dropna().unique())
-    return df_cadastro[~df_cadastro["ProCod"].isin(codigos_vendidos)].copy()
-
-@st.cache_data
+@medido
 def preparar_view(
     df: pd.DataFrame,
     colunas: List[str]
@@ -30,12 +33,24 @@ def preparar_view(
 
 # ---------------- CARREGAMENTO DOS DADOS ----------------
 
-df_vendas = validar_df("df_vendas", carregar_df_vendas)
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
 
+@medido
+def carregar_indice() -> pd.DataFrame:
+    """Índice de vendas por produto; com o filtro global, remontado a partir dos itens filtrados."""
+    return dados_filtrados(
+        "indice_produtos",
+        processa_indice_produtos,
+        origem=("df_vendas", carregar_df_vendas, montar_indice_produtos),
+        consulta=consulta_filtrada("indice_produtos")
+    )
+
 # ---------------- INTERFACE DE COLUNAS ----------------
 
-campos_disponiveis = list(df_cadastro.columns)
+CRITERIOS = ["Nunca vendidos", "Sem vendas desde uma data", "Sem vendas em um período"]
+criterio = st.radio("Critério:", CRITERIOS, horizontal=True)
+
+campos_disponiveis = list(df_cadastro.columns) + ([] if criterio == CRITERIOS[0] else ["UltimaVenda"])
 colunas_escolhidas = st.multiselect(
     "Colunas para exibir:",
     options=campos_disponiveis,
@@ -44,7 +59,51 @@ colunas_escolhidas = st.multiselect(
 
 # ---------------- PROCESSAMENTO ----------------
 
-df_nao_vendidos = obter_produtos_nao_vendidos(df_vendas, df_cadastro)
+# O índice por produto (primeira e última venda) vem do agregado pré-calculado, se atualizado;
+# as vendas só são carregadas para montá-lo ou para conferir um período
+if criterio == CRITERIOS[0]:
+    df_nao_vendidos = obter_agregado(
+        "produtos_nao_vendidos",
+        lambda: analise.obter_produtos_nao_vendidos(carregar_indice(), df_cadastro)
+    )
+else:
+    indice_produtos = carregar_indice()
+    if indice_produtos.empty:
+        # Sem vendas (ex.: nenhuma no filtro global), não há datas para escolher
+        st.info("Nenhuma venda encontrada com o filtro atual.")
+        st.stop()
+    primeira_venda, ultima_venda = (
+        pd.to_datetime(indice_produtos[coluna].agg(f), unit="D").date()
+        for coluna, f in (("PrimeiraVenda", "min"), ("UltimaVenda", "max"))
+    )
+
+    if criterio == CRITERIOS[1]:
+        desde = st.date_input(
+            "Sem vendas desde:", value=ultima_venda, min_value=primeira_venda, max_value=ultima_venda
+        )
+        df_nao_vendidos = analise.produtos_sem_venda_desde(indice_produtos, df_cadastro, desde)
+    else:
+        periodo = st.date_input(
+            "Período sem vendas:",
+            value=(max(primeira_venda, ultima_venda - pd.Timedelta(days=29)), ultima_venda),
+            min_value=primeira_venda,
+            max_value=ultima_venda
+        )
+        if len(periodo) != 2:
+            st.info("Selecione a data final do período.")
+            st.stop()
+        df_nao_vendidos = analise.produtos_sem_venda_no_periodo(
+            indice_produtos,
+            dados_filtrados(
+                "cubo_produto_dia",
+                processa_cubo_produto_dia,
+                origem=("df_vendas", carregar_df_vendas, montar_cubo_produto_dia),
+                consulta=consulta_filtrada("cubo_produto_dia")
+            ),
+            df_cadastro,
+            *periodo
+        )
+
 df_view = preparar_view(df_nao_vendidos, colunas_escolhidas)
 
 # ---------------- EXIBIÇÃO ----------------
@@ -54,6 +113,7 @@ st.markdown("---")
 if df_view.empty:
     st.info("✅ Todos os produtos foram vendidos no período.")
 else:
-    st.dataframe(df_view, use_container_width=True)
+    st.caption(f"{len(df_view)} de {len(df_cadastro)} produtos do cadastro.")
+    st.dataframe(df_view, width="stretch")
 
 st.markdown("---")
@@ -1,55 +1,61 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from typing import Tuple
-from utils.moeda import formatar_moeda_brasileira
-from utils.processamento import carregar_df_cadastro, processa_df_venda_agrupado
-from utils.sessao import inicializar_app, validar_df
+from typing import Callable
+import utils.analise as analise
+from utils.instrumentacao import medido
+from utils.processamento import carregar_df_cadastro, consulta_filtrada, processa_df_venda_agrupado
+from utils.precomputo import filtro_clientes
+from utils.sessao import dados_filtrados, derivado_filtrado, inicializar_app, obter_agregado, validar_df
+from utils.visualizacao import exibir_filtro_global, exibir_tabela
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
 st.set_page_config(page_title="Dados dos Clientes", layout="wide")
 inicializar_app()
+exibir_filtro_global()
 st.title("👥 Análise de Clientes")
 
-# ---------------- FUNÇÕES AUXILIARES ----------------
-
-@st.cache_data
-def calcular_metricas_clientes(df_vendas_agrupado: pd.DataFrame) -> Tuple[int, int, pd.DataFrame]:
-    """
-    Calcula estatísticas relacionadas aos clientes:
-    - Total de clientes
-    - Quantos retornaram (mais de uma compra)
-    - DataFrame com métricas por cliente
-    """
-    df = df_vendas_agrupado.copy()
-
-    df_group = df.groupby("Cliente").agg(
-        total_vendas=("TotalVenda", "sum"),
-        num_compras=("Data", "count"),
-        itens_totais=("QuantidadeItens", "sum")
-    ).reset_index()
-
-    df_group["ticket_medio"] = df_group["total_vendas"] / df_group["num_compras"]
-
-    total_customers = df_group.shape[0]
-    returning_customers = df_group[df_group["num_compras"] > 1].shape[0]
-
-    return total_customers, returning_customers, df_group
-
 # ---------------- CARREGAMENTO DE DADOS ----------------
 
-df_vendas_agrupado = validar_df("df_vendas_agrupado", processa_df_venda_agrupado)
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
 
 # ---------------- FILTRO DE CLIENTES ----------------
 
 ignorar_99999 = st.checkbox("Ignorar cliente 99999", value=True)
-if ignorar_99999:
-    df_vendas_agrupado = df_vendas_agrupado[df_vendas_agrupado["Cliente"] != 99999]
+filtro = filtro_clientes(ignorar_99999)
+
+@medido
+def carregar_agrupado() -> pd.DataFrame:
+    """Vendas por nota com o filtro escolhido; só usado se os agregados estiverem desatualizados."""
+    return dados_filtrados(
+        "df_vendas_agrupado",
+        processa_df_venda_agrupado,
+        sem_nao_identificado=ignorar_99999,
+        consulta=consulta_filtrada("df_vendas_agrupado")
+    )
+
+@medido
+def calcular(nome: str, funcao: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Agregado de clientes `nome`: lido do disco, se pré-calculado, ou calculado sobre as
+    notas filtradas uma única vez por versão dos dados e combinação de filtros.
+    """
+    return obter_agregado(
+        f"{nome}_{filtro}",
+        lambda: derivado_filtrado(
+            "df_vendas_agrupado", processa_df_venda_agrupado, nome, funcao,
+            sem_nao_identificado=ignorar_99999, consulta=consulta_filtrada("df_vendas_agrupado")
+        )
+    )
 
 # ---------------- CÁLCULO DE MÉTRICAS ----------------
 
-total_customers, returning_customers, df_clientes = calcular_metricas_clientes(df_vendas_agrupado)
+df_clientes = calcular("clientes", lambda df: analise.calcular_metricas_clientes(df)[2])
+resumo = obter_agregado(
+    f"resumo_clientes_{filtro}", lambda: analise.resumo_clientes(carregar_agrupado(), df_clientes)
+)
+total_customers = int(resumo["Clientes"].iloc[0])
+returning_customers = int(resumo["ClientesRetornaram"].iloc[0])
 return_rate = (returning_customers / total_customers * 100) if total_customers else 0
 
 # ---------------- EXIBIÇÃO DE KPIs ----------------
@@ -58,7 +64,7 @@ col1, col2, col3, col4 = st.columns(4)
 col1.metric("Clientes", total_customers)
 col2.metric("Clientes Retornaram", returning_customers)
 col3.metric("Taxa de Retorno", f"{return_rate:.1f}%")
-col4.metric("Compras Totais", df_vendas_agrupado.shape[0])
+col4.metric("Compras Totais", int(resumo["ComprasTotais"].iloc[0]))
 
 st.markdown("---")
 
@@ -67,20 +73,18 @@ st.markdown("---")
 st.markdown("### 📋 Perfil dos Clientes")
 
 df_clientes = df_clientes.sort_values("total_vendas", ascending=False)
-df_clientes["total_vendas_fmt"] = df_clientes["total_vendas"].map(formatar_moeda_brasileira)
-df_clientes["ticket_medio_fmt"] = df_clientes["ticket_medio"].map(formatar_moeda_brasileira)
 
 df_display = df_clientes.rename(columns={
     "Cliente": "Cliente",
-    "total_vendas_fmt": "Total Vendido",
+    "total_vendas": "Total Vendido",
     "num_compras": "Compras",
-    "ticket_medio_fmt": "Ticket Médio",
+    "ticket_medio": "Ticket Médio",
     "itens_totais": "Itens Totais"
 })[
     ["Cliente", "Total Vendido", "Compras", "Ticket Médio", "Itens Totais"]
 ]
 
-st.dataframe(df_display, use_container_width=True)
+exibir_tabela(df_display, moeda=["Total Vendido", "Ticket Médio"])
 
 # ---------------- GRÁFICO TOP CLIENTES ----------------
 
@@ -106,4 +110,93 @@ chart = (
     .properties(height=400, title=f"Top {top_n} Clientes por Valor Vendido")
 )
 
-st.altair_chart(chart, use_container_width=True)
+st.altair_chart(chart, width="stretch")
+
+# ---------------- COORTES ----------------
+
+st.markdown("---")
+st.markdown("### 🧭 Retenção por Coorte")
+st.caption("Clientes agrupados pelo mês da primeira compra: fração da coorte que voltou a comprar em cada mês seguinte.")
+
+df_coortes = calcular("coortes", analise.calcular_coortes)
+
+if df_coortes.empty:
+    st.info("Nenhuma compra disponível para montar as coortes.")
+else:
+    colunas_meses = [c for c in df_coortes.columns if c not in ("Coorte", "Clientes")]
+    df_retencao = df_coortes[["Coorte", "Clientes"]].join(
+        df_coortes[colunas_meses].div(df_coortes["Clientes"], axis=0)
+    )
+    df_retencao[colunas_meses] = df_retencao[colunas_meses].where(df_coortes[colunas_meses] > 0)
+
+    mapa_retencao = (
+        alt.Chart(
+            df_retencao.melt(id_vars=["Coorte", "Clientes"], var_name="Meses", value_name="Retencao")
+            .dropna(subset=["Retencao"])
+            .astype({"Meses": int})
+        )
+        .mark_rect()
+        .encode(
+            x=alt.X("Meses:O", title="Meses desde a primeira compra"),
+            y=alt.Y("Coorte:O", title="Coorte"),
+            color=alt.Color("Retencao:Q", scale=alt.Scale(scheme="blues"), legend=alt.Legend(format="%")),
+            tooltip=[
+                alt.Tooltip("Coorte"),
+                alt.Tooltip("Meses:O", title="Meses desde"),
+                alt.Tooltip("Clientes:Q", title="Clientes na coorte"),
+                alt.Tooltip("Retencao:Q", title="Retenção", format=".1%")
+            ]
+        )
+        .properties(height=max(200, 18 * len(df_retencao)))
+    )
+    st.altair_chart(mapa_retencao, width="stretch")
+
+    with st.expander("Tabela de retenção"):
+        exibir_tabela(df_retencao, percentual=colunas_meses, hide_index=True)
+
+# ---------------- INTERVALO ENTRE COMPRAS ----------------
+
+st.markdown("### ⏱️ Intervalo entre Compras")
+
+df_intervalos = calcular("intervalos", analise.calcular_intervalos_compras)
+grafico_intervalos = (
+    alt.Chart(df_intervalos)
+    .mark_bar()
+    .encode(
+        x=alt.X("Faixa:N", sort=None, title="Dias entre compras consecutivas"),
+        y=alt.Y("Intervalos:Q", title="Compras"),
+        tooltip=[
+            alt.Tooltip("Faixa"),
+            alt.Tooltip("Intervalos:Q", title="Compras"),
+            alt.Tooltip("Percentual:Q", format=".1%")
+        ]
+    )
+    .properties(height=300)
+)
+st.altair_chart(grafico_intervalos, width="stretch")
+
+# ---------------- RFM ----------------
+
+st.markdown("### 🏷️ Segmentação RFM")
+st.caption(
+    "Notas de 1 a 5 por quintil de recência (dias desde a última compra), frequência (compras) "
+    "e valor; os segmentos usam as notas de recência e frequência."
+)
+
+df_rfm = calcular("rfm", analise.calcular_rfm)
+resumo_rfm = (
+    df_rfm.groupby("Segmento", as_index=False)
+    .agg(Clientes=("Cliente", "size"), Valor=("Valor", "sum"), Recencia=("Recencia", "median"))
+    .sort_values("Valor", ascending=False, ignore_index=True)
+)
+
+col_resumo, col_segmento = st.columns([2, 3])
+with col_resumo:
+    exibir_tabela(resumo_rfm, moeda=["Valor"], hide_index=True)
+with col_segmento:
+    segmento = st.selectbox("Clientes do segmento:", resumo_rfm["Segmento"])
+    exibir_tabela(
+        df_rfm[df_rfm["Segmento"] == segmento].sort_values("Valor", ascending=False).head(1000),
+        moeda=["Valor"],
+        hide_index=True
+    )
@@ -4,53 +4,47 @@ from typing import Optional
 from utils.processamento import (
     carregar_df_cadastro,
     carregar_df_vendas,
+    consulta_filtrada,
     processa_df_venda_agrupado,
 )
-from utils.moeda import formatar_moeda_brasileira
-from utils.sessao import inicializar_app, validar_df
+import utils.analise as analise
+from utils.instrumentacao import cache_medido, medido
+from utils.precomputo import artefato_localizacao
+from utils.sessao import DadosVersionados, inicializar_app, obter_agregado, obter_dados, validar_df
+from utils.visualizacao import exibir_filtro_global, exibir_tabela
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
 st.set_page_config(page_title="Indicadores de Vendas", layout="wide")
 inicializar_app()
+exibir_filtro_global()
 st.title("📊 Indicadores de Vendas")
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-@st.cache_data
-def calcular_vendas_por_localizacao(df: pd.DataFrame, campo: str) -> pd.DataFrame:
-    """
-    Agrupa o número de vendas e o valor total por campo de localização (ex: Bairro).
-    """
-    if campo not in df.columns or "Controle" not in df.columns or "TotalVenda" not in df.columns:
-        print(f"⚠️ Campo '{campo}' não encontrado no DataFrame.")
-        return pd.DataFrame(columns=[campo, "Vendas", "ValorTotal"])
+@cache_medido
+def _calcular_vendas_por_localizacao(versao: str, _df: pd.DataFrame, campo: str) -> pd.DataFrame:
+    """Agrupa o número de vendas e o valor total por campo de localização (ex: Bairro)."""
+    return analise.calcular_vendas_por_localizacao(_df, campo)
 
-    df_filtrado = df.dropna(subset=[campo, "Controle", "TotalVenda"])
-    print(f"🔍 Agrupando por: {campo} (total de registros: {len(df_filtrado)})")
-
-    df_grouped = (
-        df_filtrado
-        .groupby(campo, as_index=False)
-        .agg(
-            Vendas=("Controle", "nunique"),
-            ValorTotal=("TotalVenda", "sum")
-        )
-        .sort_values("Vendas", ascending=False, ignore_index=True)
-    )
-
-    df_grouped["ValorTotalFormatado"] = df_grouped["ValorTotal"].map(formatar_moeda_brasileira)
-    return df_grouped
+@medido
+def calcular_vendas_por_localizacao(dados: DadosVersionados, campo: str) -> pd.DataFrame:
+    return _calcular_vendas_por_localizacao(dados.versao, dados.df, campo)
 
 # ---------------- CARREGAMENTO DE DADOS ----------------
 
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
-df_vendas_agrupado = validar_df("df_vendas_agrupado", processa_df_venda_agrupado)
+
+@medido
+def carregar_agrupado() -> DadosVersionados:
+    """Vendas por nota (com o filtro global); só usado se os agregados estiverem desatualizados."""
+    return obter_dados("df_vendas_agrupado", processa_df_venda_agrupado, consulta=consulta_filtrada("df_vendas_agrupado"))
 
 # ---------------- MÉTRICAS GERAIS ----------------
 
 st.subheader("📈 Métricas Gerais")
 
-media_itens = df_vendas_agrupado["QuantidadeItens"].mean() if "QuantidadeItens" in df_vendas_agrupado.columns else 0
+resumo = obter_agregado("resumo_vendas", lambda: analise.resumo_vendas(carregar_agrupado().df))
+media_itens = resumo["MediaItensPorVenda"].iloc[0]
 st.metric("🛍️ Itens por Venda (média)", f"{media_itens:.2f}")
 
 # ---------------- VENDAS POR LOCALIZAÇÃO ----------------
@@ -64,12 +58,12 @@ if not coluna_local:
     st.warning("⚠️ Nenhuma coluna relacionada a bairro ou local de entrega foi encontrada.")
 else:
     st.markdown(f"**Campo analisado:** `{coluna_local}`")
-    df_bairro = calcular_vendas_por_localizacao(df_vendas_agrupado, coluna_local)
+    df_bairro = obter_agregado(
+        artefato_localizacao(coluna_local),
+        lambda: calcular_vendas_por_localizacao(carregar_agrupado(), coluna_local)
+    )
 
     if df_bairro.empty:
         st.warning("⚠️ Não há dados suficientes para agrupar por esse campo.")
     else:
-        st.dataframe(
-            df_bairro[[coluna_local, "Vendas", "ValorTotalFormatado"]],
-            use_container_width=True
-        )
+        exibir_tabela(df_bairro[[coluna_local, "Vendas", "ValorTotal"]], moeda=["ValorTotal"])
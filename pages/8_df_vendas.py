@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 from utils.visualizacao import mostrar_paginado
-from utils.sessao import inicializar_app
+from utils.sessao import inicializar_app, obter_df
 from utils.processamento import carregar_df_vendas
+from utils.esquema import medir_memoria
 
 st.set_page_config(page_title="df_vendas", layout="wide")
 
@@ -10,11 +11,11 @@ inicializar_app()
 
 st.title("📋 DataFrame de Vendas (Original)")
 
-if "df_vendas" not in st.session_state:
+if obter_df("df_vendas") is None:
     carregar_df_vendas()
 
 # Verifica se o DataFrame está carregado
-df = st.session_state.get("df_vendas")
+df = obter_df("df_vendas")
 
 if not isinstance(df, pd.DataFrame) or df.empty:
     st.error("❌ O DataFrame 'df_vendas' não está disponível ou está vazio.")
@@ -23,5 +24,10 @@ if not isinstance(df, pd.DataFrame) or df.empty:
 # Aqui sim você pode tipar com segurança
 df_vendas: pd.DataFrame = df
 
+with st.expander("💾 Memória por coluna"):
+    memoria = medir_memoria(df_vendas)
+    st.caption(f"Total: {memoria['MB'].sum():.1f} MB")
+    st.dataframe(memoria, width="stretch")
+
 # Exibe o DataFrame paginado
 mostrar_paginado(df_vendas, "df_vendas")
@@ -1,28 +1,86 @@
 import streamlit as st
+import utils.consultas_duckdb as consultas_duckdb
+from utils.envio import limpar_envios, liberar_envio, salvar_envio
 from utils.sessao import salvar_caminhos
+from utils.processamento import atualizar_dados, carregar_df_cadastro, carregar_df_vendas
 from utils.constantes import CAMINHO_PADRAO_VENDAS, CAMINHO_PADRAO_CADASTRO
 from utils.sessao import inicializar_app
+from utils.registro import obter_registro
 
+st.set_page_config(page_title="Configurar Caminhos", layout="wide")
 inicializar_app()
 
-st.set_page_config(page_title="Configurar Caminhos", layout="wide")
 st.title("🗂️ Configuração de Caminhos de Arquivos")
 st.markdown("Use os campos abaixo para configurar os caminhos dos arquivos de dados.")
 
-caminho_vendas = st.text_input(
-    "📄 Caminho do Arquivo de Vendas",
-    value=st.session_state.get("caminho_vendas", CAMINHO_PADRAO_VENDAS)
-)
-caminho_cadastro = st.text_input(
-    "📦 Caminho do Arquivo de Cadastro",
-    value=st.session_state.get("caminho_cadastro", CAMINHO_PADRAO_CADASTRO)
-)
+modo = st.radio("Origem dos arquivos", ["Caminho no servidor", "Enviar arquivos"], horizontal=True)
+
+if modo == "Caminho no servidor":
+    caminho_vendas = st.text_input(
+        "📄 Caminho do Arquivo de Vendas",
+        value=st.session_state.get("caminho_vendas", CAMINHO_PADRAO_VENDAS),
+        help="Um arquivo CSV, um diretório com um CSV por período ou um padrão como dados/vendas_*.csv."
+    )
+    caminho_cadastro = st.text_input(
+        "📦 Caminho do Arquivo de Cadastro",
+        value=st.session_state.get("caminho_cadastro", CAMINHO_PADRAO_CADASTRO)
+    )
+
+    submit = st.button("💾 Salvar Caminhos")
 
-submit = st.button("💾 Salvar Caminhos")
+    if submit:
+        salvar_caminhos(caminho_vendas, caminho_cadastro)
+else:
+    # Trocar a chave limpa os campos depois de um envio concluído
+    geracao = st.session_state.get("geracao_envio", 0)
+    envio_vendas = st.file_uploader("📄 Arquivo de Vendas (CSV)", type="csv", key=f"envio_vendas_{geracao}")
+    envio_cadastro = st.file_uploader("📦 Arquivo de Cadastro (CSV)", type="csv", key=f"envio_cadastro_{geracao}")
+    st.caption("Um arquivo não enviado continua com o caminho atual.")
 
-if submit:
-    salvar_caminhos(caminho_vendas, caminho_cadastro)
+    if st.button("📤 Enviar e carregar", disabled=envio_vendas is None and envio_cadastro is None):
+        caminhos = {
+            "caminho_vendas": st.session_state.get("caminho_vendas"),
+            "caminho_cadastro": st.session_state.get("caminho_cadastro"),
+        }
+        espaco_progresso = st.empty()
+        for chave, envio in (("caminho_vendas", envio_vendas), ("caminho_cadastro", envio_cadastro)):
+            if envio is None:
+                continue
+            caminhos[chave] = salvar_envio(
+                envio, envio.name,
+                lambda fracao: espaco_progresso.progress(fracao, text=f"💾 Gravando {envio.name}... {fracao:.0%}")
+            )
+            liberar_envio(envio)
+        espaco_progresso.empty()
+        st.session_state["geracao_envio"] = geracao + 1
+
+        if salvar_caminhos(caminhos["caminho_vendas"], caminhos["caminho_cadastro"]):
+            # O CSV é lido do disco em blocos e convertido para o cache colunar
+            carregar_df_cadastro()
+            if not consultas_duckdb.usar_duckdb(caminhos["caminho_vendas"]):
+                carregar_df_vendas()
+            limpar_envios(caminhos.values())
+            st.success("✅ Arquivos enviados e carregados.")
+
+if st.button("🔄 Atualizar dados de vendas"):
+    if atualizar_dados():
+        st.success("✅ Dados de vendas atualizados.")
+    else:
+        st.info("O arquivo de vendas não mudou desde a última carga.")
 
 st.markdown("### 🔍 Caminhos atuais carregados")
 st.write(f"**Arquivo de Vendas:** `{st.session_state.get('caminho_vendas', CAMINHO_PADRAO_VENDAS)}`")
 st.write(f"**Arquivo de Cadastro:** `{st.session_state.get('caminho_cadastro', CAMINHO_PADRAO_CADASTRO)}`")
+
+
+st.markdown("### 🧠 Datasets em memória")
+registro = obter_registro()
+df_registro = registro.relatorio()
+if df_registro.empty:
+    st.info("Nenhum dataset carregado no momento.")
+else:
+    st.caption(
+        f"Total: {registro.memoria_total() / 1024 ** 2:.1f} MB "
+        f"de {registro.orcamento_bytes / 1024 ** 2:.0f} MB do orçamento."
+    )
+    st.dataframe(df_registro, width="stretch")
@@ -0,0 +1,29 @@
+# python precomputar.py [--vendas dados/NotasFW_ProdInfo.csv] [--cadastro dados/prodMercado.csv]
+
+import argparse
+import sys
+import time
+from utils.caminho import caminho_valido
+from utils.constantes import CAMINHO_PADRAO_VENDAS, CAMINHO_PADRAO_CADASTRO
+from utils.precomputo import precomputar
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Pré-calcula e grava em disco os agregados exibidos pelas páginas do dashboard."
+    )
+    parser.add_argument("--vendas", default=CAMINHO_PADRAO_VENDAS, help="Arquivo de vendas, diretório ou padrão glob de partições.")
+    parser.add_argument("--cadastro", default=CAMINHO_PADRAO_CADASTRO, help="Arquivo de cadastro de produtos.")
+    args = parser.parse_args()
+
+    for caminho in (args.vendas, args.cadastro):
+        if not caminho_valido(caminho):
+            print(f"❌ Arquivo não encontrado: {caminho}")
+            return 1
+
+    inicio = time.perf_counter()
+    pasta = precomputar(args.vendas, args.cadastro)
+    print(f"✅ Agregados gravados em '{pasta}' ({time.perf_counter() - inicio:.1f} s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
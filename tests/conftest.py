@@ -0,0 +1,19 @@
+import os
+import pytest
+
+CABECALHO_VENDAS = "Controle;Cliente;ProCod;Quantidade;TotalItem;Data;Bairro\n"
+
+@pytest.fixture
+def escrever_vendas(tmp_path):
+    """Grava (ou acrescenta) texto em um CSV de vendas e avança a data de modificação."""
+    def escrever(texto: str, nome: str = "vendas.csv", acrescentar: bool = False) -> str:
+        caminho = str(tmp_path / nome)
+        existia = os.path.exists(caminho)
+        with open(caminho, "a" if acrescentar else "w", encoding="utf-8", newline="") as f:
+            f.write(texto if acrescentar else CABECALHO_VENDAS + texto)
+        if existia:
+            # Garante uma assinatura nova mesmo com a resolução do relógio do sistema de arquivos
+            info = os.stat(caminho)
+            os.utime(caminho, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+        return caminho
+    return escrever
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.agrupamento_notas import (
+    agrupar_com_groupby,
+    agrupar_como_original,
+    comparar_com_original,
+    gerar_itens,
+    itens_como_original,
+)
+from utils.agregacao import construir_df_vendas_agrupado
+
+def _com_ausentes(df: pd.DataFrame, semente: int = 1) -> pd.DataFrame:
+    """Esvazia Cliente e Bairro em parte dos itens, inclusive no primeiro item de notas."""
+    rng = np.random.default_rng(semente)
+    return df.assign(
+        Cliente=df["Cliente"].astype("float64").mask(rng.random(len(df)) < 0.3),
+        Bairro=df["Bairro"].mask(rng.random(len(df)) < 0.3),
+    )
+
+@pytest.mark.parametrize("embaralhar", [False, True])
+def test_mesmo_resultado_do_groupby_first(embaralhar):
+    df = _com_ausentes(gerar_itens(5000))
+    if embaralhar:
+        df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        construir_df_vendas_agrupado(df), agrupar_com_groupby(df),
+        check_like=True, check_dtype=False, check_categorical=False
+    )
+
+def test_mesmo_resultado_do_agrupamento_original():
+    df = _com_ausentes(gerar_itens(5000)).sample(frac=1, random_state=0).reset_index(drop=True)
+    comparar_com_original(construir_df_vendas_agrupado(df), agrupar_como_original(itens_como_original(df)))
+
+def test_atributos_da_primeira_linha_com_valor():
+    df = pd.DataFrame({
+        "Controle": [2, 1, 2, 1, 3],
+        "Cliente": [np.nan, 10.0, 20.0, 11.0, np.nan],
+        "ProCod": [1, 2, 3, 4, 5],
+        "TotalItem": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "Bairro": pd.Categorical([None, "Norte", "Sul", "Centro", None]),
+        "ChaveData": [19000, 19001, 19000, 19001, 19002],
+    })
+    notas = construir_df_vendas_agrupado(df)
+    assert notas["Controle"].tolist() == [1, 2, 3]
+    assert notas["Cliente"].tolist()[:2] == [10.0, 20.0] and np.isnan(notas["Cliente"].iloc[2])
+    assert notas["Bairro"].tolist()[:2] == ["Norte", "Sul"] and pd.isna(notas["Bairro"].iloc[2])
+    assert notas["TotalVenda"].tolist() == [6.0, 4.0, 5.0]
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from utils.analise import FAIXAS_INTERVALO, calcular_coortes, calcular_intervalos_compras, calcular_rfm
+from utils.calendario import chave_data
+
+def _notas(linhas) -> pd.DataFrame:
+    """Notas (cliente, data, total), no formato de df_vendas_agrupado."""
+    clientes, datas, totais = zip(*linhas)
+    return pd.DataFrame({
+        "Cliente": pd.Series(clientes, dtype="float64"),
+        "ChaveData": chave_data(pd.to_datetime(list(datas))),
+        "TotalVenda": list(totais),
+    })
+
+def _notas_aleatorias(quantidade: int = 3000, semente: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    clientes = rng.integers(1, 200, quantidade).astype("float64")
+    clientes[rng.random(quantidade) < 0.1] = np.nan
+    return pd.DataFrame({
+        "Cliente": clientes,
+        "ChaveData": (19000 + rng.integers(0, 500, quantidade)).astype(np.int32),
+        "TotalVenda": rng.random(quantidade).round(2) * 100,
+    })
+
+NOTAS = [
+    (1, "2024-01-05", 10.0),
+    (1, "2024-01-20", 20.0),
+    (1, "2024-03-02", 30.0),
+    (2, "2024-02-10", 5.0),
+    (2, "2024-03-15", 5.0),
+    (3, "2024-01-31", 50.0),
+    (None, "2024-01-10", 99.0),
+]
+
+def test_coortes():
+    matriz = calcular_coortes(_notas(NOTAS))
+    assert matriz["Coorte"].tolist() == ["2024-01", "2024-02"]
+    assert matriz["Clientes"].tolist() == [2, 1]
+    assert matriz[["0", "1", "2"]].to_numpy().tolist() == [[2, 0, 1], [1, 1, 0]]
+
+def test_coortes_iguais_ao_groupby():
+    df = _notas_aleatorias()
+    com_cliente = df.dropna(subset=["Cliente"])
+    meses = pd.to_datetime(com_cliente["ChaveData"], unit="D").dt.to_period("M")
+    primeiro = meses.groupby(com_cliente["Cliente"]).transform("min")
+    desde = (meses - primeiro).apply(lambda d: d.n)
+    esperado = (
+        pd.DataFrame({"Coorte": primeiro.astype(str), "Desde": desde, "Cliente": com_cliente["Cliente"]})
+          .drop_duplicates()
+          .pivot_table(index="Coorte", columns="Desde", values="Cliente", aggfunc="count", fill_value=0)
+    )
+    matriz = calcular_coortes(df).set_index("Coorte")
+    assert matriz.index.tolist() == esperado.index.tolist()
+    assert matriz[[str(c) for c in esperado.columns]].to_numpy().tolist() == esperado.to_numpy().tolist()
+
+def test_coortes_sem_clientes():
+    assert calcular_coortes(_notas([(None, "2024-01-10", 1.0)])).empty
+
+def test_intervalos_compras():
+    intervalos = calcular_intervalos_compras(_notas(NOTAS)).set_index("Faixa")["Intervalos"]
+    # Cliente 1: 15 e 42 dias; cliente 2: 34 dias; cliente 3 e notas sem cliente não contam
+    assert intervalos["8 a 15 dias"] == 1
+    assert intervalos["31 a 60 dias"] == 2
+    assert intervalos.sum() == 3
+
+def test_intervalos_iguais_ao_groupby():
+    df = _notas_aleatorias().dropna(subset=["Cliente"])
+    dias = df.sort_values(["Cliente", "ChaveData"]).groupby("Cliente")["ChaveData"].diff().dropna()
+    limites = [-1] + [fim for _, fim, _ in FAIXAS_INTERVALO[:-1]] + [np.inf]
+    esperado = pd.cut(dias, limites, labels=[rotulo for _, _, rotulo in FAIXAS_INTERVALO]).value_counts(sort=False)
+
+    obtido = calcular_intervalos_compras(_notas_aleatorias()).set_index("Faixa")
+    assert obtido["Intervalos"].tolist() == esperado.tolist()
+    assert np.isclose(obtido["Percentual"].sum(), 1.0)
+
+def test_rfm_igual_ao_groupby():
+    df = _notas_aleatorias()
+    esperado = df.groupby("Cliente").agg(
+        Ultima=("ChaveData", "max"), Frequencia=("ChaveData", "count"), Valor=("TotalVenda", "sum")
+    )
+    rfm = calcular_rfm(df).set_index("Cliente")
+    assert rfm.index.tolist() == esperado.index.tolist()
+    assert (rfm["Recencia"] == df["ChaveData"].max() - esperado["Ultima"]).all()
+    assert (rfm["Frequencia"] == esperado["Frequencia"]).all()
+    assert np.allclose(rfm["Valor"], esperado["Valor"])
+    assert rfm[["R", "F", "M"]].isin(range(1, 6)).all().all()
+
+def test_rfm_segmentos():
+    rfm = calcular_rfm(_notas(NOTAS)).set_index("Cliente")
+    assert rfm.index.tolist() == [1.0, 2.0, 3.0]
+    assert rfm["Recencia"].tolist() == [13, 0, 44]
+    assert rfm["Frequencia"].tolist() == [3, 2, 1]
+    # Cliente 3: compra mais antiga e única, as piores notas de recência e frequência
+    assert rfm.loc[3.0, "Segmento"] == "Perdidos"
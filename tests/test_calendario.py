@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.calendario import (
+    COLUNAS_ROTULOS,
+    anexar_calendario,
+    calendario_para,
+    chave_data,
+    mes_da_chave,
+    rotulo_mes,
+)
+from utils.constantes import DIAS_SEMANA_PT
+
+@pytest.mark.parametrize("data", ["1970-01-01", "1969-12-31", "2024-02-29", "2024-12-31", "2038-01-20"])
+def test_chave_data_ida_e_volta(data):
+    chave = chave_data(pd.DatetimeIndex([data]))
+    assert chave.dtype == np.int32
+    assert pd.to_datetime(chave, unit="D")[0] == pd.Timestamp(data)
+
+def test_chave_data_ignora_o_horario():
+    chaves = chave_data(pd.Series(pd.to_datetime(["2024-03-10 00:00", "2024-03-10 23:59"])))
+    assert chaves.tolist() == [19792, 19792]
+
+def test_mes_da_chave_na_virada_do_mes_e_do_ano():
+    chaves = chave_data(pd.DatetimeIndex(["2023-12-31", "2024-01-01", "2024-01-31", "2024-02-01"]))
+    assert rotulo_mes(mes_da_chave(chaves)).tolist() == ["2023-12", "2024-01", "2024-01", "2024-02"]
+
+def _rotulos(datas: pd.DatetimeIndex) -> pd.DataFrame:
+    return anexar_calendario(pd.DataFrame({"ChaveData": chave_data(datas)}), COLUNAS_ROTULOS)
+
+def test_rotulos_iguais_aos_calculados_das_datas():
+    # Dois anos inteiros e a virada entre eles, como as colunas derivadas de 'Data' no pandas
+    datas = pd.date_range("2023-01-01", "2024-12-31", freq="D")
+    df = _rotulos(datas)
+    serie = pd.Series(datas)
+    esperado = {
+        "Ano": serie.dt.year,
+        "Semestre": serie.dt.month.map(lambda mes: "S1" if mes <= 6 else "S2"),
+        "Trimestre": serie.dt.to_period("Q").astype(str),
+        "MesPeriodo": serie.dt.to_period("M").astype(str),
+        "SemanaInicioDt": serie.dt.to_period("W").astype(str),
+        "Dia": serie.dt.strftime("%Y-%m-%d"),
+        "DiaSemana": serie.dt.day_name().map(DIAS_SEMANA_PT),
+    }
+    for coluna, valores in esperado.items():
+        assert df[coluna].astype(valores.dtype).tolist() == valores.tolist(), coluna
+
+def test_semana_vai_de_segunda_a_domingo():
+    # 2024-01-07 é domingo; 2024-01-08, segunda
+    df = _rotulos(pd.DatetimeIndex(["2024-01-01", "2024-01-07", "2024-01-08"]))
+    assert df["SemanaInicioDt"].tolist() == ["2024-01-01/2024-01-07"] * 2 + ["2024-01-08/2024-01-14"]
+    assert df["DiaSemana"].tolist() == ["segunda-feira", "domingo", "segunda-feira"]
+
+def test_semana_na_virada_do_ano_fica_com_o_ano_da_segunda():
+    df = _rotulos(pd.DatetimeIndex(["2024-12-30", "2025-01-01", "2025-01-05"]))
+    assert df["SemanaInicioDt"].nunique() == 1
+    assert df["SemanaInicioDt"].iloc[0] == "2024-12-30/2025-01-05"
+    assert df["Ano"].tolist() == [2024, 2025, 2025]
+
+def test_rotulos_categoricos_em_ordem_cronologica():
+    df = _rotulos(pd.DatetimeIndex(["2024-11-15", "2024-02-01", "2024-10-01"]))
+    assert df["MesPeriodo"].cat.ordered
+    assert df.sort_values("MesPeriodo")["MesPeriodo"].tolist() == ["2024-02", "2024-10", "2024-11"]
+    assert df.sort_values("Trimestre")["Trimestre"].tolist() == ["2024Q1", "2024Q4", "2024Q4"]
+
+def test_calendario_cobre_anos_inteiros():
+    calendario = calendario_para(chave_data(pd.DatetimeIndex(["2023-06-15", "2024-02-29"])))
+    assert len(calendario) == 365 + 366
+    assert calendario.index[0] == chave_data(pd.DatetimeIndex(["2023-01-01"]))[0]
+    assert calendario["ChaveMes"].iloc[-1] - calendario["ChaveMes"].iloc[0] == 23
@@ -0,0 +1,67 @@
+import os
+import pandas as pd
+import pytest
+import utils.leitura as leitura
+from benchmarks.gerador import gerar_vendas
+from utils.agregacao import construir_df_vendas_agrupado
+
+consultas_duckdb = pytest.importorskip("utils.consultas_duckdb")
+if consultas_duckdb.duckdb is None:
+    pytest.skip("DuckDB não instalado", allow_module_level=True)
+
+def _comparar(caminho: str) -> None:
+    obtido = consultas_duckdb.agrupar_notas(caminho)
+    esperado = construir_df_vendas_agrupado(leitura.ler_df_vendas(caminho))
+    pd.testing.assert_frame_equal(obtido, esperado, check_categorical=False, rtol=1e-9)
+
+def test_notas_iguais_ao_pandas_com_itens_divergentes(tmp_path):
+    caminho = str(tmp_path / "vendas.csv")
+    gerar_vendas(caminho, 20_000, fracao_divergente=0.1)
+    _comparar(caminho)  # DuckDB sobre o CSV
+    _comparar(caminho)  # DuckDB sobre o cache colunar gravado pelo pandas
+
+def test_notas_iguais_ao_pandas_com_particoes_em_cache_e_em_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(leitura, "PROCESSOS_LEITURA", 1)
+    pasta = tmp_path / "vendas"
+    pasta.mkdir()
+    for mes, semente in (("2024-01", 1), ("2024-02", 2)):
+        gerar_vendas(str(pasta / f"{mes}.csv"), 5_000, inicio=f"{mes}-01", dias=28,
+                     semente=semente, fracao_divergente=0.1)
+    leitura.ler_df_vendas(str(pasta))
+
+    # A segunda partição muda: o DuckDB lê a primeira do cache e a segunda do CSV
+    segunda = str(pasta / "2024-02.csv")
+    gerar_vendas(segunda, 6_000, inicio="2024-02-01", dias=28, semente=3, fracao_divergente=0.1)
+    info = os.stat(segunda)
+    os.utime(segunda, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    _comparar(str(pasta))
+
+CABECALHO = "Controle;Cliente;ProCod;Quantidade;TotalItem;Data;Bairro\n"
+
+def _gravar(tmp_path, linhas: list) -> str:
+    caminho = str(tmp_path / "vendas.csv")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(CABECALHO + "".join(linhas))
+    return caminho
+
+def test_poucas_datas_invalidas_descartadas_nos_dois_motores(tmp_path):
+    caminho = _gravar(tmp_path, [
+        "1;10;100;2;5.0;2024-01-02;Centro\n",
+        "2;11;101;1;3.0;lixo;Norte\n",
+        "3;12;102;4;8.0;2024-01-04;Centro\n",
+    ])
+    assert consultas_duckdb.agrupar_notas(caminho)["Controle"].tolist() == [1, 3]
+    _comparar(caminho)
+
+@pytest.mark.parametrize("linhas", [
+    # Maioria das datas fora do formato inferido da primeira
+    ["1;10;100;2;5.0;2024-01-02;Centro\n", "2;11;101;1;3.0;03/01/2024;Norte\n", "3;12;102;4;8.0;04/01/2024;Centro\n"],
+    # Valor numérico inválido
+    ["1;10;100;2;5.0;2024-01-02;Centro\n", "2;11;101;1;abc;2024-01-03;Norte\n"],
+])
+def test_arquivo_invalido_falha_nos_dois_motores(tmp_path, linhas):
+    caminho = _gravar(tmp_path, linhas)
+    with pytest.raises(ValueError):
+        consultas_duckdb.agrupar_notas(caminho)
+    with pytest.raises(ValueError):
+        leitura.ler_df_vendas(caminho)
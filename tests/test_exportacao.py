@@ -0,0 +1,67 @@
+import os
+import time
+import pandas as pd
+import pytest
+import utils.exportacao as exportacao
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(exportacao, "DIRETORIO_EXPORTACOES", str(tmp_path))
+    # Blocos pequenos: a gravação passa por vários blocos
+    monkeypatch.setattr(exportacao, "LINHAS_BLOCO_EXPORTACAO", 3)
+    return tmp_path
+
+def _df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Cliente": [1, 2, 3, 4, 5, 6, 7],
+        "TotalVenda": [10.5, 0.0, -3.25, 1e6, 2.0, 7.75, 0.01],
+        "Bairro": ["Centro", "Norte", "Centro", "Sul", "Norte", "Ão;ç", "Centro"],
+    })
+
+def test_csv_gzip_relido_igual(pasta):
+    caminho = exportacao.exportar(_df(), "clientes", "v1", "CSV (gzip)")
+    assert caminho.endswith("clientes_v1.csv.gz")
+    pd.testing.assert_frame_equal(pd.read_csv(caminho, compression="gzip"), _df())
+
+def test_parquet_relido_igual(pasta):
+    df = _df().astype({"Bairro": "category"})
+    caminho = exportacao.exportar(df, "clientes", "v1", "Parquet")
+    pd.testing.assert_frame_equal(pd.read_parquet(caminho), df)
+
+def test_dataframe_vazio_mantem_as_colunas(pasta):
+    caminho = exportacao.exportar(_df().iloc[:0], "clientes", "v1", "CSV (gzip)")
+    assert list(pd.read_csv(caminho, compression="gzip").columns) == list(_df().columns)
+
+def _gravar(pasta, arquivo: str, idade_s: float) -> str:
+    caminho = pasta / arquivo
+    caminho.write_bytes(b"x")
+    momento = time.time() - idade_s
+    os.utime(caminho, (momento, momento))
+    return str(caminho)
+
+def test_versoes_antigas_sem_uso_recente_removidas(pasta):
+    antiga = _gravar(pasta, "clientes_v1.csv.gz", exportacao.JANELA_USO_RECENTE_S + 60)
+    recente = _gravar(pasta, "clientes_v2.csv.gz", 0)
+    outro_formato = _gravar(pasta, "clientes_v1.parquet", exportacao.JANELA_USO_RECENTE_S + 60)
+    outro_dataset = _gravar(pasta, "clientes_rfm_v1.csv.gz", exportacao.JANELA_USO_RECENTE_S + 60)
+
+    exportacao.exportar(_df(), "clientes", "v3", "CSV (gzip)")
+    assert not os.path.exists(antiga)
+    assert all(os.path.exists(c) for c in (recente, outro_formato, outro_dataset))
+    assert not [arquivo for arquivo in os.listdir(pasta) if arquivo.endswith(".tmp")]
+
+def test_versao_existente_reaproveitada(pasta):
+    caminho = _gravar(pasta, "clientes_v1.csv.gz", exportacao.JANELA_USO_RECENTE_S + 60)
+    assert exportacao.exportar(_df(), "clientes", "v1", "CSV (gzip)") == caminho
+    # O uso renova a data de modificação: a exportação não é removida enquanto for pedida
+    assert os.path.getmtime(caminho) > time.time() - 60
+
+def test_falha_na_gravacao_nao_deixa_temporario(pasta, monkeypatch):
+    def falhar(df, destino, formato):
+        destino.write(b"parcial")
+        raise OSError("disco cheio")
+    monkeypatch.setattr(exportacao, "gravar_exportacao", falhar)
+
+    with pytest.raises(OSError):
+        exportacao.exportar(_df(), "clientes", "v1", "Parquet")
+    assert os.listdir(pasta) == []
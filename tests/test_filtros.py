@@ -0,0 +1,40 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from utils.calendario import chave_data
+from utils.esquema import aplicar_esquema_vendas
+from utils.filtros import FiltroGlobal, aplicar_filtro, montar_indice_datas
+
+def _vendas(clientes) -> pd.DataFrame:
+    datas = pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-01", "2024-01-04"])
+    return aplicar_esquema_vendas(pd.DataFrame({
+        "Controle": [1, 2, 3, 4, 5],
+        "Cliente": clientes,
+        "Bairro": ["Centro", "Norte", "Centro", "Sul", "Norte"],
+        "ChaveData": chave_data(datas),
+    }))
+
+def _filtrar(df: pd.DataFrame, filtro: FiltroGlobal) -> list:
+    return aplicar_filtro(df, filtro, montar_indice_datas(df))["Controle"].tolist()
+
+def test_periodo_mantem_a_ordem_original():
+    df = _vendas([10, 11, 12, 99999, 10])
+    filtro = FiltroGlobal(inicio=date(2024, 1, 1), fim=date(2024, 1, 2))
+    assert _filtrar(df, filtro) == [2, 3, 4]
+
+def test_bairros_e_clientes():
+    df = _vendas([10, 11, 12, 99999, 10])
+    assert _filtrar(df, FiltroGlobal(bairros=("Norte", "Inexistente"))) == [2, 5]
+    assert _filtrar(df, FiltroGlobal(clientes=(10, 12))) == [1, 3, 5]
+    assert _filtrar(df, FiltroGlobal(sem_nao_identificado=True)) == [1, 2, 3, 5]
+
+def test_clientes_com_cliente_ausente():
+    df = _vendas([10, np.nan, 12, 99999, 10])
+    assert df["Cliente"].dtype == "float64"
+    assert _filtrar(df, FiltroGlobal(clientes=(10, 12))) == [1, 3, 5]
+    assert _filtrar(df, FiltroGlobal(clientes=(10,), sem_nao_identificado=True)) == [1, 5]
+    assert _filtrar(df, FiltroGlobal(sem_nao_identificado=True)) == [1, 2, 3, 5]
+
+def test_clientes_so_com_cliente_ausente():
+    df = _vendas([np.nan] * 5)
+    assert _filtrar(df, FiltroGlobal(clientes=(10,))) == []
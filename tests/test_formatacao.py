@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.formatacao import formatar_moeda, formatar_numero, formatar_percentual
+from utils.moeda import formatar_moeda_brasileira
+
+VALORES = [
+    0.0, 1.0, -1.0, 0.1, -1234.5, 999.999, 1000.0, 1234567.891, -9876543.21,
+    # Meio da última casa: o arredondamento depende do valor binário exato
+    0.125, 0.375, 1.005, 2.675, 9.995, 19.945, -19.945, 1234.565, -0.005, 1e9 + 0.125,
+]
+
+def test_moeda_igual_ao_formatador_original():
+    obtido = formatar_moeda(pd.Series(VALORES)).tolist()
+    assert obtido == [formatar_moeda_brasileira(valor) for valor in VALORES]
+
+def test_moeda_igual_ao_formatador_original_nas_casas_de_meio():
+    valores = np.round(np.arange(-5000, 5000) / 1000, 3) + np.repeat([0, 1000, 10**7], [3334, 3333, 3333])
+    obtido = formatar_moeda(pd.Series(valores)).tolist()
+    assert obtido == [formatar_moeda_brasileira(float(valor)) for valor in valores]
+
+def test_ausentes_e_infinitos_viram_zero():
+    assert formatar_moeda(pd.Series([np.nan, None, np.inf])).tolist() == ["R$ 0,00"] * 3
+    assert formatar_moeda_brasileira(np.nan) == "R$ 0,00"
+
+def test_negativo_arredondado_para_zero_sem_sinal():
+    # Única diferença para o formatador original, que escreve "R$ -0,00"
+    assert formatar_moeda(pd.Series([-0.004])).tolist() == ["R$ 0,00"]
+
+@pytest.mark.parametrize("casas", [0, 1, 3])
+def test_numero_igual_ao_f_string(casas):
+    valores = [0.5, 1.5, 2.5, -2.5, 1234.5678, 1e6 + 0.05, -987654.3219]
+    esperado = [f"{valor:,.{casas}f}".replace(",", "X").replace(".", ",").replace("X", ".") for valor in valores]
+    assert formatar_numero(pd.Series(valores), casas).tolist() == esperado
+
+def test_percentual():
+    assert formatar_percentual(pd.Series([0.1234, -0.5, 1.0])).tolist() == ["12,3%", "-50,0%", "100,0%"]
+
+def test_mantem_o_indice():
+    valores = pd.Series([1.0, 2.0], index=[10, 20])
+    assert formatar_moeda(valores).index.tolist() == [10, 20]
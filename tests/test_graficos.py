@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+from utils.graficos import ROTULO_OUTROS, reduzir_para_grafico
+
+def _vendas(totais: dict) -> pd.DataFrame:
+    # Cada categoria em duas linhas, para o total vir de uma soma
+    return pd.DataFrame({
+        "Bairro": [bairro for bairro in totais for _ in range(2)],
+        "Total": [total / 2 for total in totais.values() for _ in range(2)],
+    })
+
+def test_k_maior_que_as_categorias_nao_cria_outros():
+    df = reduzir_para_grafico(_vendas({"A": 10, "B": 30, "C": 20}), "Bairro", ["Total"], top_k=10)
+    assert df.set_index("Bairro")["Total"].to_dict() == {"A": 10, "B": 30, "C": 20}
+
+def test_empate_no_corte_mantem_a_ordem_de_aparicao():
+    df = reduzir_para_grafico(_vendas({"A": 30, "B": 20, "C": 20, "D": 5}), "Bairro", ["Total"], top_k=2)
+    assert df.set_index("Bairro")["Total"].to_dict() == {"A": 30, "B": 20, ROTULO_OUTROS: 25}
+
+@pytest.mark.parametrize("top_k", [1, 2, 3])
+def test_outros_mais_as_k_maiores_somam_o_total(top_k):
+    original = _vendas({"A": 7.5, "B": 30, "C": 12.25, "D": 1, "E": 19})
+    df = reduzir_para_grafico(original, "Bairro", ["Total"], top_k=top_k)
+    assert len(df) == top_k + 1
+    assert df["Total"].sum() == pytest.approx(original["Total"].sum())
+
+def test_series_alem_do_orcamento_somadas_em_outros():
+    original = pd.DataFrame({
+        "Bairro": ["A", "B"] * 6,
+        "Mes": [mes for mes in range(6) for _ in range(2)],
+        "Total": range(12),
+    })
+    df = reduzir_para_grafico(original, "Bairro", ["Total"], top_k=2, serie="Mes", max_linhas=6)
+    assert len(df) <= 6
+    assert df["Total"].sum() == original["Total"].sum()
@@ -0,0 +1,95 @@
+import io
+import pandas as pd
+import pytest
+from utils.leitura import atualizar_df_vendas, ler_df_vendas
+
+CABECALHO = "Controle;Cliente;ProCod;Quantidade;TotalItem;Data;Bairro\n"
+LINHA_1 = "1;10;100;2;5.0;2024-01-02;Centro\n"
+LINHA_2 = "2;11;101;1;3.0;2024-01-03;Norte\n"
+LINHA_3 = "3;12;102;4;8.0;2024-01-04;Centro"
+
+def test_leitura_completa_mantem_ultima_linha_sem_quebra(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1 + LINHA_2 + LINHA_3)
+    assert atualizar_df_vendas(caminho).df["Controle"].tolist() == [1, 2, 3]
+
+def test_acrescimo_le_so_as_linhas_novas(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1)
+    atualizar_df_vendas(caminho)
+
+    escrever_vendas(LINHA_2, acrescentar=True)
+    atualizacao = atualizar_df_vendas(caminho)
+    assert atualizacao.novas_linhas["Controle"].tolist() == [2]
+    assert atualizacao.df["Controle"].tolist() == [1, 2]
+
+def test_acrescimo_sem_quebra_final_nao_perde_a_ultima_linha(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1)
+    atualizar_df_vendas(caminho)
+
+    escrever_vendas(LINHA_2 + LINHA_3, acrescentar=True)
+    assert atualizar_df_vendas(caminho).df["Controle"].tolist() == [1, 2, 3]
+    # A leitura seguinte vem do cache e precisa ter as mesmas linhas de uma leitura completa
+    atualizacao = atualizar_df_vendas(caminho)
+    assert atualizacao.novas_linhas is None
+    assert atualizacao.df["Controle"].tolist() == [1, 2, 3]
+
+def test_linhas_acrescentadas_depois_de_linha_sem_quebra(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1 + LINHA_3)
+    atualizar_df_vendas(caminho)
+
+    escrever_vendas("\n" + LINHA_2, acrescentar=True)
+    atualizacao = atualizar_df_vendas(caminho)
+    assert atualizacao.novas_linhas["Controle"].tolist() == [2]
+    assert atualizacao.df["Controle"].tolist() == [1, 3, 2]
+
+def test_ultima_linha_completada_forca_releitura(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1 + "2;11;101;1;3.0;2024-01-03;Nor")
+    assert atualizar_df_vendas(caminho).df["Bairro"].tolist() == ["Centro", "Nor"]
+
+    escrever_vendas("te\n", acrescentar=True)
+    atualizacao = atualizar_df_vendas(caminho)
+    assert atualizacao.novas_linhas is None
+    assert atualizacao.df["Bairro"].tolist() == ["Centro", "Norte"]
+
+def test_arquivo_regravado_e_relido(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1 + LINHA_2)
+    atualizar_df_vendas(caminho)
+
+    escrever_vendas(LINHA_2.replace("2;11", "9;11") + LINHA_1 + LINHA_3)
+    atualizacao = atualizar_df_vendas(caminho)
+    assert atualizacao.novas_linhas is None
+    assert atualizacao.df["Controle"].tolist() == [9, 1, 3]
+
+def test_buffer_de_texto_e_lido_como_bytes():
+    df = ler_df_vendas(io.StringIO(CABECALHO + LINHA_1 + LINHA_2))
+    assert df["Controle"].tolist() == [1, 2]
+    assert df["Bairro"].tolist() == ["Centro", "Norte"]
+
+def test_buffer_sem_coluna_data_falha_com_mensagem():
+    with pytest.raises(ValueError, match="Coluna 'Data'"):
+        ler_df_vendas(io.StringIO("a;b\n1;2\n"))
+
+def test_formato_dia_mes_e_inferido_da_primeira_data(escrever_vendas):
+    caminho = escrever_vendas("1;10;100;2;5.0;13/01/2024;Centro\n2;11;101;1;3.0;02/03/2024;Norte\n")
+    df = atualizar_df_vendas(caminho).df
+    assert pd.to_datetime(df["ChaveData"], unit="D").dt.strftime("%Y-%m-%d").tolist() == ["2024-01-13", "2024-03-02"]
+
+def test_acrescimo_mantem_o_formato_inferido_na_leitura_completa(escrever_vendas):
+    caminho = escrever_vendas("1;10;100;2;5.0;13/01/2024;Centro\n")
+    atualizar_df_vendas(caminho)
+
+    # Ambígua sozinha (seria 3 de fevereiro em %m/%d/%Y): segue o formato do arquivo
+    escrever_vendas("2;11;101;1;3.0;02/03/2024;Norte\n", acrescentar=True)
+    atualizacao = atualizar_df_vendas(caminho)
+    assert atualizacao.novas_linhas is not None
+    assert pd.to_datetime(atualizacao.df["ChaveData"], unit="D").dt.month.tolist() == [1, 3]
+
+def test_poucas_datas_invalidas_sao_descartadas(escrever_vendas):
+    caminho = escrever_vendas(LINHA_1 + LINHA_2.replace("2024-01-03", "lixo") + LINHA_3)
+    assert atualizar_df_vendas(caminho).df["Controle"].tolist() == [1, 3]
+
+def test_maioria_de_datas_invalidas_interrompe_a_leitura(escrever_vendas):
+    caminho = escrever_vendas(
+        LINHA_1 + LINHA_2.replace("2024-01-03", "03/01/2024") + LINHA_3.replace("2024-01-04", "04/01/2024")
+    )
+    with pytest.raises(ValueError, match="DASHBOARD_FORMATO_DATA"):
+        atualizar_df_vendas(caminho)
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+import utils.leitura as leitura
+from utils.calendario import chave_data
+from utils.leitura import ler_df_vendas
+
+def _periodo(inicio: str, fim: str) -> tuple:
+    chaves = chave_data(pd.to_datetime([inicio, fim]))
+    return int(chaves[0]), int(chaves[1])
+
+@pytest.fixture
+def particoes(escrever_vendas, tmp_path, monkeypatch):
+    # Partições lidas neste processo, para os testes poderem trocar funções do módulo
+    monkeypatch.setattr(leitura, "PROCESSOS_LEITURA", 1)
+    (tmp_path / "vendas").mkdir()
+    escrever_vendas("1;10;100;2;5.0;2024-01-02;Centro\n2;11;101;1;3.0;2024-01-20;Norte\n", "vendas/2024-01.csv")
+    escrever_vendas("3;12;102;4;8.0;2024-02-05;Centro\n", "vendas/2024-02.csv")
+    return str(tmp_path / "vendas")
+
+def test_particoes_concatenadas_em_ordem(particoes):
+    assert ler_df_vendas(particoes)["Controle"].tolist() == [1, 2, 3]
+    # Segunda leitura, pelo cache colunar de cada partição
+    assert ler_df_vendas(particoes)["Controle"].tolist() == [1, 2, 3]
+
+def test_periodo_descarta_particoes_fora_dele(particoes):
+    ler_df_vendas(particoes)
+    df = ler_df_vendas(particoes, periodo=_periodo("2024-02-01", "2024-02-28"))
+    assert df["Controle"].tolist() == [3]
+
+def test_periodo_sem_particoes(particoes):
+    esperado = ler_df_vendas(particoes).dtypes.astype(str)
+    df = ler_df_vendas(particoes, periodo=_periodo("2023-01-01", "2023-12-31"))
+    assert df.empty
+    pd.testing.assert_series_equal(df.dtypes.astype(str), esperado)
+
+def test_periodo_sem_particoes_e_sem_cache(particoes, monkeypatch):
+    monkeypatch.setattr(leitura, "gravar_cache", lambda *args, **kwargs: None)
+    df = ler_df_vendas(particoes, periodo=_periodo("2023-01-01", "2023-12-31"))
+    assert df.empty
+    assert "ChaveData" in df.columns
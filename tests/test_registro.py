@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+import utils.registro as registro_modulo
+from utils.registro import RegistroDatasets
+
+JANELA_S = 60
+ORIGEM = ("/dados/vendas.csv", 1000, 1)
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = SimpleNamespace(valor=1_000.0)
+    monkeypatch.setattr(registro_modulo, "time", SimpleNamespace(time=lambda: agora.valor))
+    return agora
+
+def _df() -> pd.DataFrame:
+    return pd.DataFrame({"Valor": np.arange(1_000, dtype=np.int64)})
+
+TAMANHO = int(_df().memory_usage(index=True, deep=True).sum())
+
+def _registro(datasets_no_orcamento: int) -> RegistroDatasets:
+    return RegistroDatasets(orcamento_bytes=datasets_no_orcamento * TAMANHO, janela_uso_recente_s=JANELA_S)
+
+def test_descarta_o_menos_recentemente_usado(relogio):
+    registro = _registro(2)
+    for nome in ("a", "b"):
+        registro.obter((nome,), _df)
+        relogio.valor += 100
+    registro.consultar(("a",))  # "a" passa a ser o mais recente
+    relogio.valor += 100
+
+    registro.obter(("c",), _df)
+    assert [registro.contem((nome,)) for nome in "abc"] == [True, False, True]
+
+def test_uso_recente_nao_e_descartado_mesmo_acima_do_orcamento(relogio, capsys):
+    registro = _registro(1)
+    registro.obter(("a",), _df)
+    relogio.valor += JANELA_S / 2
+
+    registro.obter(("b",), _df)
+    assert registro.contem(("a",)) and registro.contem(("b",))
+    assert "acima do orçamento" in capsys.readouterr().out
+
+    # Fora da janela, "a" pode sair; o dataset recém-construído nunca sai
+    relogio.valor += 2 * JANELA_S
+    registro.obter(("c",), _df)
+    assert [registro.contem((nome,)) for nome in "abc"] == [False, False, True]
+
+def test_dentro_do_orcamento_nada_e_descartado(relogio):
+    registro = _registro(3)
+    for nome in "abc":
+        registro.obter((nome,), _df)
+        relogio.valor += 100
+    assert all(registro.contem((nome,)) for nome in "abc")
+
+def test_descartar_origem_remove_derivados_em_cascata(relogio):
+    registro = RegistroDatasets(orcamento_bytes=10 * TAMANHO, janela_uso_recente_s=JANELA_S)
+    vendas = registro.obter(("df_vendas",) + ORIGEM, _df)
+    agrupado = registro.obter(("df_vendas_agrupado", vendas.versao), _df)
+    registro.obter(("filtrado", agrupado.versao, "filtro_123"), _df)
+    outra_origem = ("df_vendas", "/dados/outras.csv", 10, 2)
+    registro.obter(outra_origem, _df)
+    cadastro = registro.obter(("df_cadastro", "/dados/cadastro.csv", 5, 1), _df)
+
+    assert registro.descartar_origem(ORIGEM) == 3
+    assert registro.memoria_total() == 2 * TAMANHO
+    assert registro.contem(outra_origem) and registro.contem(cadastro.chave)
+
+def test_descartar_origem_sem_datasets_da_versao(relogio):
+    registro = _registro(2)
+    registro.obter(("df_vendas",) + ORIGEM, _df)
+    assert registro.descartar_origem(("/dados/vendas.csv", 1000, 2)) == 0
+    assert registro.contem(("df_vendas",) + ORIGEM)
@@ -0,0 +1,29 @@
+import os
+import utils.vigilancia as vigilancia
+
+def test_vendas_de_varios_pares_estendidas_uma_vez(tmp_path, monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(vigilancia, "atualizar_versao", lambda *args: chamadas.append(args))
+    monkeypatch.setattr(vigilancia, "INTERVALO_VIGILANCIA_S", 0)
+    monkeypatch.setattr(vigilancia, "_pares", set())
+    monkeypatch.setattr(vigilancia, "_assinaturas", {})
+    monkeypatch.setattr(vigilancia, "_alteracoes", {})
+
+    vendas = tmp_path / "vendas.csv"
+    vendas.write_text("Controle;Data\n")
+    cadastros = []
+    for nome in ("cadastro_a.csv", "cadastro_b.csv"):
+        cadastro = tmp_path / nome
+        cadastro.write_text("ProCod\n")
+        cadastros.append(str(cadastro))
+        vigilancia.vigiar(str(vendas), str(cadastro))
+
+    anterior = vigilancia._assinaturas[str(vendas)]
+    vendas.write_text("Controle;Data\n1;2024-01-02\n")
+    info = os.stat(vendas)
+    os.utime(vendas, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    assert vigilancia.verificar(str(vendas))
+
+    assert len(chamadas) == 1
+    caminho, cadastros_aquecidos, versao = chamadas[0]
+    assert (caminho, sorted(cadastros_aquecidos), versao) == (str(vendas), cadastros, anterior)
@@ -0,0 +1,304 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from utils.calendario import COLUNAS_ROTULOS, anexar_calendario, calendario_para
+from utils.esquema import concatenar_blocos
+
+# Atributos da nota, iguais em todos os itens: copiados da primeira linha de cada nota
+# (ou da primeira com valor, se a primeira não tiver, como no "first" do groupby)
+COLUNAS_CABECALHO_NOTA = ["Cliente", "ChaveData", "Bairro"]
+
+def _primeira_linha_por_codigo(codigos: np.ndarray) -> np.ndarray:
+    """
+    Posição da primeira linha de cada código, na ordem dos códigos.
+
+    Com códigos atribuídos por ordem de aparição (`pd.factorize`), a primeira linha do
+    código k é exatamente onde o maior código visto até ali passa a ser k.
+    """
+    maximo = np.maximum.accumulate(codigos)
+    primeira = np.empty(len(codigos), dtype=bool)
+    primeira[:1] = True
+    primeira[1:] = maximo[1:] != maximo[:-1]
+    return np.flatnonzero(primeira)
+
+def _primeira_valida_por_codigo(codigos: np.ndarray, validas: np.ndarray, quantidade: int) -> np.ndarray:
+    """Posição da primeira linha válida de cada código (0..quantidade-1), ou -1 se não houver."""
+    posicoes = np.flatnonzero(validas)
+    primeira = np.full(quantidade, -1, dtype=np.int64)
+    # Em atribuições repetidas prevalece a última: de trás para frente, fica a primeira posição
+    primeira[codigos[posicoes[::-1]]] = posicoes[::-1]
+    return primeira
+
+def _cabecalho_notas(df: pd.DataFrame, codigos: np.ndarray, primeiras: np.ndarray, ordem: Optional[np.ndarray]) -> pd.DataFrame:
+    """
+    Atributos de cada nota (COLUNAS_CABECALHO_NOTA), na ordem de `primeiras`. Uma coluna com
+    valores ausentes é lida, em cada nota, da primeira linha que tem valor.
+    """
+    colunas = [c for c in COLUNAS_CABECALHO_NOTA if c in df.columns]
+    cabecalho = df[colunas].take(primeiras).reset_index(drop=True)
+    for coluna in colunas:
+        validas = df[coluna].notna().to_numpy()
+        if validas.all():
+            continue
+        posicoes = _primeira_valida_por_codigo(codigos, validas, len(primeiras))
+        if ordem is not None:
+            posicoes = posicoes[ordem]
+        valores = df[coluna].take(np.maximum(posicoes, 0)).reset_index(drop=True)
+        cabecalho[coluna] = valores.where(posicoes >= 0)
+    return cabecalho
+
+def construir_df_vendas_agrupado(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta uma linha por nota (controle) a partir dos itens de venda.
+
+    Cada item recebe o código da sua nota (por trechos contíguos quando os itens já estão
+    ordenados por controle, ou por `pd.factorize` caso contrário) e as medidas aditivas são
+    somadas com `np.bincount`. Os atributos da nota vêm diretamente da sua primeira linha,
+    sem uma redução "first" por coluna (só as colunas com valores ausentes são buscadas
+    na primeira linha com valor); a data e os rótulos de período vêm do calendário.
+    """
+    controle = df["Controle"].to_numpy()
+    valores = df["TotalItem"].to_numpy(dtype="float64")
+    if np.isnan(valores).any():
+        valores = np.nan_to_num(valores)
+    com_produto = df["ProCod"].notna().to_numpy()
+
+    if len(controle) and (controle[1:] >= controle[:-1]).all():
+        # Itens já ordenados por controle (caso comum no arquivo do ERP): cada nota é um trecho
+        # contíguo e o código da nota é a contagem de inícios de trecho até a linha
+        inicio_nota = np.empty(len(controle), dtype=bool)
+        inicio_nota[0] = True
+        inicio_nota[1:] = controle[1:] != controle[:-1]
+        primeiras = np.flatnonzero(inicio_nota)
+        codigos = np.cumsum(inicio_nota) - 1
+        controles = controle[primeiras]
+        ordem = None
+    else:
+        codigos, controles = pd.factorize(controle)
+        if (codigos < 0).any():  # Itens sem controle não pertencem a nenhuma nota
+            validos = codigos >= 0
+            df, codigos, valores, com_produto = df[validos], codigos[validos], valores[validos], com_produto[validos]
+        primeiras = _primeira_linha_por_codigo(codigos)
+        # Mesma ordem do groupby: notas ordenadas pelo controle
+        ordem = np.argsort(controles, kind="stable")
+        controles, primeiras = np.asarray(controles)[ordem], primeiras[ordem]
+
+    quantidade_notas = len(controles)
+    total = np.bincount(codigos, weights=valores, minlength=quantidade_notas)
+    # Itens sem produto não contam na quantidade de itens da nota
+    itens = np.bincount(codigos if com_produto.all() else codigos[com_produto], minlength=quantidade_notas)
+    if ordem is not None:
+        total, itens = total[ordem], itens[ordem]
+
+    cabecalho = _cabecalho_notas(df, codigos, primeiras, ordem)
+
+    df_vendas_agrupado = pd.DataFrame({
+        "Cliente": cabecalho["Cliente"],
+        "TotalVenda": total,
+        "ChaveData": cabecalho["ChaveData"],
+        "QuantidadeItens": itens,
+        "Controle": controles,
+    })
+    if "Bairro" in cabecalho.columns:
+        df_vendas_agrupado["Bairro"] = cabecalho["Bairro"]
+
+    return anexar_calendario(df_vendas_agrupado, ["Data"] + COLUNAS_ROTULOS)
+
+# Níveis temporais do rollup: nome exibido -> (coluna do calendário, nome da coluna na tabela)
+NIVEIS_TEMPORAIS = {
+    "Ano": ("Ano", "Ano"),
+    "Semestre": ("Semestre", "Semestre"),
+    "Trimestre": ("Trimestre", "Trimestre"),
+    "Mês": ("MesPeriodo", "Mês"),
+    "Semana": ("SemanaInicioDt", "Semana"),
+    "Dia da Semana": ("DiaSemana", "DiaSemana"),
+    "Data": ("Dia", "Data"),
+}
+
+def atualizar_df_vendas_agrupado(
+    df_agrupado: pd.DataFrame,
+    df_vendas: pd.DataFrame,
+    novas_linhas: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Atualiza o agrupado por controle apenas para as notas presentes em `novas_linhas`.
+
+    Uma nota pode ter itens antes e depois da marca d'água, então todas as linhas das notas
+    afetadas são reagrupadas a partir de `df_vendas` (já com as linhas novas).
+    """
+    if novas_linhas.empty:
+        return df_agrupado
+
+    controles = novas_linhas["Controle"].unique()
+    notas_afetadas = construir_df_vendas_agrupado(df_vendas[df_vendas["Controle"].isin(controles)])
+    notas_mantidas = df_agrupado[~df_agrupado["Controle"].isin(controles)]
+
+    # Os rótulos são refeitos no final para manter as categorias do calendário consistentes
+    colunas_base = [c for c in notas_afetadas.columns if c not in ["Data"] + COLUNAS_ROTULOS]
+    df = concatenar_blocos([notas_mantidas[colunas_base], notas_afetadas[colunas_base]])
+    df = df.sort_values("Controle", ignore_index=True)
+    print(f"➕ {len(notas_afetadas)} notas atualizadas em df_vendas_agrupado.")
+
+    return anexar_calendario(df, ["Data"] + COLUNAS_ROTULOS)
+
+def montar_grao_dia_cliente(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduz as notas ao grão mais fino dos indicadores temporais: uma linha por dia e cliente,
+    com o total vendido e a quantidade de notas.
+
+    Notas sem cliente identificado formam a sua própria linha (Cliente nulo): entram nos
+    totais, mas não na contagem de clientes distintos.
+    """
+    return (
+        df.groupby(["ChaveData", "Cliente"], dropna=False, sort=True)
+          .agg(TotalVenda=("TotalVenda", "sum"), QuantVendas=("Controle", "count"))
+          .reset_index()
+    )
+
+def _codigos_nivel(calendario: pd.DataFrame, coluna: str) -> Tuple[np.ndarray, pd.Index, object]:
+    """Código de cada dia do calendário no nível `coluna` e os valores correspondentes."""
+    origem = calendario[coluna]
+    if isinstance(origem.dtype, pd.CategoricalDtype):
+        return origem.cat.codes.to_numpy(), origem.cat.categories, origem.dtype
+    codigos, valores = pd.factorize(origem, sort=True)
+    return codigos, valores, origem.dtype
+
+def _legenda_meses_semana(
+    codigos_semana: np.ndarray,
+    calendario: pd.DataFrame,
+    posicoes: np.ndarray
+) -> pd.Series:
+    """
+    Meses (abreviados, em ordem alfabética) com vendas em cada semana, como "Jan" ou "Jan-Feb".
+
+    Uma semana cobre no máximo dois meses, então basta o menor e o maior código de mês
+    (as categorias de 'MesAbrev' já estão em ordem alfabética) entre os dias com vendas.
+    """
+    codigos_mes = calendario["MesAbrev"].cat.codes.to_numpy()[posicoes]
+    nomes_mes = calendario["MesAbrev"].cat.categories.to_numpy(dtype=object)
+
+    quantidade_semanas = codigos_semana.max() + 1 if len(codigos_semana) else 0
+    primeiro = np.full(quantidade_semanas, len(nomes_mes), dtype=np.int64)
+    ultimo = np.full(quantidade_semanas, -1, dtype=np.int64)
+    np.minimum.at(primeiro, codigos_semana, codigos_mes)
+    np.maximum.at(ultimo, codigos_semana, codigos_mes)
+
+    semanas = np.flatnonzero(ultimo >= 0)
+    primeiro, ultimo = primeiro[semanas], ultimo[semanas]
+    legenda = pd.Series(nomes_mes[primeiro])
+    dois_meses = primeiro != ultimo
+    legenda = np.where(dois_meses, legenda + "-" + pd.Series(nomes_mes[ultimo]), legenda)
+    return pd.Series(legenda, index=semanas)
+
+def agregar_niveis_temporais(grao: pd.DataFrame, niveis: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Agrega o grão dia × cliente em cada nível de NIVEIS_TEMPORAIS (padrão: todos).
+
+    Cada tabela tem o rótulo do período, TotalVenda, QuantClientes (distintos, exato),
+    QuantVendas, MediaPorCliente e MediaPorVenda; a semanal tem ainda a legenda 'Meses'.
+    Os códigos de período de cada dia vêm do calendário, e as somas e contagens são feitas
+    com `np.bincount` sobre o grão, sem um groupby por nível.
+    """
+    niveis = list(NIVEIS_TEMPORAIS) if niveis is None else niveis
+    calendario = calendario_para(grao["ChaveData"])
+    posicoes = grao["ChaveData"].to_numpy() - calendario.index[0]
+
+    total = grao["TotalVenda"].to_numpy(dtype="float64")
+    vendas = grao["QuantVendas"].to_numpy()
+    codigos_cliente, clientes = pd.factorize(grao["Cliente"])
+    identificado = codigos_cliente >= 0
+    quantidade_clientes = max(len(clientes), 1)
+
+    tabelas = {}
+    for nivel in niveis:
+        coluna, nome_coluna = NIVEIS_TEMPORAIS[nivel]
+        codigos_dia, valores, tipo = _codigos_nivel(calendario, coluna)
+        codigos = codigos_dia[posicoes]
+        quantidade_niveis = len(valores)
+
+        soma = np.bincount(codigos, weights=total, minlength=quantidade_niveis)
+        quant_vendas = np.bincount(codigos, weights=vendas, minlength=quantidade_niveis).astype(np.int64)
+        # Clientes distintos: pares (período, cliente) únicos contados por período
+        pares = np.unique(codigos[identificado].astype(np.int64) * quantidade_clientes + codigos_cliente[identificado])
+        quant_clientes = np.bincount(pares // quantidade_clientes, minlength=quantidade_niveis)
+
+        presentes = np.flatnonzero(np.bincount(codigos, minlength=quantidade_niveis))
+        soma, quant_vendas, quant_clientes = soma[presentes], quant_vendas[presentes], quant_clientes[presentes]
+        if isinstance(tipo, pd.CategoricalDtype):
+            rotulos = pd.Categorical.from_codes(presentes, dtype=tipo)
+        else:
+            rotulos = np.asarray(valores)[presentes]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tabela = pd.DataFrame({
+                nome_coluna: rotulos,
+                "TotalVenda": soma,
+                "QuantClientes": quant_clientes,
+                "QuantVendas": quant_vendas,
+                "MediaPorCliente": soma / quant_clientes,
+                "MediaPorVenda": soma / quant_vendas,
+            })
+
+        if nivel == "Semana":
+            tabela["Meses"] = _legenda_meses_semana(codigos, calendario, posicoes).reindex(presentes).to_numpy()
+
+        tabelas[nivel] = tabela
+
+    return tabelas
+
+def montar_cubo_produto_dia(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduz os itens de venda a uma linha por produto e dia, com quantidade e faturamento.
+
+    É a base do giro de vendas: qualquer período do calendário é obtido somando os dias
+    do cubo, sem voltar aos itens.
+    """
+    return (
+        df_vendas.groupby(["ProCod", "ChaveData"], sort=True)
+                 .agg(Quantidade=("Quantidade", "sum"), TotalItem=("TotalItem", "sum"))
+                 .reset_index()
+    )
+
+def montar_indice_produtos(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Uma linha por produto vendido, em ordem de 'ProCod': primeira e última venda
+    ('ChaveData'), quantidade e faturamento totais. Responde às consultas de produtos
+    sem venda sem voltar aos itens.
+    """
+    return (
+        df_vendas.groupby("ProCod", sort=True)
+                 .agg(
+                     PrimeiraVenda=("ChaveData", "min"),
+                     UltimaVenda=("ChaveData", "max"),
+                     Quantidade=("Quantidade", "sum"),
+                     TotalItem=("TotalItem", "sum")
+                 )
+                 .reset_index()
+    )
+
+def agregar_cubo_por_periodo(cubo: pd.DataFrame, coluna: str, medidas: List[str]) -> pd.DataFrame:
+    """
+    Soma as `medidas` do cubo produto × dia por produto e período (`coluna` do calendário).
+
+    Retorna 'Periodo' (com o tipo da coluna do calendário), 'ProCod' e as medidas, ordenado
+    por período e produto.
+    """
+    calendario = calendario_para(cubo["ChaveData"])
+    posicoes = cubo["ChaveData"].to_numpy() - calendario.index[0]
+    codigos_dia, valores, tipo = _codigos_nivel(calendario, coluna)
+
+    agregado = (
+        cubo[["ProCod"] + medidas]
+            .assign(CodigoPeriodo=codigos_dia[posicoes])
+            .groupby(["CodigoPeriodo", "ProCod"], sort=True)[medidas]
+            .sum()
+            .reset_index()
+    )
+
+    codigos = agregado.pop("CodigoPeriodo").to_numpy()
+    if isinstance(tipo, pd.CategoricalDtype):
+        periodo = pd.Categorical.from_codes(codigos, dtype=tipo)
+    else:
+        periodo = np.asarray(valores)[codigos]
+    agregado.insert(0, "Periodo", periodo)
+    return agregado
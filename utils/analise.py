@@ -0,0 +1,290 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Tuple
+from utils.agregacao import NIVEIS_TEMPORAIS, agregar_cubo_por_periodo, agregar_niveis_temporais
+from utils.calendario import COLUNA_POR_PERIODO, chave_data, mes_da_chave, rotulo_mes
+
+# Cálculos das páginas, sem dependência do Streamlit: as páginas os envolvem com
+# `st.cache_data` e convertem os ValueError em mensagens de erro.
+
+def calcular_vendas_agrupadas(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    if not {"ProCod", "Quantidade", "TotalItem"}.issubset(df_vendas.columns):
+        raise ValueError("Colunas necessárias não estão presentes no DataFrame.")
+    return df_vendas.groupby("ProCod")[["Quantidade", "TotalItem"]].sum().reset_index()
+
+def adicionar_nomes_produtos(df_vendidos: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.DataFrame:
+    return pd.merge(df_vendidos, df_cadastro, on="ProCod", how="left")
+
+def agrupar_tabelas_temporais(grao: pd.DataFrame) -> Tuple[pd.DataFrame, ...]:
+    """Agrupa dados por variações temporais padrão, a partir do grão dia × cliente."""
+    return tuple(agregar_niveis_temporais(grao, list(NIVEIS_TEMPORAIS)).values())
+
+def preparar_produtos(df_vendas: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.DataFrame:
+    """Totais por produto, com o nome, a partir dos itens ou do cubo produto × dia."""
+    df = calcular_vendas_agrupadas(df_vendas)
+    df = adicionar_nomes_produtos(df, df_cadastro)
+    df = df.rename(columns={"ProNom": "Produto"})
+    return df.sort_values(by="TotalItem", ascending=False)
+
+def detalhar_giro_vendas(cubo: pd.DataFrame, df_cadastro: pd.DataFrame, periodo: str) -> pd.DataFrame:
+    """
+    Quantidade vendida por período e produto, a partir do cubo produto × dia
+    (`montar_cubo_produto_dia`). Os nomes dos produtos entram só no resultado agregado.
+    """
+    if "Quantidade" not in cubo.columns:
+        raise ValueError("Coluna 'Quantidade' não encontrada no DataFrame de vendas.")
+
+    if "ChaveData" not in cubo.columns:
+        raise ValueError("Coluna 'ChaveData' não encontrada no DataFrame de vendas.")
+
+    if periodo not in COLUNA_POR_PERIODO:
+        raise ValueError("Período inválido selecionado.")
+
+    # Rótulo do período vindo da dimensão de calendário (mesmas semanas da página de indicadores)
+    df = agregar_cubo_por_periodo(cubo, COLUNA_POR_PERIODO[periodo], ["Quantidade"])
+
+    # Merge com nome do produto
+    df = df.merge(df_cadastro[["ProCod", "ProNom"]], how="left", on="ProCod")
+    df = df.rename(columns={"ProNom": "Produto"})
+
+    # Verificações
+    if "Produto" not in df.columns or df["Produto"].isna().all():
+        raise ValueError("Coluna 'Produto' não existe ou está totalmente vazia após o merge.")
+
+    # Produtos com o mesmo nome são somados juntos, como na agregação por item
+    df_grouped = (
+        df.groupby(["Periodo", "Produto"], observed=True)
+          .agg(Quantidade=("Quantidade", "sum"))
+          .reset_index()
+    )
+
+    return df_grouped
+
+def calcular_metricas_clientes(df_vendas_agrupado: pd.DataFrame) -> Tuple[int, int, pd.DataFrame]:
+    """
+    Calcula estatísticas relacionadas aos clientes:
+    - Total de clientes
+    - Quantos retornaram (mais de uma compra)
+    - DataFrame com métricas por cliente
+    """
+    df_group = df_vendas_agrupado.groupby("Cliente").agg(
+        total_vendas=("TotalVenda", "sum"),
+        num_compras=("Data", "count"),
+        itens_totais=("QuantidadeItens", "sum")
+    ).reset_index()
+
+    df_group["ticket_medio"] = df_group["total_vendas"] / df_group["num_compras"]
+
+    total_customers = df_group.shape[0]
+    returning_customers = df_group[df_group["num_compras"] > 1].shape[0]
+
+    return total_customers, returning_customers, df_group
+
+def _codigos_clientes(df_vendas_agrupado: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Código sequencial (0..n-1, na ordem dos clientes) de cada nota com cliente, os clientes
+    e a máscara dessas notas. Notas sem cliente ficam de fora, como no `groupby("Cliente")`.
+    """
+    codigos, clientes = pd.factorize(df_vendas_agrupado["Cliente"], sort=True)
+    com_cliente = codigos >= 0
+    return codigos[com_cliente], np.asarray(clientes), com_cliente
+
+def calcular_coortes(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """
+    Matriz de coortes: uma linha por mês da primeira compra ('Coorte', com o tamanho em
+    'Clientes') e uma coluna por meses desde a primeira compra ("0", "1", ...), com quantos
+    clientes da coorte compraram naquele mês.
+    """
+    codigos, clientes, com_cliente = _codigos_clientes(df_vendas_agrupado)
+    if not len(codigos):
+        return pd.DataFrame(columns=["Coorte", "Clientes"])
+    meses = mes_da_chave(df_vendas_agrupado["ChaveData"])[com_cliente]
+
+    primeiro_mes = np.full(len(clientes), np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(primeiro_mes, codigos, meses)
+    desde = meses - primeiro_mes[codigos]
+
+    # Cada cliente conta uma vez por mês: pares (cliente, meses desde) distintos
+    largura = int(desde.max()) + 1
+    pares = np.unique(codigos.astype(np.int64) * largura + desde)
+    cliente_par, desde_par = np.divmod(pares, largura)
+
+    coortes, coorte_par = np.unique(primeiro_mes[cliente_par], return_inverse=True)
+    contagem = np.bincount(coorte_par * largura + desde_par, minlength=len(coortes) * largura)
+
+    matriz = pd.DataFrame(contagem.reshape(len(coortes), largura), columns=[str(m) for m in range(largura)])
+    matriz.insert(0, "Clientes", matriz["0"])
+    matriz.insert(0, "Coorte", rotulo_mes(coortes))
+    return matriz
+
+FAIXAS_INTERVALO = [
+    (0, 7, "até 7 dias"),
+    (8, 15, "8 a 15 dias"),
+    (16, 30, "16 a 30 dias"),
+    (31, 60, "31 a 60 dias"),
+    (61, 90, "61 a 90 dias"),
+    (91, 180, "91 a 180 dias"),
+    (181, 365, "181 a 365 dias"),
+    (366, None, "mais de 1 ano"),
+]
+
+def calcular_intervalos_compras(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """Distribuição dos dias entre compras consecutivas de um mesmo cliente, por faixa."""
+    codigos, _, com_cliente = _codigos_clientes(df_vendas_agrupado)
+    chaves = df_vendas_agrupado["ChaveData"].to_numpy()[com_cliente]
+
+    ordem = np.lexsort((chaves, codigos))
+    codigos, chaves = codigos[ordem], chaves[ordem]
+    mesmo_cliente = codigos[1:] == codigos[:-1]
+    intervalos = (chaves[1:] - chaves[:-1])[mesmo_cliente]
+
+    limites = [fim for _, fim, _ in FAIXAS_INTERVALO[:-1]]
+    faixas = np.searchsorted(limites, intervalos, side="left")
+    contagem = np.bincount(faixas, minlength=len(FAIXAS_INTERVALO))
+    total = contagem.sum()
+    return pd.DataFrame({
+        "Faixa": pd.Categorical(
+            [rotulo for _, _, rotulo in FAIXAS_INTERVALO],
+            categories=[rotulo for _, _, rotulo in FAIXAS_INTERVALO],
+            ordered=True
+        ),
+        "Intervalos": contagem,
+        "Percentual": contagem / total if total else 0.0,
+    })
+
+# Segmentos RFM pelas notas de recência (R) e frequência (F), na ordem de prioridade
+SEGMENTOS_RFM = [
+    ("Campeões", lambda r, f: (r >= 4) & (f >= 4)),
+    ("Leais", lambda r, f: (r >= 3) & (f >= 3)),
+    ("Novos", lambda r, f: (r >= 4) & (f <= 2)),
+    ("Em risco", lambda r, f: (r <= 2) & (f >= 3)),
+    ("Perdidos", lambda r, f: (r <= 2) & (f <= 2)),
+]
+
+def _nota_quintil(valores: pd.Series) -> np.ndarray:
+    """Nota de 1 a 5 pelo quintil do valor (valores iguais recebem a mesma nota)."""
+    posicao = valores.rank(method="average", pct=True).to_numpy()
+    return np.ceil(posicao * 5).clip(1, 5).astype(np.int8)
+
+def calcular_rfm(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """
+    Recência (dias desde a última compra até o último dia dos dados), frequência (notas)
+    e valor por cliente, com notas de 1 a 5 por quintil e o segmento.
+    """
+    codigos, clientes, com_cliente = _codigos_clientes(df_vendas_agrupado)
+    todas_chaves = df_vendas_agrupado["ChaveData"].to_numpy()
+    chaves = todas_chaves[com_cliente]
+    valores = df_vendas_agrupado["TotalVenda"].to_numpy()[com_cliente]
+    total_clientes = len(clientes)
+
+    ultima = np.full(total_clientes, np.iinfo(np.int32).min, dtype=np.int32)
+    np.maximum.at(ultima, codigos, chaves)
+    rfm = pd.DataFrame({
+        "Cliente": clientes,
+        "Recencia": todas_chaves.max() - ultima if len(todas_chaves) else ultima,
+        "Frequencia": np.bincount(codigos, minlength=total_clientes),
+        "Valor": np.bincount(codigos, weights=valores, minlength=total_clientes),
+    })
+
+    rfm["R"] = 6 - _nota_quintil(rfm["Recencia"])
+    rfm["F"] = _nota_quintil(rfm["Frequencia"])
+    rfm["M"] = _nota_quintil(rfm["Valor"])
+    rfm["Segmento"] = np.select(
+        [condicao(rfm["R"], rfm["F"]) for _, condicao in SEGMENTOS_RFM],
+        [nome for nome, _ in SEGMENTOS_RFM],
+        default="Regulares"
+    )
+    return rfm
+
+def calcular_vendas_por_localizacao(df: pd.DataFrame, campo: str) -> pd.DataFrame:
+    """
+    Agrupa o número de vendas e o valor total por campo de localização (ex: Bairro).
+    """
+    if campo not in df.columns or "Controle" not in df.columns or "TotalVenda" not in df.columns:
+        print(f"⚠️ Campo '{campo}' não encontrado no DataFrame.")
+        return pd.DataFrame(columns=[campo, "Vendas", "ValorTotal"])
+
+    df_filtrado = df.dropna(subset=[campo, "Controle", "TotalVenda"])
+    print(f"🔍 Agrupando por: {campo} (total de registros: {len(df_filtrado)})")
+
+    df_grouped = (
+        df_filtrado
+        .groupby(campo, as_index=False, observed=True)
+        .agg(
+            Vendas=("Controle", "nunique"),
+            ValorTotal=("TotalVenda", "sum")
+        )
+        .sort_values("Vendas", ascending=False, ignore_index=True)
+    )
+
+    return df_grouped
+
+def obter_produtos_nao_vendidos(
+    indice_produtos: pd.DataFrame,
+    df_cadastro: pd.DataFrame
+) -> pd.DataFrame:
+    """Retorna os produtos do cadastro que não aparecem nas vendas (`montar_indice_produtos`)."""
+    return df_cadastro[~df_cadastro["ProCod"].isin(indice_produtos["ProCod"])]
+
+def _com_ultima_venda(df_cadastro: pd.DataFrame, indice_produtos: pd.DataFrame) -> pd.DataFrame:
+    """Cadastro com a data da última venda de cada produto (vazia se nunca vendido)."""
+    ultima = df_cadastro["ProCod"].map(indice_produtos.set_index("ProCod")["UltimaVenda"])
+    return df_cadastro.assign(UltimaVenda=pd.to_datetime(ultima, unit="D"))
+
+def produtos_sem_venda_desde(
+    indice_produtos: pd.DataFrame,
+    df_cadastro: pd.DataFrame,
+    desde: date
+) -> pd.DataFrame:
+    """Produtos do cadastro sem nenhuma venda a partir de `desde` (inclusive), com a última venda."""
+    df = _com_ultima_venda(df_cadastro, indice_produtos)
+    return df[~(df["UltimaVenda"] >= pd.Timestamp(desde))]
+
+def produtos_sem_venda_no_periodo(
+    indice_produtos: pd.DataFrame,
+    cubo: pd.DataFrame,
+    df_cadastro: pd.DataFrame,
+    inicio: date,
+    fim: date
+) -> pd.DataFrame:
+    """
+    Produtos do cadastro sem venda entre `inicio` e `fim` (inclusive), com a última venda.
+
+    O índice descarta os produtos cuja primeira venda é posterior ao período ou cuja última
+    é anterior; só os demais são conferidos nos dias do cubo produto × dia.
+    """
+    chave_inicio, chave_fim = chave_data(pd.DatetimeIndex([inicio, fim]))
+    possiveis = indice_produtos.loc[
+        (indice_produtos["PrimeiraVenda"] <= chave_fim) & (indice_produtos["UltimaVenda"] >= chave_inicio),
+        "ProCod"
+    ]
+    dias = cubo["ChaveData"]
+    no_periodo = cubo.loc[(dias >= chave_inicio) & (dias <= chave_fim), "ProCod"]
+    vendidos = no_periodo[no_periodo.isin(possiveis)].unique()
+
+    df = _com_ultima_venda(df_cadastro, indice_produtos)
+    return df[~df["ProCod"].isin(vendidos)]
+
+def resumo_indicadores(grao: pd.DataFrame) -> pd.DataFrame:
+    """KPIs da página de indicadores, em uma linha: clientes distintos e total vendido."""
+    return pd.DataFrame({
+        "TotalClientes": [grao["Cliente"].nunique()],
+        "TotalVendas": [grao["TotalVenda"].sum()],
+    })
+
+def resumo_clientes(df_vendas_agrupado: pd.DataFrame, df_clientes: pd.DataFrame) -> pd.DataFrame:
+    """KPIs da página de clientes, em uma linha, a partir das métricas por cliente."""
+    return pd.DataFrame({
+        "Clientes": [df_clientes.shape[0]],
+        "ClientesRetornaram": [int((df_clientes["num_compras"] > 1).sum())],
+        "ComprasTotais": [df_vendas_agrupado.shape[0]],
+    })
+
+def resumo_vendas(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """Métricas gerais da página de vendas, em uma linha."""
+    media_itens = (
+        df_vendas_agrupado["QuantidadeItens"].mean()
+        if "QuantidadeItens" in df_vendas_agrupado.columns else 0
+    )
+    return pd.DataFrame({"MediaItensPorVenda": [media_itens]})
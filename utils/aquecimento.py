@@ -0,0 +1,210 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import utils.consultas_duckdb as consultas_duckdb
+from utils.agregacao import atualizar_df_vendas_agrupado, construir_df_vendas_agrupado, montar_grao_dia_cliente
+from utils.artefatos import Origens, ler_artefato
+from utils.caminho import assinatura_arquivo, caminho_particionado, caminho_valido
+from utils.constantes import AQUECIMENTO, THREADS_AQUECIMENTO
+from utils.instrumentacao import medir, registrar_cache
+from utils.leitura import atualizar_df_vendas, ler_df_cadastro, ler_df_vendas
+from utils.registro import ChaveDataset, obter_registro
+
+# Aquecimento dos datasets em segundo plano. Quando uma sessão abre, o cadastro e as vendas
+# são lidos ao mesmo tempo em threads, e as notas agrupadas e o grão dia × cliente são
+# montados logo depois das vendas. Tudo vai direto para o registro do processo, com as
+# mesmas chaves e construtores das páginas. Uma página que pede um dataset ainda em
+# construção espera só por ele e mostra o andamento (`carga_em_andamento`).
+
+@dataclass
+class Carga:
+    """Andamento de uma sequência de construções em segundo plano."""
+    etapa: str
+    fracao: float = 0.0
+    terminada: bool = False
+
+_executor = ThreadPoolExecutor(max_workers=THREADS_AQUECIMENTO, thread_name_prefix="aquecimento")
+_cargas: Dict[ChaveDataset, Carga] = {}
+_trava = threading.Lock()
+
+def artefato_ou(nome: str, construir: Callable[[], pd.DataFrame], origens: Origens) -> Callable[[], pd.DataFrame]:
+    """Construtor que usa o agregado pré-calculado `nome`, se atualizado, ou `construir`."""
+    def construtor() -> pd.DataFrame:
+        df = ler_artefato(origens, nome)
+        registrar_cache("artefato", nome, acerto=df is not None)
+        if df is not None:
+            print(f"⚡ Agregado pré-calculado utilizado para '{nome}'.")
+            return df
+        return construir()
+    return construtor
+
+def construtor_agrupado(
+    caminho: str,
+    origens: Origens,
+    vendas: Callable[[], pd.DataFrame]
+) -> Callable[[], pd.DataFrame]:
+    """
+    Construtor de 'df_vendas_agrupado': o agregado em disco, se atualizado; senão o DuckDB
+    ou o agrupamento de `vendas()`, que só é chamada se for mesmo preciso ler os itens.
+    """
+    def construir() -> pd.DataFrame:
+        if consultas_duckdb.usar_duckdb(caminho):
+            return consultas_duckdb.agrupar_notas(caminho)
+        return construir_df_vendas_agrupado(vendas())
+    return artefato_ou("df_vendas_agrupado", construir, origens)
+
+def construtor_grao(
+    caminho: str,
+    origens: Origens,
+    agrupado: Callable[[], pd.DataFrame]
+) -> Callable[[], pd.DataFrame]:
+    """Construtor de 'grao_dia_cliente', como `construtor_agrupado`, a partir de `agrupado()`."""
+    def construir() -> pd.DataFrame:
+        if consultas_duckdb.usar_duckdb(caminho):
+            return consultas_duckdb.montar_grao_dia_cliente(caminho)
+        return montar_grao_dia_cliente(agrupado())
+    return artefato_ou("grao_dia_cliente", construir, origens)
+
+def carga_em_andamento(chave: ChaveDataset) -> Optional[Carga]:
+    """Carga em segundo plano que vai registrar `chave`, se ainda estiver rodando."""
+    with _trava:
+        carga = _cargas.get(chave)
+    if carga is None or carga.terminada:
+        return None
+    return carga
+
+def _reservar(chaves: Dict[str, ChaveDataset], carga: Carga) -> bool:
+    """
+    Associa `carga` às chaves que ainda não estão registradas. Não reserva nada se alguma
+    delas já estiver em construção: as etapas de uma sequência dependem umas das outras.
+    """
+    registro = obter_registro()
+    with _trava:
+        if any(chave in _cargas and not _cargas[chave].terminada for chave in chaves.values()):
+            return False
+        pendentes = [chave for chave in chaves.values() if not registro.contem(chave)]
+        for chave in pendentes:
+            _cargas[chave] = carga
+    return bool(pendentes)
+
+def _executar(carga: Carga, passos: Callable[[], None]) -> None:
+    try:
+        passos()
+    except Exception as e:
+        # A página que pedir o dataset tenta de novo e mostra o erro
+        print(f"⚠️ Falha no aquecimento ({carga.etapa}): {e}")
+    finally:
+        carga.terminada = True
+
+def aquecer(caminho_vendas: Optional[str], caminho_cadastro: Optional[str], sessao: Optional[str] = None) -> None:
+    """
+    Começa a carregar, em segundo plano, os datasets usados pela maioria das páginas: o
+    cadastro em paralelo com as vendas, seguidas das notas agrupadas e do grão dia × cliente.
+    Não faz nada se o aquecimento estiver desligado, se algum caminho for inválido ou se os
+    datasets já estiverem registrados ou em construção.
+    """
+    if not AQUECIMENTO or not caminho_valido(caminho_vendas) or not caminho_valido(caminho_cadastro):
+        return
+
+    registro = obter_registro()
+    origens = {"vendas": caminho_vendas, "cadastro": caminho_cadastro}
+    identidade_vendas = assinatura_arquivo(caminho_vendas)
+    chave_cadastro = ("df_cadastro",) + assinatura_arquivo(caminho_cadastro)
+    chaves_vendas = {
+        nome: (nome,) + identidade_vendas for nome in ("df_vendas", "df_vendas_agrupado", "grao_dia_cliente")
+    }
+
+    def obter(chave: ChaveDataset, construtor: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        with medir(f"aquecer:{chave[0]}"):
+            return registro.obter(chave, construtor, sessao=sessao).df
+
+    carga_cadastro = Carga("Lendo o cadastro de produtos...")
+    if _reservar({"df_cadastro": chave_cadastro}, carga_cadastro):
+        _executor.submit(
+            _executar, carga_cadastro, lambda: obter(chave_cadastro, lambda: ler_df_cadastro(caminho_cadastro))
+        )
+
+    carga_vendas = Carga("Preparando as vendas...")
+
+    def progresso(fracao: float) -> None:
+        carga_vendas.etapa = f"Lendo arquivo de vendas... {fracao:.0%}"
+        carga_vendas.fracao = fracao
+
+    def vendas() -> pd.DataFrame:
+        df = obter(chaves_vendas["df_vendas"], lambda: ler_df_vendas(caminho_vendas, progresso))
+        carga_vendas.etapa, carga_vendas.fracao = "Agrupando as vendas por nota...", 1.0
+        return df
+
+    def passos_vendas() -> None:
+        # df_vendas só é lido se o agrupado não vier do disco nem do DuckDB
+        agrupado = obter(chaves_vendas["df_vendas_agrupado"], construtor_agrupado(caminho_vendas, origens, vendas))
+        carga_vendas.etapa, carga_vendas.fracao = "Montando o grão dia × cliente...", 1.0
+        obter(chaves_vendas["grao_dia_cliente"], construtor_grao(caminho_vendas, origens, lambda: agrupado))
+
+    if _reservar(chaves_vendas, carga_vendas):
+        _executor.submit(_executar, carga_vendas, passos_vendas)
+        print(f"🔥 Aquecimento iniciado para '{caminho_vendas}'.")
+
+def atualizar_versao(
+    caminho_vendas: str,
+    caminhos_cadastro: List[Optional[str]],
+    anterior: Tuple
+) -> None:
+    """
+    Troca no registro a versão `anterior` (assinatura) do arquivo de vendas pela atual.
+
+    Se a versão anterior de 'df_vendas' estiver em memória, ela é estendida como em
+    `atualizar_dados`: num arquivo só acrescido, só as linhas novas são lidas e só as notas
+    afetadas são reagrupadas. A versão anterior só sai do registro depois disso; o restante
+    é montado pelo aquecimento, para cada cadastro usado com essas vendas.
+    """
+    registro = obter_registro()
+    identidade = assinatura_arquivo(caminho_vendas)
+    vendas_anterior = registro.consultar(("df_vendas",) + anterior)
+    chaves = {nome: (nome,) + identidade for nome in ("df_vendas", "df_vendas_agrupado")}
+
+    carga = Carga("Atualizando as vendas...")
+    if vendas_anterior is None or caminho_particionado(caminho_vendas) or not _reservar(chaves, carga):
+        registro.descartar_origem(anterior)
+        for caminho_cadastro in caminhos_cadastro:
+            aquecer(caminho_vendas, caminho_cadastro)
+        return
+
+    def progresso(fracao: float) -> None:
+        carga.etapa = f"Lendo as linhas novas de vendas... {fracao:.0%}"
+        carga.fracao = fracao
+
+    def estender() -> None:
+        atualizacoes = []
+
+        def construir() -> pd.DataFrame:
+            atualizacao = atualizar_df_vendas(caminho_vendas, anterior=(anterior, vendas_anterior.df), progresso=progresso)
+            atualizacoes.append(atualizacao)
+            return atualizacao.df
+
+        with medir("atualizar:df_vendas"):
+            df_vendas = registro.obter(chaves["df_vendas"], construir).df
+        agrupado_anterior = registro.consultar(("df_vendas_agrupado",) + anterior)
+        if agrupado_anterior is not None and atualizacoes and atualizacoes[0].novas_linhas is not None:
+            novas_linhas = atualizacoes[0].novas_linhas
+            carga.etapa, carga.fracao = "Atualizando as notas afetadas...", 1.0
+            with medir("atualizar:df_vendas_agrupado"):
+                registro.obter(
+                    chaves["df_vendas_agrupado"],
+                    lambda: atualizar_df_vendas_agrupado(agrupado_anterior.df, df_vendas, novas_linhas)
+                )
+
+    def passos() -> None:
+        try:
+            estender()
+        finally:
+            registro.descartar_origem(anterior)
+        # Libera as chaves para o aquecimento montar o que falta
+        carga.terminada = True
+        for caminho_cadastro in caminhos_cadastro:
+            aquecer(caminho_vendas, caminho_cadastro)
+
+    _executor.submit(_executar, carga, passos)
+    print(f"🔄 Atualizando '{caminho_vendas}' a partir da versão anterior.")
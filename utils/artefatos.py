@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from utils.caminho import assinatura_arquivo, caminho_valido
+from utils.cache_colunar import (
+    ARQUIVO_MANIFESTO,
+    diretorio_cache,
+    gravar_manifesto,
+    gravar_parte,
+    identidade_arquivo,
+)
+from utils.constantes import VERSAO_ARTEFATOS
+
+# Agregados pré-calculados (ver `precomputar.py`), gravados em Parquet ao lado do cache
+# colunar do arquivo de vendas. Cada agregado registra de quais arquivos de origem depende
+# ("vendas", "cadastro") e só é lido enquanto todos eles estiverem inalterados.
+
+Origens = Dict[str, str]
+
+def diretorio_artefatos(caminho_vendas: str) -> str:
+    return os.path.join(diretorio_cache(caminho_vendas), "artefatos")
+
+def ler_manifesto_artefatos(caminho_vendas: str) -> Optional[dict]:
+    """Retorna o manifesto dos agregados, ou None se não existir ou for de outra versão."""
+    try:
+        with open(os.path.join(diretorio_artefatos(caminho_vendas), ARQUIVO_MANIFESTO), encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifesto if manifesto.get("versao") == VERSAO_ARTEFATOS else None
+
+def _origens_atualizadas(manifesto: dict, origens: Origens, dependencias: List[str]) -> bool:
+    for dependencia in dependencias:
+        caminho = origens.get(dependencia)
+        if not caminho_valido(caminho):
+            return False
+        if manifesto["origens"].get(dependencia) != identidade_arquivo(assinatura_arquivo(caminho)):
+            return False
+    return True
+
+def ler_artefato(origens: Origens, nome: str) -> Optional[pd.DataFrame]:
+    """
+    Lê o agregado `nome` calculado para os arquivos em `origens` ({"vendas": ..., "cadastro": ...}).
+
+    Retorna None se o agregado não existir ou se algum arquivo de que ele depende mudou
+    desde o pré-cálculo; nesse caso, a página calcula o agregado na hora.
+    """
+    manifesto = ler_manifesto_artefatos(origens["vendas"])
+    if manifesto is None or nome not in manifesto["artefatos"]:
+        return None
+
+    artefato = manifesto["artefatos"][nome]
+    if not _origens_atualizadas(manifesto, origens, artefato["dependencias"]):
+        return None
+
+    try:
+        return pd.read_parquet(os.path.join(diretorio_artefatos(origens["vendas"]), artefato["arquivo"]))
+    except Exception as e:
+        print(f"⚠️ Agregado '{nome}' ilegível: {e}")
+        return None
+
+def gravar_artefatos(
+    origens: Origens,
+    assinaturas: Dict[str, Tuple[str, int, int]],
+    artefatos: Dict[str, Tuple[pd.DataFrame, List[str]]]
+) -> str:
+    """
+    Grava os agregados `artefatos` ({nome: (DataFrame, dependências)}) e o manifesto.
+
+    `assinaturas` devem ser as dos arquivos de origem no momento em que foram lidos.
+    O manifesto anterior é removido antes e o novo gravado por último, então uma gravação
+    interrompida nunca deixa agregados desatualizados com aparência de válidos.
+    Retorna o diretório dos agregados.
+    """
+    pasta = diretorio_artefatos(origens["vendas"])
+    os.makedirs(pasta, exist_ok=True)
+    destino_manifesto = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    if os.path.exists(destino_manifesto):
+        os.remove(destino_manifesto)
+
+    registrados = {}
+    for nome, (df, dependencias) in artefatos.items():
+        arquivo = f"{nome}.parquet"
+        gravar_parte(pasta, arquivo, df)
+        registrados[nome] = {"arquivo": arquivo, "dependencias": dependencias, "linhas": len(df)}
+
+    gravar_manifesto(pasta, {
+        "versao": VERSAO_ARTEFATOS,
+        "criado_em": time.time(),
+        "origens": {nome: identidade_arquivo(assinatura) for nome, assinatura in assinaturas.items()},
+        "artefatos": registrados,
+    })
+    return pasta
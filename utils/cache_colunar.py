@@ -0,0 +1,167 @@
+import json
+import os
+from typing import List, Optional, Tuple
+import pandas as pd
+from utils.caminho import CARACTERES_GLOB, assinatura_arquivo
+from utils.constantes import DIRETORIO_CACHE, VERSAO_CACHE
+from utils.esquema import concatenar_blocos
+
+ARQUIVO_DADOS = "dados.parquet"
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+# Acima deste número de incrementos, o cache é regravado em uma única parte
+MAXIMO_PARTES = 24
+
+def diretorio_cache(caminho: str) -> str:
+    """Retorna o diretório do cache colunar de um arquivo (`.cache/<nome>` ao lado da origem)."""
+    pasta, nome = os.path.split(os.path.abspath(caminho))
+    # Padrões glob de partições viram um nome de diretório válido
+    for caractere in CARACTERES_GLOB + "]":
+        nome = nome.replace(caractere, "_")
+    return os.path.join(pasta, DIRETORIO_CACHE, nome)
+
+def identidade_arquivo(assinatura: Tuple[str, int, int]) -> dict:
+    """Campos do manifesto que identificam a versão do arquivo de origem e do formato."""
+    origem, tamanho, modificado_ns = assinatura
+    return {
+        "origem": origem,
+        "tamanho": tamanho,
+        "modificado_ns": modificado_ns,
+        "versao": VERSAO_CACHE,
+    }
+
+def ler_manifesto(caminho: str) -> Optional[dict]:
+    """Retorna o manifesto do cache de `caminho`, mesmo que desatualizado, ou None se não existir."""
+    try:
+        with open(os.path.join(diretorio_cache(caminho), ARQUIVO_MANIFESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def manifesto_atualizado(caminho: str, manifesto: Optional[dict]) -> bool:
+    """Indica se o manifesto corresponde à versão atual do arquivo de origem."""
+    if manifesto is None:
+        return False
+    atual = identidade_arquivo(assinatura_arquivo(caminho))
+    return all(manifesto.get(campo) == valor for campo, valor in atual.items())
+
+def manifesto_compativel(caminho: str, manifesto: Optional[dict]) -> bool:
+    """Indica se o manifesto é do mesmo arquivo e da versão atual do formato, mesmo que desatualizado."""
+    return (
+        manifesto is not None
+        and manifesto.get("origem") == os.path.abspath(caminho)
+        and manifesto.get("versao") == VERSAO_CACHE
+    )
+
+def intervalo_datas(df: pd.DataFrame) -> dict:
+    """Menor e maior 'ChaveData' de `df`, guardados no manifesto para ignorar partições fora de um período."""
+    if df.empty or "ChaveData" not in df.columns:
+        return {}
+    return {"chave_min": int(df["ChaveData"].min()), "chave_max": int(df["ChaveData"].max())}
+
+def manifesto_no_periodo(manifesto: dict, periodo: Optional[Tuple[int, int]]) -> bool:
+    """Indica se o arquivo do manifesto pode ter linhas no período (chaves inclusivas); sem intervalo gravado, sim."""
+    if periodo is None or "chave_min" not in manifesto:
+        return True
+    inicio, fim = periodo
+    return manifesto["chave_min"] <= fim and manifesto["chave_max"] >= inicio
+
+def ler_partes(caminho: str, manifesto: dict) -> Optional[pd.DataFrame]:
+    """Lê e concatena as partes Parquet listadas no manifesto."""
+    pasta = diretorio_cache(caminho)
+    try:
+        partes = [pd.read_parquet(os.path.join(pasta, parte)) for parte in manifesto["partes"]]
+    except Exception as e:
+        print(f"⚠️ Cache colunar ilegível para '{caminho}': {e}")
+        return None
+    return partes[0] if len(partes) == 1 else concatenar_blocos(partes)
+
+def ler_cache(caminho: str) -> Optional[pd.DataFrame]:
+    """
+    Lê o DataFrame em cache para o arquivo `caminho`.
+
+    Retorna None se não houver cache ou se o arquivo de origem mudou desde a gravação.
+    """
+    manifesto = ler_manifesto(caminho)
+    if not manifesto_atualizado(caminho, manifesto):
+        return None
+    return ler_partes(caminho, manifesto)
+
+def gravar_manifesto(pasta: str, manifesto: dict) -> None:
+    """Grava o manifesto de forma atômica (arquivo temporário + `os.replace`)."""
+    destino = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    temporario = destino + f".tmp{os.getpid()}"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f)
+    os.replace(temporario, destino)
+
+def gravar_parte(pasta: str, nome: str, df: pd.DataFrame) -> None:
+    """Grava `df` em Parquet como `pasta/nome`, de forma atômica."""
+    destino = os.path.join(pasta, nome)
+    temporario = destino + f".tmp{os.getpid()}"
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, destino)
+
+def gravar_cache(
+    caminho: str,
+    df: pd.DataFrame,
+    assinatura: Optional[Tuple[str, int, int]] = None,
+    extras: Optional[dict] = None
+) -> None:
+    """
+    Grava o DataFrame processado no cache colunar do arquivo `caminho`.
+
+    `assinatura` deve ser a do arquivo no momento em que a leitura começou (padrão: a atual);
+    `extras` são campos adicionais guardados no manifesto.
+    """
+    pasta = diretorio_cache(caminho)
+    destino_manifesto = os.path.join(pasta, ARQUIVO_MANIFESTO)
+
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        manifesto = identidade_arquivo(assinatura or assinatura_arquivo(caminho))
+        manifesto.update(extras or {})
+        manifesto["partes"] = [ARQUIVO_DADOS]
+
+        # O manifesto é gravado por último: um cache sem manifesto válido nunca é lido
+        if os.path.exists(destino_manifesto):
+            os.remove(destino_manifesto)
+        for antiga in os.listdir(pasta):
+            if antiga.startswith("incremento-"):
+                os.remove(os.path.join(pasta, antiga))
+        gravar_parte(pasta, ARQUIVO_DADOS, df)
+        gravar_manifesto(pasta, manifesto)
+    except Exception as e:
+        print(f"⚠️ Não foi possível gravar o cache colunar de '{caminho}': {e}")
+
+def anexar_cache(
+    caminho: str,
+    df_incremento: pd.DataFrame,
+    manifesto: dict,
+    assinatura: Tuple[str, int, int],
+    extras: Optional[dict] = None
+) -> bool:
+    """
+    Acrescenta `df_incremento` como uma nova parte do cache descrito por `manifesto`.
+
+    Retorna False se o cache já tiver partes demais e precisar ser regravado por inteiro.
+    """
+    pasta = diretorio_cache(caminho)
+    partes: List[str] = list(manifesto["partes"])
+    if len(partes) >= MAXIMO_PARTES:
+        return False
+
+    try:
+        if len(df_incremento):
+            nome = f"incremento-{len(partes):04d}.parquet"
+            gravar_parte(pasta, nome, df_incremento)
+            partes.append(nome)
+
+        novo = dict(manifesto)
+        novo.update(identidade_arquivo(assinatura))
+        novo.update(extras or {})
+        novo["partes"] = partes
+        gravar_manifesto(pasta, novo)
+    except Exception as e:
+        print(f"⚠️ Não foi possível atualizar o cache colunar de '{caminho}': {e}")
+    return True
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Iterable, List, Optional, Union
+from utils.constantes import DIAS_SEMANA_PT
+
+ORDEM_DIAS_SEMANA: List[str] = list(DIAS_SEMANA_PT.values())
+
+# Coluna do calendário usada para cada opção de período exibida nas páginas
+COLUNA_POR_PERIODO = {
+    "Ano": "Ano",
+    "Semestre": "AnoSemestre",
+    "Trimestre": "Trimestre",
+    "Mês": "MesPeriodo",
+    "Semana": "SemanaInicioDt",
+    "Dia da Semana": "DiaSemana",
+    "Data": "Dia",
+}
+
+# Rótulos copiados para df_vendas_agrupado
+COLUNAS_ROTULOS = ["Ano", "Semestre", "Trimestre", "MesPeriodo", "SemanaInicioDt", "Dia", "DiaSemana"]
+
+def chave_data(datas: Union[pd.Series, pd.DatetimeIndex]) -> np.ndarray:
+    """Converte datas em chaves inteiras (dias desde 1970-01-01), usadas nas linhas de venda."""
+    return np.asarray(datas, dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int32)
+
+def mes_da_chave(chaves: Union[pd.Series, np.ndarray]) -> np.ndarray:
+    """Converte chaves de data em códigos inteiros de mês (meses desde 1970-01)."""
+    return np.asarray(chaves).astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+
+def rotulo_mes(codigos: np.ndarray) -> np.ndarray:
+    """Rótulo "AAAA-MM" de códigos de mês de `mes_da_chave`."""
+    return np.datetime_as_string(np.asarray(codigos, dtype=np.int64).astype("datetime64[M]"), unit="M")
+
+def _categoria_ordenada(valores: Iterable, categorias: Optional[List[str]] = None) -> pd.Categorical:
+    valores = np.asarray(valores)
+    if categorias is None:
+        # Rótulos em formato ISO (ex.: "2024Q1", "2024-01"): a ordem lexical é a cronológica
+        categorias = sorted(set(valores))
+    return pd.Categorical(valores, categories=categorias, ordered=True)
+
+@lru_cache(maxsize=16)
+def _calendario_anos(ano_inicio: int, ano_fim: int) -> pd.DataFrame:
+    datas = pd.date_range(f"{ano_inicio}-01-01", f"{ano_fim}-12-31", freq="D")
+    chaves = chave_data(datas)
+    ano = datas.year.to_numpy()
+    mes = datas.month.to_numpy()
+
+    calendario = pd.DataFrame(index=pd.Index(chaves, name="ChaveData"))
+    calendario["Data"] = datas
+    calendario["Ano"] = ano.astype(np.int16)
+    calendario["Semestre"] = _categoria_ordenada(np.where(mes <= 6, "S1", "S2"), ["S1", "S2"])
+    calendario["AnoSemestre"] = _categoria_ordenada(
+        pd.Index(ano.astype(str)) + " - S" + pd.Index(((mes - 1) // 6 + 1).astype(str))
+    )
+    calendario["Trimestre"] = _categoria_ordenada(datas.to_period("Q").astype(str))
+    calendario["MesPeriodo"] = _categoria_ordenada(datas.to_period("M").astype(str))
+    calendario["MesAbrev"] = pd.Categorical(datas.strftime("%b"))
+    # Semanas de segunda a domingo, rotuladas como "início/fim"
+    calendario["SemanaInicioDt"] = _categoria_ordenada(datas.to_period("W").astype(str))
+    calendario["Dia"] = _categoria_ordenada(datas.strftime("%Y-%m-%d"))
+    calendario["DiaSemana"] = _categoria_ordenada(
+        datas.day_name().map(DIAS_SEMANA_PT), ORDEM_DIAS_SEMANA
+    )
+
+    # Chaves inteiras para ordenação e aritmética de períodos
+    calendario["ChaveMes"] = (ano * 12 + mes - 1).astype(np.int32)
+    calendario["ChaveSemana"] = (chaves - datas.dayofweek.to_numpy()).astype(np.int32)
+
+    return calendario
+
+def calendario_para(chaves: Union[pd.Series, np.ndarray]) -> pd.DataFrame:
+    """
+    Retorna a dimensão de calendário que cobre as chaves de data informadas.
+
+    O calendário tem uma linha por dia (anos completos), indexada por 'ChaveData', com todos
+    os rótulos de período e chaves de ordenação. É compartilhado e não deve ser alterado.
+    """
+    chaves = np.asarray(chaves)
+    if len(chaves) == 0:
+        ano = pd.Timestamp.today().year
+        return _calendario_anos(ano, ano)
+
+    inicio, fim = pd.to_datetime([int(chaves.min()), int(chaves.max())], unit="D")
+    return _calendario_anos(inicio.year, fim.year)
+
+def rotulos_calendario(chaves: pd.Series, coluna: str, calendario: Optional[pd.DataFrame] = None) -> pd.Series:
+    """Busca, para cada chave de data, o valor de `coluna` no calendário (sem reprocessar datas)."""
+    if calendario is None:
+        calendario = calendario_para(chaves)
+
+    posicoes = chaves.to_numpy() - calendario.index[0]
+    origem = calendario[coluna]
+    if isinstance(origem.dtype, pd.CategoricalDtype):
+        valores = pd.Categorical.from_codes(origem.cat.codes.to_numpy()[posicoes], dtype=origem.dtype)
+    else:
+        valores = origem.to_numpy()[posicoes]
+    return pd.Series(valores, index=chaves.index, name=coluna)
+
+def anexar_calendario(df: pd.DataFrame, colunas: List[str]) -> pd.DataFrame:
+    """Adiciona ao próprio `df` as colunas do calendário correspondentes à sua 'ChaveData'."""
+    calendario = calendario_para(df["ChaveData"])
+    for coluna in colunas:
+        df[coluna] = rotulos_calendario(df["ChaveData"], coluna, calendario)
+    return df
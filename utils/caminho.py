@@ -1,7 +1,38 @@
+import glob
+import hashlib
 import pandas as pd
-from typing import Union, IO, Optional
+from typing import List, Union, IO, Optional, Tuple
 import os
 
+# O arquivo de vendas pode ser particionado: um diretório com um CSV por período (ex.: um
+# por mês, como exportado pelo ERP) ou um padrão glob ("dados/vendas_*.csv").
+CARACTERES_GLOB = "*?["
+
+def caminho_particionado(path: Optional[Union[str, IO]]) -> bool:
+    """Indica se o caminho é um diretório ou um padrão glob de partições."""
+    return isinstance(path, str) and (os.path.isdir(path) or any(c in path for c in CARACTERES_GLOB))
+
+def arquivos_particao(caminho: str) -> List[str]:
+    """Arquivos das partições (os CSVs do diretório ou os arquivos do padrão), em ordem de nome."""
+    padrao = os.path.join(caminho, "*.csv") if os.path.isdir(caminho) else caminho
+    return sorted(arquivo for arquivo in glob.glob(padrao) if os.path.isfile(arquivo))
+
 def caminho_valido(path: Optional[Union[str, IO]]) -> bool:
-    """Verifica se o caminho é uma string válida e aponta para um arquivo existente."""
-    return isinstance(path, str) and os.path.isfile(path)
\ No newline at end of file
+    """Verifica se o caminho é uma string válida e aponta para um arquivo existente (ou partições)."""
+    if caminho_particionado(path):
+        return bool(arquivos_particao(path))
+    return isinstance(path, str) and os.path.isfile(path)
+
+def assinatura_arquivo(caminho: str) -> Tuple[str, int, int]:
+    """
+    Identifica a versão de um arquivo pelo caminho absoluto, tamanho e data de modificação.
+
+    Para partições, o tamanho é o total e o último campo resume as assinaturas de todos os
+    arquivos: acrescentar, alterar ou remover uma partição muda a assinatura.
+    """
+    if caminho_particionado(caminho):
+        assinaturas = [assinatura_arquivo(arquivo) for arquivo in arquivos_particao(caminho)]
+        resumo = hashlib.sha1(repr(assinaturas).encode("utf-8")).hexdigest()
+        return os.path.abspath(caminho), sum(tamanho for _, tamanho, _ in assinaturas), int(resumo[:15], 16)
+    info = os.stat(caminho)
+    return os.path.abspath(caminho), info.st_size, info.st_mtime_ns
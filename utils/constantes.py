@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 CAMINHO_PADRAO_VENDAS = "dados/NotasFW_ProdInfo.csv"
 CAMINHO_PADRAO_CADASTRO = "dados/prodMercado.csv"
 
@@ -9,4 +12,83 @@ DIAS_SEMANA_PT = {
     "Friday": "sexta-feira",
     "Saturday": "sábado",
     "Sunday": "domingo"
-}
\ No newline at end of file
+}
+
+# Cache colunar (Parquet) gravado ao lado dos arquivos de origem.
+# Incrementar VERSAO_CACHE sempre que o formato do DataFrame carregado mudar.
+DIRETORIO_CACHE = ".cache"
+VERSAO_CACHE = 5
+
+# Leitura em blocos do arquivo de vendas: só as colunas usadas pelas páginas são lidas.
+# FORMATO_DATA_VENDAS aceita qualquer formato do pandas ("ISO8601", "%d/%m/%Y", ...); sem ele,
+# o formato é inferido da primeira data do arquivo, como faz `pd.to_datetime`.
+COLUNAS_VENDAS = ["Controle", "Cliente", "ProCod", "Quantidade", "TotalItem", "Data", "Bairro"]
+FORMATO_DATA_VENDAS = os.environ.get("DASHBOARD_FORMATO_DATA") or None
+TAMANHO_BLOCO_LEITURA_MB = int(os.environ.get("DASHBOARD_TAMANHO_BLOCO_MB", "64"))
+# Arquivo de vendas particionado (diretório ou padrão glob): partições sem cache colunar
+# atualizado são lidas em paralelo, em até PROCESSOS_LEITURA processos (0: um por núcleo).
+PROCESSOS_LEITURA = int(os.environ.get("DASHBOARD_PROCESSOS_LEITURA", "0")) or os.cpu_count() or 1
+
+# Arquivos enviados pela página "Carregar Arquivos": gravados em disco em blocos de
+# TAMANHO_BLOCO_LEITURA_MB e lidos de lá, com o cache colunar ao lado, como um caminho comum.
+DIRETORIO_ENVIOS = os.environ.get("DASHBOARD_DIRETORIO_ENVIOS", os.path.join("dados", "enviados"))
+# Envios mais recentes mantidos em disco (com o cache colunar); os demais são apagados,
+# a menos que algum dataset carregado ainda venha deles.
+ENVIOS_MANTIDOS = int(os.environ.get("DASHBOARD_ENVIOS_MANTIDOS", "4"))
+
+# Aquecimento: ao abrir uma sessão, os datasets principais começam a ser carregados em
+# segundo plano, em até THREADS_AQUECIMENTO threads (ver `utils/aquecimento.py`).
+AQUECIMENTO = os.environ.get("DASHBOARD_AQUECIMENTO", "1") == "1"
+THREADS_AQUECIMENTO = int(os.environ.get("DASHBOARD_THREADS_AQUECIMENTO", "4"))
+
+# Vigilância dos arquivos configurados: a cada INTERVALO_VIGILANCIA_S segundos (0 desliga),
+# um arquivo alterado tem as versões antigas dos seus datasets descartadas e é recarregado.
+INTERVALO_VIGILANCIA_S = float(os.environ.get("DASHBOARD_INTERVALO_VIGILANCIA_S", "5"))
+
+# Resultados guardados por função com `st.cache_data` nas páginas. As chaves já incluem a
+# versão dos dados: as de versões antigas nunca mais são pedidas e saem por ordem de uso.
+MAX_ENTRADAS_CACHE = int(os.environ.get("DASHBOARD_MAX_ENTRADAS_CACHE", "64"))
+
+# Registro de datasets compartilhado entre sessões.
+# Acima do orçamento, datasets sem uso recente por nenhuma sessão são descartados.
+MEMORIA_MAXIMA_MB = int(os.environ.get("DASHBOARD_MEMORIA_MAXIMA_MB", "4096"))
+JANELA_USO_RECENTE_S = int(os.environ.get("DASHBOARD_JANELA_USO_RECENTE_S", "600"))
+
+# Exibe na barra lateral quantos bytes de DataFrame foram copiados em cada execução da página.
+MOSTRAR_COPIAS = os.environ.get("DASHBOARD_MOSTRAR_COPIAS", "0") == "1"
+
+# Instrumentação opcional: tempo das etapas de carga e agregação, acertos e falhas de cache
+# e memória dos datasets da sessão, exibidos na barra lateral e gravados em linhas JSON.
+INSTRUMENTACAO = os.environ.get("DASHBOARD_INSTRUMENTACAO", "0") == "1"
+ARQUIVO_LOG_INSTRUMENTACAO = os.environ.get(
+    "DASHBOARD_LOG_INSTRUMENTACAO", os.path.join(DIRETORIO_CACHE, "instrumentacao.jsonl")
+)
+
+# Agregados pré-calculados em disco por `precomputar.py`.
+# Incrementar VERSAO_ARTEFATOS sempre que o formato de algum agregado mudar.
+VERSAO_ARTEFATOS = 2
+CLIENTE_NAO_IDENTIFICADO = 99999
+
+# Tabelas: "numerico" mantém as colunas de valores numéricas e as formata no navegador
+# (separadores do idioma do navegador); "texto" envia os valores já formatados em pt-BR.
+FORMATO_TABELAS = os.environ.get("DASHBOARD_FORMATO_TABELAS", "numerico")
+
+# Gráficos: no máximo MAX_LINHAS_GRAFICO linhas de dados são enviadas ao navegador por gráfico;
+# o excedente é somado em uma categoria "Outros" no servidor.
+MAX_LINHAS_GRAFICO = int(os.environ.get("DASHBOARD_MAX_LINHAS_GRAFICO", "1000"))
+
+# Exportações (CSV compactado ou Parquet) das páginas de dados, geradas só quando pedidas
+# e guardadas em disco por versão do dataset.
+DIRETORIO_EXPORTACOES = os.environ.get(
+    "DASHBOARD_DIRETORIO_EXPORTACOES", os.path.join(tempfile.gettempdir(), "dashboard_exportacoes")
+)
+LINHAS_BLOCO_EXPORTACAO = 200_000
+
+# Motor das agregações sobre os itens de venda: "pandas" carrega df_vendas inteiro em memória;
+# "duckdb" (dependência opcional) agrega direto do cache colunar ou do CSV, em paralelo e
+# com transbordo em disco, e só traz para a memória os resultados.
+MOTOR_CONSULTAS = os.environ.get("DASHBOARD_MOTOR_CONSULTAS", "pandas")
+MEMORIA_DUCKDB_MB = int(os.environ.get("DASHBOARD_MEMORIA_DUCKDB_MB", "0"))  # 0: padrão do DuckDB
+DIRETORIO_TEMP_DUCKDB = os.environ.get(
+    "DASHBOARD_DIRETORIO_TEMP_DUCKDB", os.path.join(tempfile.gettempdir(), "dashboard_duckdb")
+)
@@ -0,0 +1,292 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple, Union, IO
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils.cache_colunar import diretorio_cache, ler_manifesto, manifesto_atualizado, manifesto_no_periodo
+from utils.caminho import arquivos_particao, assinatura_arquivo, caminho_particionado, caminho_valido
+from utils.calendario import COLUNAS_ROTULOS, anexar_calendario
+from utils.constantes import (
+    CLIENTE_NAO_IDENTIFICADO,
+    COLUNAS_VENDAS,
+    DIRETORIO_TEMP_DUCKDB,
+    MEMORIA_DUCKDB_MB,
+    MOTOR_CONSULTAS,
+)
+from utils.esquema import aplicar_esquema_vendas
+from utils.filtros import FiltroGlobal, limites_periodo
+from utils.leitura import formato_data_arquivo, verificar_datas_invalidas
+
+try:
+    import duckdb
+except ImportError:  # Dependência opcional (duckdb>=1.5.0): só é usada com DASHBOARD_MOTOR_CONSULTAS=duckdb
+    duckdb = None
+
+# Motor DuckDB das agregações sobre os itens de venda (DASHBOARD_MOTOR_CONSULTAS=duckdb).
+# As consultas leem o cache colunar (se atualizado) ou o CSV em fluxo, com todos os núcleos
+# e transbordo em disco, e devolvem os mesmos DataFrames das funções de `utils.agregacao`
+# (colunas, tipos e ordem das linhas): df_vendas nunca é carregado inteiro em memória.
+# As análises das páginas continuam as mesmas, sobre esses resultados.
+
+if MOTOR_CONSULTAS == "duckdb" and duckdb is None:
+    print("⚠️ DASHBOARD_MOTOR_CONSULTAS=duckdb, mas o DuckDB não está instalado; usando pandas.")
+
+TIPOS_SQL_VENDAS = {
+    "Controle": "BIGINT",
+    "Cliente": "BIGINT",
+    "ProCod": "BIGINT",
+    "Quantidade": "DOUBLE",
+    "TotalItem": "DOUBLE",
+    "Bairro": "VARCHAR",
+}
+
+def usar_duckdb(caminho: Optional[Union[str, IO]]) -> bool:
+    """Indica se as agregações de `caminho` devem usar o DuckDB (motor configurado e arquivo ou partições em disco)."""
+    return MOTOR_CONSULTAS == "duckdb" and duckdb is not None and caminho_valido(caminho)
+
+def _literal(texto: str) -> str:
+    return "'" + texto.replace("'", "''") + "'"
+
+def _conectar() -> "duckdb.DuckDBPyConnection":
+    config = {
+        "temp_directory": DIRETORIO_TEMP_DUCKDB,
+        # As consultas ordenam o resultado: a ordem de leitura não precisa ser preservada
+        "preserve_insertion_order": False,
+    }
+    if MEMORIA_DUCKDB_MB:
+        config["memory_limit"] = f"{MEMORIA_DUCKDB_MB}MB"
+    return duckdb.connect(config=config)
+
+def _expressao_chave_data(formato: str) -> str:
+    """'Data' do CSV como 'ChaveData' (dias desde 1970-01-01), nula se a data for inválida."""
+    if formato in ("ISO8601", "mixed"):
+        data = "TRY_CAST(Data AS TIMESTAMP)"
+    else:
+        data = f"try_strptime(Data, {_literal(formato)})"
+    return f"CAST(date_diff('day', DATE '1970-01-01', CAST({data} AS DATE)) AS INTEGER)"
+
+def _lista(valores: List[str]) -> str:
+    return "[" + ", ".join(_literal(valor) for valor in valores) + "]"
+
+# Posição de cada item na leitura (arquivo e linha), a mesma ordem dos itens em df_vendas:
+# as notas usam a primeira linha com valor, como o pandas. Linhas por arquivo < 2^40.
+BITS_LINHA = 40
+
+def _linha(ordem: List[str], linha_no_arquivo: str) -> str:
+    """Expressão da coluna 'Linha' para um arquivo lido com `filename = true`."""
+    return f"(list_position({_lista(ordem)}, filename)::BIGINT << {BITS_LINHA}) + {linha_no_arquivo} AS Linha"
+
+# Versões de CSV (assinaturas e formato de data) cujas datas inválidas já foram contadas
+_DATAS_VERIFICADAS = set()
+
+def _verificar_datas(con: "duckdb.DuckDBPyConnection", csv: str, chave_data: str, arquivos: List[str], formato: str) -> None:
+    """
+    Aplica aos CSVs o limite de datas inválidas da leitura pelo pandas (ver
+    `leitura.verificar_datas_invalidas`), por arquivo, e informa as linhas descartadas.
+    Cada versão dos arquivos é contada uma vez.
+    """
+    chave = (tuple(assinatura_arquivo(arquivo) for arquivo in arquivos), formato)
+    if chave in _DATAS_VERIFICADAS:
+        return
+    contagens = con.sql(f"""
+        SELECT count(*), count(*) FILTER (WHERE {chave_data} IS NULL)
+        FROM {csv}
+        GROUP BY filename
+    """).fetchall()
+    for total, descartadas in contagens:
+        verificar_datas_invalidas(descartadas, total, formato)
+    descartadas = sum(descartadas for _, descartadas in contagens)
+    if descartadas:
+        print(f"⚠️ {descartadas} linhas de vendas descartadas por data inválida (formato '{formato}').")
+    _DATAS_VERIFICADAS.add(chave)
+
+def _fonte_csv(con: "duckdb.DuckDBPyConnection", arquivos: List[str], ordem: List[str]) -> Tuple[str, List[str]]:
+    csv = f"read_csv({_lista(arquivos)}, delim = ';', header = true, all_varchar = true, union_by_name = true, filename = true)"
+    colunas_arquivo = con.sql(f"SELECT * EXCLUDE (filename) FROM {csv} LIMIT 0").columns
+    if "Data" not in colunas_arquivo:
+        raise ValueError("Coluna 'Data' não encontrada no arquivo de vendas.")
+
+    # O CSV não informa o número da linha: vem da ordem de leitura, que precisa ser preservada
+    con.execute("SET preserve_insertion_order = true")
+    colunas = [c for c in COLUNAS_VENDAS if c in colunas_arquivo and c != "Data"]
+    # Valores que não convertem interrompem a consulta, como no parser do Arrow
+    selecao = [f"CAST({c} AS {TIPOS_SQL_VENDAS[c]}) AS {c}" for c in colunas]
+    # O formato das datas vem do primeiro arquivo, como na leitura pelo pandas
+    formato = formato_data_arquivo(arquivos[0])
+    chave_data = _expressao_chave_data(formato)
+    _verificar_datas(con, csv, chave_data, arquivos, formato)
+    selecao.append(f"{chave_data} AS ChaveData")
+    selecao.append(_linha(ordem, "row_number() OVER ()"))
+    return f"(SELECT {', '.join(selecao)} FROM {csv})", colunas + ["ChaveData"]
+
+def _fonte_itens(
+    con: "duckdb.DuckDBPyConnection",
+    caminho: str,
+    periodo: Optional[Tuple[int, int]] = None
+) -> Tuple[str, List[str]]:
+    """
+    Relação SQL com os itens de venda de `caminho` nas colunas de df_vendas ('ChaveData' no
+    lugar de 'Data') mais a posição 'Linha', e as colunas de df_vendas disponíveis. Cada
+    arquivo (ou partição) é lido do cache colunar, se estiver atualizado, ou do próprio CSV;
+    com `periodo`, partições em cache sem datas no período ficam de fora.
+    """
+    arquivos = arquivos_particao(caminho) if caminho_particionado(caminho) else [caminho]
+    parquets, csvs, ordem = [], [], []
+    for arquivo in arquivos:
+        manifesto = ler_manifesto(arquivo)
+        if not manifesto_atualizado(arquivo, manifesto):
+            csvs.append(arquivo)
+            ordem.append(arquivo)
+        elif manifesto_no_periodo(manifesto, periodo) or (arquivo == arquivos[-1] and not parquets and not csvs):
+            # A última partição entra mesmo fora do período para a consulta ter as colunas
+            pasta = diretorio_cache(arquivo)
+            partes = [os.path.join(pasta, parte) for parte in manifesto["partes"]]
+            parquets += partes
+            ordem += partes
+
+    fontes = []
+    if parquets:
+        leitura = f"read_parquet({_lista(parquets)}, union_by_name = true, filename = true, file_row_number = true)"
+        colunas = con.sql(f"SELECT * EXCLUDE (filename, file_row_number) FROM {leitura} LIMIT 0").columns
+        fonte = f"(SELECT * EXCLUDE (filename, file_row_number), {_linha(ordem, 'file_row_number')} FROM {leitura})"
+        fontes.append((fonte, colunas))
+    if csvs:
+        fontes.append(_fonte_csv(con, csvs, ordem))
+    if len(fontes) == 1:
+        return fontes[0]
+
+    colunas = list(dict.fromkeys(fontes[0][1] + fontes[1][1]))
+    return f"(SELECT * FROM {fontes[0][0]} UNION ALL BY NAME SELECT * FROM {fontes[1][0]})", colunas
+
+def _condicao(filtro: Optional[FiltroGlobal], colunas: List[str]) -> Tuple[str, list]:
+    """Cláusula WHERE do filtro global sobre os itens, com os parâmetros."""
+    condicoes, parametros = ["ChaveData IS NOT NULL"], []
+    if filtro is None:
+        return " AND ".join(condicoes), parametros
+
+    if filtro.tem_periodo:
+        condicoes.append("ChaveData BETWEEN ? AND ?")
+        parametros += [int(limite) for limite in limites_periodo(filtro)]
+    if filtro.bairros:
+        if "Bairro" not in colunas:
+            raise ValueError("Coluna 'Bairro' não encontrada no arquivo de vendas.")
+        condicoes.append(f"Bairro IN ({', '.join('?' * len(filtro.bairros))})")
+        parametros += list(filtro.bairros)
+    if filtro.sem_nao_identificado:
+        # Notas sem cliente continuam, como no filtro do pandas
+        condicoes.append("Cliente IS DISTINCT FROM ?")
+        parametros.append(CLIENTE_NAO_IDENTIFICADO)
+    if filtro.clientes:
+        condicoes.append(f"Cliente IN ({', '.join('?' * len(filtro.clientes))})")
+        parametros += list(filtro.clientes)
+    return " AND ".join(condicoes), parametros
+
+def _notas(colunas: List[str]) -> str:
+    """Uma linha por nota, como em `construir_df_vendas_agrupado`."""
+    # Cliente, data e bairro vêm da primeira linha da nota que tem valor, como no pandas
+    bairro = ", arg_min(Bairro, Linha) FILTER (WHERE Bairro IS NOT NULL) AS Bairro" if "Bairro" in colunas else ""
+    return f"""
+        SELECT Controle,
+               arg_min(Cliente, Linha) FILTER (WHERE Cliente IS NOT NULL) AS Cliente,
+               arg_min(ChaveData, Linha) AS ChaveData{bairro},
+               coalesce(sum(TotalItem), 0) AS TotalVenda,
+               count(ProCod) AS QuantidadeItens
+        FROM itens
+        WHERE Controle IS NOT NULL
+        GROUP BY Controle
+    """
+
+def _para_pandas(tabela: pa.Table) -> pd.DataFrame:
+    """
+    Resultado do DuckDB com os mesmos tipos compactos de df_vendas. Textos vêm do Arrow já
+    como dicionário (categóricas, com as categorias em ordem como no `astype` do pandas),
+    sem criar um objeto por linha.
+    """
+    for posicao, campo in enumerate(tabela.schema):
+        if pa.types.is_string(campo.type) or pa.types.is_large_string(campo.type):
+            tabela = tabela.set_column(posicao, campo.name, pc.dictionary_encode(tabela.column(posicao)))
+    df = aplicar_esquema_vendas(tabela.to_pandas())
+    for coluna in df.select_dtypes("category").columns:
+        df[coluna] = df[coluna].cat.reorder_categories(sorted(df[coluna].cat.categories))
+    return df
+
+def _consultar(
+    caminho: str,
+    montar_sql: Callable[[List[str]], str],
+    filtro: Optional[FiltroGlobal]
+) -> pd.DataFrame:
+    con = _conectar()
+    try:
+        periodo = limites_periodo(filtro) if filtro is not None and filtro.tem_periodo else None
+        fonte, colunas = _fonte_itens(con, caminho, periodo)
+        condicao, parametros = _condicao(filtro, colunas)
+        sql = f"WITH itens AS (SELECT * FROM {fonte} WHERE {condicao}) {montar_sql(colunas)}"
+        tabela = con.execute(sql, parametros).to_arrow_reader().read_all()
+    except duckdb.ConversionException as erro:
+        raise ValueError(f"Valor inválido no arquivo de vendas: {erro}") from erro
+    finally:
+        con.close()
+    return _para_pandas(tabela)
+
+def agrupar_notas(caminho: str, filtro: Optional[FiltroGlobal] = None) -> pd.DataFrame:
+    """df_vendas_agrupado (`construir_df_vendas_agrupado`) calculado pelo DuckDB."""
+    def sql(colunas: List[str]) -> str:
+        bairro = ", Bairro" if "Bairro" in colunas else ""
+        return f"""
+            , notas AS ({_notas(colunas)})
+            SELECT Cliente, TotalVenda, ChaveData, QuantidadeItens, Controle{bairro}
+            FROM notas
+            ORDER BY Controle
+        """
+    df = _consultar(caminho, sql, filtro)
+    return anexar_calendario(df, ["Data"] + COLUNAS_ROTULOS)
+
+def montar_grao_dia_cliente(caminho: str, filtro: Optional[FiltroGlobal] = None) -> pd.DataFrame:
+    """Grão dia × cliente (`agregacao.montar_grao_dia_cliente`) calculado pelo DuckDB."""
+    def sql(colunas: List[str]) -> str:
+        return f"""
+            , notas AS ({_notas(colunas)})
+            SELECT ChaveData, Cliente, sum(TotalVenda) AS TotalVenda, count(*) AS QuantVendas
+            FROM notas
+            GROUP BY ChaveData, Cliente
+            ORDER BY ChaveData, Cliente NULLS LAST
+        """
+    return _consultar(caminho, sql, filtro)
+
+def montar_cubo_produto_dia(caminho: str, filtro: Optional[FiltroGlobal] = None) -> pd.DataFrame:
+    """Cubo produto × dia (`agregacao.montar_cubo_produto_dia`) calculado pelo DuckDB."""
+    def sql(colunas: List[str]) -> str:
+        return """
+            SELECT ProCod, ChaveData,
+                   coalesce(sum(Quantidade), 0) AS Quantidade,
+                   coalesce(sum(TotalItem), 0) AS TotalItem
+            FROM itens
+            WHERE ProCod IS NOT NULL
+            GROUP BY ProCod, ChaveData
+            ORDER BY ProCod, ChaveData
+        """
+    return _consultar(caminho, sql, filtro)
+
+def montar_indice_produtos(caminho: str, filtro: Optional[FiltroGlobal] = None) -> pd.DataFrame:
+    """Índice de primeira/última venda por produto (`agregacao.montar_indice_produtos`) pelo DuckDB."""
+    def sql(colunas: List[str]) -> str:
+        return """
+            SELECT ProCod,
+                   min(ChaveData) AS PrimeiraVenda,
+                   max(ChaveData) AS UltimaVenda,
+                   coalesce(sum(Quantidade), 0) AS Quantidade,
+                   coalesce(sum(TotalItem), 0) AS TotalItem
+            FROM itens
+            WHERE ProCod IS NOT NULL
+            GROUP BY ProCod
+            ORDER BY ProCod
+        """
+    return _consultar(caminho, sql, filtro)
+
+# Datasets da sessão que o DuckDB monta direto dos itens, com ou sem o filtro global
+CONSULTAS: Dict[str, Callable[[str, Optional[FiltroGlobal]], pd.DataFrame]] = {
+    "df_vendas_agrupado": agrupar_notas,
+    "grao_dia_cliente": montar_grao_dia_cliente,
+    "cubo_produto_dia": montar_cubo_produto_dia,
+    "indice_produtos": montar_indice_produtos,
+}
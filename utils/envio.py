@@ -0,0 +1,86 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import IO, Callable, Iterable, Optional
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.cache_colunar import diretorio_cache
+from utils.constantes import DIRETORIO_ENVIOS, ENVIOS_MANTIDOS, TAMANHO_BLOCO_LEITURA_MB
+from utils.registro import obter_registro
+
+# Arquivos enviados pelo navegador. O conteúdo é copiado em blocos para DIRETORIO_ENVIOS e a
+# cópia em memória do Streamlit é liberada antes da leitura: o CSV é lido do disco em blocos,
+# convertido para o cache colunar e registrado como qualquer arquivo configurado por caminho.
+# Só os ENVIOS_MANTIDOS mais recentes ficam em disco (ver `limpar_envios`).
+
+def salvar_envio(
+    arquivo: IO[bytes],
+    nome: str,
+    progresso: Optional[Callable[[float], None]] = None
+) -> str:
+    """
+    Grava `arquivo` em DIRETORIO_ENVIOS, bloco a bloco, e retorna o caminho gravado.
+
+    O nome leva o início do hash do conteúdo: enviar de novo o mesmo arquivo reaproveita a
+    cópia já gravada e o seu cache colunar.
+    """
+    os.makedirs(DIRETORIO_ENVIOS, exist_ok=True)
+    base, extensao = os.path.splitext(os.path.basename(nome))
+    tamanho = getattr(arquivo, "size", None)
+    tamanho_bloco = TAMANHO_BLOCO_LEITURA_MB * 1024 ** 2
+    resumo = hashlib.sha1()
+    gravados = 0
+
+    arquivo.seek(0)
+    descritor, temporario = tempfile.mkstemp(dir=DIRETORIO_ENVIOS, suffix=".parcial")
+    try:
+        with os.fdopen(descritor, "wb") as destino:
+            while bloco := arquivo.read(tamanho_bloco):
+                destino.write(bloco)
+                resumo.update(bloco)
+                gravados += len(bloco)
+                if progresso is not None and tamanho:
+                    progresso(min(gravados / tamanho, 1.0))
+
+        caminho = os.path.join(DIRETORIO_ENVIOS, f"{base}_{resumo.hexdigest()[:12]}{extensao}")
+        if os.path.isfile(caminho):
+            # Mesmo conteúdo: a data de modificação (e o cache colunar) da cópia anterior é mantida
+            os.remove(temporario)
+        else:
+            os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    print(f"📤 Arquivo enviado '{nome}' gravado em '{caminho}' ({gravados / 1024 ** 2:.1f} MB).")
+    return caminho
+
+def liberar_envio(arquivo: IO[bytes]) -> None:
+    """Descarta os bytes de um arquivo do `st.file_uploader` já gravado em disco."""
+    arquivo.close()
+    ctx = get_script_run_ctx()
+    id_arquivo = getattr(arquivo, "file_id", None)
+    if ctx is not None and id_arquivo is not None:
+        ctx.uploaded_file_mgr.remove_file(ctx.session_id, id_arquivo)
+
+def limpar_envios(manter: Iterable[Optional[str]]) -> None:
+    """
+    Apaga os arquivos enviados (e o cache colunar deles), exceto os ENVIOS_MANTIDOS mais
+    recentes, os de `manter` e os de que algum dataset registrado ainda vem.
+    """
+    if not os.path.isdir(DIRETORIO_ENVIOS):
+        return
+
+    em_uso = obter_registro().arquivos_em_uso() | {os.path.abspath(c) for c in manter if c}
+    enviados = [
+        os.path.abspath(os.path.join(DIRETORIO_ENVIOS, nome)) for nome in os.listdir(DIRETORIO_ENVIOS)
+        if not nome.endswith(".parcial") and os.path.isfile(os.path.join(DIRETORIO_ENVIOS, nome))
+    ]
+    enviados.sort(key=os.path.getmtime, reverse=True)
+    for caminho in enviados[ENVIOS_MANTIDOS:]:
+        if caminho in em_uso:
+            continue
+        os.remove(caminho)
+        shutil.rmtree(diretorio_cache(caminho), ignore_errors=True)
+        print(f"🧹 Arquivo enviado '{caminho}' apagado.")
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from typing import Dict, List
+
+# Tipos declarados para as colunas de df_vendas. Códigos usam int32 (ou int64 se não couberem),
+# quantidades e valores usam float64 e colunas de baixa cardinalidade viram categóricas.
+ESQUEMA_VENDAS: Dict[str, str] = {
+    "Controle": "int32",
+    "Cliente": "int32",
+    "ProCod": "int32",
+    "Quantidade": "float64",
+    "TotalItem": "float64",
+    "Bairro": "category",
+    "ChaveData": "int32",
+}
+
+def _inteiro_compacto(serie: pd.Series, tipo: str) -> pd.Series:
+    """Converte para o tipo inteiro `tipo`, ampliando para int64 se necessário."""
+    valores = pd.to_numeric(serie, errors="coerce")
+    if valores.isna().any():
+        # Códigos ausentes mantêm a semântica de NaN do pandas
+        return valores.astype("float64")
+
+    if len(valores):
+        limites = np.iinfo(tipo)
+        if valores.min() < limites.min or valores.max() > limites.max:
+            print(f"⚠️ Coluna '{serie.name}' não cabe em {tipo}; usando int64.")
+            tipo = "int64"
+    return valores.astype(tipo)
+
+def aplicar_esquema_vendas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas de df_vendas para os tipos compactos declarados em ESQUEMA_VENDAS.
+
+    A conversão é feita coluna a coluna no próprio DataFrame, sem duplicá-lo inteiro.
+    """
+    for coluna, tipo in ESQUEMA_VENDAS.items():
+        if coluna not in df.columns:
+            continue
+        if tipo == "category":
+            df[coluna] = df[coluna].astype("category")
+        elif tipo.startswith("int"):
+            df[coluna] = _inteiro_compacto(df[coluna], tipo)
+        else:
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce").astype(tipo)
+
+    return df
+
+def concatenar_blocos(blocos: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena blocos já compactos em um único DataFrame, coluna a coluna.
+
+    As colunas de cada bloco são liberadas assim que copiadas, e as categóricas são unidas
+    (`union_categoricals`) para não voltarem a ser texto.
+    """
+    colunas = {}
+    for coluna in list(blocos[0].columns):
+        partes = [bloco.pop(coluna) for bloco in blocos]
+        if isinstance(partes[0].dtype, pd.CategoricalDtype):
+            colunas[coluna] = pd.Series(union_categoricals(partes), name=coluna)
+        else:
+            colunas[coluna] = pd.concat(partes, ignore_index=True)
+        del partes
+    return pd.DataFrame(colunas, copy=False)
+
+def medir_memoria(df: pd.DataFrame) -> pd.DataFrame:
+    """Retorna o tipo e a memória ocupada (em MB) de cada coluna."""
+    return pd.DataFrame({
+        "Tipo": df.dtypes.astype(str),
+        "MB": df.memory_usage(index=False, deep=True) / 1024 ** 2,
+    })
+
+def relatorio_memoria(antes: pd.DataFrame, depois: pd.DataFrame) -> pd.DataFrame:
+    """Compara duas medições de `medir_memoria`, coluna a coluna e no total."""
+    relatorio = antes.join(depois, lsuffix="Antes", rsuffix="Depois", how="outer")
+    relatorio.loc["Total"] = ["", relatorio["MBAntes"].sum(), "", relatorio["MBDepois"].sum()]
+    # Sem linhas (ex.: acréscimo vazio), não há redução a calcular
+    relatorio["Reducao"] = relatorio["MBAntes"] / relatorio["MBDepois"].where(relatorio["MBDepois"] > 0)
+    return relatorio.round(2)
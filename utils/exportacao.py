@@ -0,0 +1,89 @@
+import gzip
+import os
+import tempfile
+import time
+from typing import BinaryIO, Dict, Tuple, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.constantes import DIRETORIO_EXPORTACOES, JANELA_USO_RECENTE_S, LINHAS_BLOCO_EXPORTACAO
+
+# Formato de exportação: (extensão do arquivo, tipo MIME)
+FORMATOS_EXPORTACAO: Dict[str, Tuple[str, str]] = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+Destino = Union[str, BinaryIO]
+
+def _gravar_csv_gzip(df: pd.DataFrame, destino: Destino) -> None:
+    with gzip.open(destino, "wt", encoding="utf-8", compresslevel=5, newline="") as f:
+        for inicio in range(0, max(len(df), 1), LINHAS_BLOCO_EXPORTACAO):
+            df.iloc[inicio:inicio + LINHAS_BLOCO_EXPORTACAO].to_csv(f, index=False, header=inicio == 0)
+
+def _gravar_parquet(df: pd.DataFrame, destino: Destino) -> None:
+    esquema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    with pq.ParquetWriter(destino, esquema, compression="zstd") as escritor:
+        for inicio in range(0, len(df), LINHAS_BLOCO_EXPORTACAO):
+            bloco = df.iloc[inicio:inicio + LINHAS_BLOCO_EXPORTACAO]
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+
+def gravar_exportacao(df: pd.DataFrame, destino: Destino, formato: str) -> None:
+    """Grava `df` em `destino` (caminho ou arquivo binário aberto), em blocos de linhas."""
+    if formato == "Parquet":
+        _gravar_parquet(df, destino)
+    else:
+        _gravar_csv_gzip(df, destino)
+
+def caminho_exportacao(nome: str, versao: str, formato: str) -> str:
+    extensao, _ = FORMATOS_EXPORTACAO[formato]
+    return os.path.join(DIRETORIO_EXPORTACOES, f"{nome}_{versao}.{extensao}")
+
+def _remover_versoes_antigas(nome: str, destino: str, extensao: str) -> None:
+    """
+    Remove exportações de outras versões de `nome` sem uso há mais de JANELA_USO_RECENTE_S:
+    uma exportação recente pode estar sendo enviada a outra sessão.
+    """
+    limite = time.time() - JANELA_USO_RECENTE_S
+    for arquivo in os.listdir(DIRETORIO_EXPORTACOES):
+        caminho = os.path.join(DIRETORIO_EXPORTACOES, arquivo)
+        versao_arquivo, _, extensao_arquivo = arquivo[len(nome) + 1:].partition(".")
+        if (caminho == destino or not arquivo.startswith(f"{nome}_") or "_" in versao_arquivo
+                or extensao_arquivo != extensao):
+            continue
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+        except FileNotFoundError:
+            # Já removida por outra sessão
+            pass
+
+def exportar(df: pd.DataFrame, nome: str, versao: str, formato: str) -> str:
+    """
+    Grava `df` em disco no `formato` pedido e retorna o caminho do arquivo.
+
+    O arquivo é reaproveitado enquanto a versão do dataset for a mesma; exportações de
+    versões anteriores do mesmo dataset sem uso recente são removidas.
+    """
+    destino = caminho_exportacao(nome, versao, formato)
+    if os.path.exists(destino):
+        # Marca o uso: a exportação não é removida enquanto estiver sendo pedida
+        os.utime(destino)
+        return destino
+
+    os.makedirs(DIRETORIO_EXPORTACOES, exist_ok=True)
+    extensao, _ = FORMATOS_EXPORTACAO[formato]
+    _remover_versoes_antigas(nome, destino, extensao)
+
+    # Um temporário por chamada: duas sessões podem exportar a mesma versão ao mesmo tempo
+    descritor, temporario = tempfile.mkstemp(dir=DIRETORIO_EXPORTACOES, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "wb") as f:
+            gravar_exportacao(df, f, formato)
+        os.replace(temporario, destino)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    print(f"📤 '{nome}' exportado em {formato}: {os.path.getsize(destino) / 1024 ** 2:.1f} MB.")
+    return destino
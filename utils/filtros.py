@@ -0,0 +1,125 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from utils.calendario import chave_data
+from utils.constantes import CLIENTE_NAO_IDENTIFICADO
+
+# Filtro global da barra lateral (período, bairros e clientes), aplicado por índices:
+# o período é resolvido por busca binária nas datas ordenadas e bairros/clientes por
+# tabelas de consulta sobre os códigos, só nas linhas que sobraram do período.
+
+@dataclass(frozen=True)
+class FiltroGlobal:
+    inicio: Optional[date] = None
+    fim: Optional[date] = None
+    bairros: Tuple[str, ...] = ()
+    clientes: Tuple[int, ...] = ()
+    sem_nao_identificado: bool = False
+
+    @property
+    def ativo(self) -> bool:
+        return self.tem_periodo or bool(self.bairros) or bool(self.clientes) or self.sem_nao_identificado
+
+    @property
+    def tem_periodo(self) -> bool:
+        return self.inicio is not None or self.fim is not None
+
+    def colunas_necessarias(self) -> Set[str]:
+        colunas = set()
+        if self.tem_periodo:
+            colunas.add("ChaveData")
+        if self.bairros:
+            colunas.add("Bairro")
+        if self.clientes or self.sem_nao_identificado:
+            colunas.add("Cliente")
+        return colunas
+
+    def descricao(self) -> str:
+        """Identificador curto e estável do filtro, usado nas chaves de cache."""
+        if self == FiltroGlobal(sem_nao_identificado=True):
+            return "sem_cliente_99999"
+        return "filtro_" + hashlib.sha1(repr(self).encode("utf-8")).hexdigest()[:12]
+
+def montar_indice_datas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Posições das linhas de `df` em ordem de 'ChaveData' (ordenação estável) e as chaves
+    correspondentes, já ordenadas: um período vira um intervalo contíguo do índice.
+    """
+    chaves = df["ChaveData"].to_numpy()
+    if df["ChaveData"].is_monotonic_increasing:
+        posicoes = np.arange(len(df))
+    else:
+        posicoes = np.argsort(chaves, kind="stable")
+    return pd.DataFrame({"Posicao": posicoes, "ChaveData": chaves[posicoes]})
+
+def limites_periodo(filtro: FiltroGlobal) -> Tuple[int, int]:
+    """Chaves de data (inclusivas) do início e do fim do período; sem limite, os extremos do int32."""
+    info = np.iinfo(np.int32)
+    inicio = chave_data(pd.DatetimeIndex([filtro.inicio]))[0] if filtro.inicio else info.min
+    fim = chave_data(pd.DatetimeIndex([filtro.fim]))[0] if filtro.fim else info.max
+    return inicio, fim
+
+def _selecionados(codigos: np.ndarray, validos: np.ndarray, total_codigos: int) -> np.ndarray:
+    """Máscara das linhas cujo código (0..total_codigos-1, ou -1 se ausente) está em `validos`."""
+    tabela = np.zeros(total_codigos + 1, dtype=bool)
+    tabela[validos] = True
+    # Código -1 (ausente) cai na última posição da tabela, sempre False
+    return tabela[codigos]
+
+def _filtrar_categorias(valores: pd.Series, posicoes: np.ndarray, escolhidos: Iterable) -> np.ndarray:
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        categorias = valores.cat.categories
+        validos = categorias.get_indexer(list(escolhidos))
+        codigos = valores.cat.codes.to_numpy()[posicoes]
+        return posicoes[_selecionados(codigos, validos[validos >= 0], len(categorias))]
+    return posicoes[valores.iloc[posicoes].isin(list(escolhidos)).to_numpy()]
+
+def _filtrar_clientes(clientes: np.ndarray, posicoes: np.ndarray, filtro: FiltroGlobal) -> np.ndarray:
+    codigos = clientes[posicoes]
+    if filtro.sem_nao_identificado:
+        manter = codigos != CLIENTE_NAO_IDENTIFICADO
+        posicoes, codigos = posicoes[manter], codigos[manter]
+    if not filtro.clientes:
+        return posicoes
+    if codigos.dtype.kind == "f":
+        # Linhas sem cliente (NaN) nunca estão entre os clientes escolhidos
+        com_cliente = np.isfinite(codigos)
+        posicoes, codigos = posicoes[com_cliente], codigos[com_cliente].astype(np.int64)
+    if not len(codigos):
+        return posicoes
+
+    # Os códigos de cliente são inteiros: servem diretamente de posição na tabela de consulta
+    escolhidos = np.asarray(filtro.clientes, dtype=np.int64)
+    maior = int(max(codigos.max(), escolhidos.max()))
+    if codigos.min() < 0 or maior > 50_000_000:
+        return posicoes[np.isin(codigos, escolhidos)]
+    return posicoes[_selecionados(codigos, escolhidos[escolhidos >= 0], maior + 1)]
+
+def posicoes_filtradas(df: pd.DataFrame, filtro: FiltroGlobal, indice_datas: Optional[pd.DataFrame]) -> np.ndarray:
+    """
+    Posições (em ordem crescente) das linhas de `df` que passam pelo filtro.
+
+    Com período, `indice_datas` (`montar_indice_datas(df)`) é obrigatório e só as linhas do
+    período são examinadas pelos demais critérios.
+    """
+    if filtro.tem_periodo:
+        inicio, fim = limites_periodo(filtro)
+        chaves = indice_datas["ChaveData"].to_numpy()
+        esquerda = np.searchsorted(chaves, inicio, side="left")
+        direita = np.searchsorted(chaves, fim, side="right")
+        posicoes = np.sort(indice_datas["Posicao"].to_numpy()[esquerda:direita])
+    else:
+        posicoes = np.arange(len(df))
+
+    if filtro.bairros:
+        posicoes = _filtrar_categorias(df["Bairro"], posicoes, filtro.bairros)
+    if filtro.clientes or filtro.sem_nao_identificado:
+        posicoes = _filtrar_clientes(df["Cliente"].to_numpy(), posicoes, filtro)
+    return posicoes
+
+def aplicar_filtro(df: pd.DataFrame, filtro: FiltroGlobal, indice_datas: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Linhas de `df` que passam pelo filtro, na ordem original."""
+    return df.take(posicoes_filtradas(df, filtro, indice_datas)).reset_index(drop=True)
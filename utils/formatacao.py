@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Formatação pt-BR de Series inteiras (moeda, número e percentual) com o Arrow, sem laço
+# em Python; valores ausentes viram zero. O arredondamento é o mesmo de
+# `formatar_moeda_brasileira` (o do f-string, sobre o valor binário exato).
+
+def _texto(inteiros: np.ndarray) -> pa.Array:
+    return pc.cast(pa.array(inteiros), pa.string())
+
+def _juntar(*partes) -> pa.Array:
+    return pc.binary_join_element_wise(*partes, "")
+
+def _grupo(grupos: np.ndarray, ha_grupo_acima: np.ndarray) -> pa.Array:
+    """Grupo de três dígitos, completado com zeros à esquerda se não for o primeiro."""
+    texto = _texto(grupos)
+    return pc.if_else(pa.array(ha_grupo_acima), pc.utf8_lpad(texto, 3, "0"), texto)
+
+def _inteiro_com_milhares(inteiros: np.ndarray) -> pa.Array:
+    """Inteiros não negativos como texto, com "." separando os milhares."""
+    restante = inteiros // 1000
+    texto = _grupo(inteiros % 1000, restante > 0)
+    while restante.any():
+        acima = restante // 1000
+        completo = _juntar(_grupo(restante % 1000, acima > 0), ".", texto)
+        texto = pc.if_else(pa.array(restante > 0), completo, texto)
+        restante = acima
+    return texto
+
+def _formatar_decimal(valores: pd.Series, casas: int) -> pa.Array:
+    numeros = pd.to_numeric(valores, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    numeros = np.nan_to_num(numeros, nan=0.0, posinf=0.0, neginf=0.0)
+    escala = 10 ** casas
+    absolutos = np.abs(numeros)
+    partes_inteiras = np.floor(absolutos)
+    # A parte fracionária é exata; só ela é multiplicada, sem perder casas em valores grandes
+    escalados = (absolutos - partes_inteiras) * escala
+    unidades = np.rint(escalados).astype(np.int64)
+    # Perto do meio da última casa, a multiplicação pode levar o valor para o outro lado do
+    # meio: esses poucos são arredondados pelo `round` do Python, exato como o f-string
+    for i in np.flatnonzero(np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6):
+        unidades[i] = round((round(float(absolutos[i]), casas) - partes_inteiras[i]) * escala)
+    inteiros = partes_inteiras.astype(np.int64) + unidades // escala
+    fracao = unidades % escala
+
+    texto = _inteiro_com_milhares(inteiros)
+    if casas > 0:
+        texto = _juntar(texto, ",", pc.utf8_lpad(_texto(fracao), casas, "0"))
+    # Negativos que arredondam para zero aparecem sem sinal ("R$ 0,00")
+    return pc.if_else(pa.array((numeros < 0) & ((inteiros > 0) | (fracao > 0))), _juntar("-", texto), texto)
+
+def _serie(texto: pa.Array, valores: pd.Series) -> pd.Series:
+    # Texto mantido no Arrow (dtype "string[pyarrow]"): nenhum objeto str do Python é criado
+    return pd.Series(pd.arrays.ArrowStringArray(texto), index=valores.index)
+
+def formatar_moeda(valores: pd.Series) -> pd.Series:
+    """Ex.: 1234.5 -> "R$ 1.234,50"."""
+    return _serie(_juntar("R$ ", _formatar_decimal(valores, 2)), valores)
+
+def formatar_numero(valores: pd.Series, casas: int = 0) -> pd.Series:
+    """Ex.: 1234.5 -> "1.234" (casas=0, meio vai para o par) ou "1.234,5" (casas=1)."""
+    return _serie(_formatar_decimal(valores, casas), valores)
+
+def formatar_percentual(valores: pd.Series, casas: int = 1) -> pd.Series:
+    """Frações como percentual. Ex.: 0.1234 -> "12,3%"."""
+    return _serie(_juntar(_formatar_decimal(valores * 100, casas), "%"), valores)
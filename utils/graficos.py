@@ -0,0 +1,74 @@
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils.constantes import MAX_LINHAS_GRAFICO
+
+# Redução dos dados dos gráficos no servidor: o Altair embute todas as linhas no HTML da
+# página, então os gráficos recebem só as K maiores categorias e a soma do restante.
+
+ROTULO_OUTROS = "Outros"
+
+def ranking_categorias(df: pd.DataFrame, categoria: str, medida: str) -> pd.Series:
+    """Total de `medida` por categoria, em ordem decrescente (empates na ordem de aparição)."""
+    return (
+        df.groupby(categoria, observed=True, sort=False)[medida].sum()
+          .sort_values(ascending=False, kind="stable")
+    )
+
+def _agrupar_excedente(
+    valores: pd.Series, ranking: pd.Series, inicio: int, k: int, rotulo: str
+) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Rótulo de cada linha (a própria categoria nas posições [inicio, inicio + k) do ranking,
+    `rotulo` depois) e a posição da sua categoria no ranking.
+    """
+    posicao_categoria = pd.Series(np.arange(len(ranking)), index=ranking.index)
+    posicao = valores.map(posicao_categoria).to_numpy()
+    rotulos = valores.astype(object).to_numpy()
+    return pd.Series(np.where(posicao < inicio + k, rotulos, rotulo), index=valores.index), posicao
+
+def reduzir_para_grafico(
+    df: pd.DataFrame,
+    categoria: str,
+    medidas: List[str],
+    top_k: int,
+    serie: Optional[str] = None,
+    inicio: int = 0,
+    incluir_outros: bool = True,
+    max_linhas: int = MAX_LINHAS_GRAFICO
+) -> pd.DataFrame:
+    """
+    Dados de um gráfico com no máximo `max_linhas` linhas.
+
+    As categorias são ordenadas pelo total da primeira medida; as das posições
+    [inicio, inicio + top_k) aparecem individualmente e as seguintes são somadas em
+    "Outros" (omitidas sem `incluir_outros`). As anteriores a `inicio` ficam de fora:
+    avançar `inicio` detalha o conteúdo de "Outros".
+
+    Com `serie` (ex.: cor por período), cada série repete as categorias; se elas não
+    couberem no orçamento, as séries de menor total também são somadas em "Outros".
+    """
+    medida = medidas[0]
+    if df.empty:
+        return df[[categoria] + ([serie] if serie else []) + medidas].copy()
+
+    top_k = max(1, min(top_k, max_linhas - 1))
+    ranking = ranking_categorias(df, categoria, medida)
+    sobra = len(ranking) > inicio + top_k and incluir_outros
+    rotulos, posicao = _agrupar_excedente(df[categoria], ranking, inicio, top_k, ROTULO_OUTROS)
+
+    visiveis = posicao >= inicio
+    if not incluir_outros:
+        visiveis &= posicao < inicio + top_k
+    df = df.loc[visiveis, ([serie] if serie else []) + medidas].assign(**{categoria: rotulos[visiveis]})
+
+    chaves = [categoria]
+    if serie:
+        linhas_por_serie = min(top_k, len(ranking) - inicio) + sobra
+        max_series = max(1, max_linhas // max(1, linhas_por_serie))
+        ranking_series = ranking_categorias(df, serie, medida)
+        if len(ranking_series) > max_series:
+            df[serie], _ = _agrupar_excedente(df[serie], ranking_series, 0, max_series - 1, ROTULO_OUTROS)
+        chaves = [serie, categoria]
+
+    return df.groupby(chaves, observed=True, sort=False, as_index=False)[medidas].sum()
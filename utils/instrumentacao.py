@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.constantes import ARQUIVO_LOG_INSTRUMENTACAO, INSTRUMENTACAO, MAX_ENTRADAS_CACHE
+from utils.registro import HandleDataset, obter_registro
+
+# Instrumentação opcional (DASHBOARD_INSTRUMENTACAO=1). Cada evento (tempo de uma etapa,
+# acerto ou falha de um cache, memória de um dataset) é gravado como uma linha JSON em
+# ARQUIVO_LOG_INSTRUMENTACAO e, dentro de uma execução de página, mostrado no painel da
+# barra lateral. Desligada, as funções não fazem nada e os decoradores devolvem a função
+# original, sem custo nas páginas.
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_trava_log = threading.Lock()
+_pilha = threading.local()
+
+def _pagina(ctx) -> Optional[str]:
+    gerenciador = ctx.pages_manager
+    pagina = gerenciador.get_pages().get(gerenciador.current_page_script_hash) or {}
+    return pagina.get("page_name")
+
+def _gravar(evento: Dict[str, Any]) -> None:
+    try:
+        with _trava_log:
+            diretorio = os.path.dirname(ARQUIVO_LOG_INSTRUMENTACAO)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            with open(ARQUIVO_LOG_INSTRUMENTACAO, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o log de instrumentação: {e}")
+
+def _registrar(evento: Dict[str, Any]) -> None:
+    # Fora de uma execução de página (ex.: precomputar.py, threads de fundo) só o log é gravado
+    ctx = get_script_run_ctx(suppress_warning=True)
+    evento = {
+        "instante": datetime.now().isoformat(timespec="milliseconds"),
+        "sessao": ctx.session_id if ctx is not None else None,
+        "pagina": _pagina(ctx) if ctx is not None else None,
+        **evento,
+    }
+    _gravar(evento)
+
+    if ctx is not None and "eventos_instrumentacao" in st.session_state:
+        st.session_state["eventos_instrumentacao"].append(evento)
+        # O painel é redesenhado quando termina uma etapa de primeiro nível
+        if getattr(_pilha, "nivel", 0) == 0:
+            _exibir_painel()
+
+@contextmanager
+def medir(etapa: str, **detalhes: Any) -> Iterator[None]:
+    """Registra o tempo gasto no bloco como a etapa `etapa` (etapas internas ficam aninhadas)."""
+    if not INSTRUMENTACAO:
+        yield
+        return
+
+    nivel = getattr(_pilha, "nivel", 0)
+    _pilha.nivel = nivel + 1
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _pilha.nivel = nivel
+        _registrar({
+            "tipo": "etapa",
+            "nome": etapa,
+            "nivel": nivel,
+            "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2),
+            **detalhes,
+        })
+
+def medido(funcao: F) -> F:
+    """Decorador: registra o tempo de cada chamada de `funcao` como uma etapa."""
+    if not INSTRUMENTACAO:
+        return funcao
+
+    @wraps(funcao)
+    def medir_chamada(*args, **kwargs):
+        with medir(funcao.__name__):
+            return funcao(*args, **kwargs)
+    return medir_chamada
+
+def registrar_cache(camada: str, nome: str, acerto: bool) -> None:
+    """Registra um acerto ou uma falha do cache `camada` (registro, artefato, colunar...)."""
+    if INSTRUMENTACAO:
+        _registrar({"tipo": "cache", "camada": camada, "nome": nome, "acerto": acerto})
+
+def registrar_memoria(nome: str, tamanho_bytes: int) -> None:
+    """Registra a memória ocupada pelo dataset `nome` ao ser associado à sessão."""
+    if INSTRUMENTACAO:
+        _registrar({"tipo": "memoria", "nome": nome, "mb": round(tamanho_bytes / 1024 ** 2, 2)})
+
+def cache_medido(funcao: F) -> F:
+    """
+    `st.cache_data` que, com a instrumentação ligada, registra o tempo de cada chamada e se
+    o resultado veio do cache. Parâmetros com `_` continuam fora do hash, como no Streamlit.
+    """
+    if not INSTRUMENTACAO:
+        return st.cache_data(funcao, max_entries=MAX_ENTRADAS_CACHE)
+
+    execucao = threading.local()
+
+    @wraps(funcao)
+    def executar(*args, **kwargs):
+        # Só roda quando o Streamlit não encontra o resultado no cache
+        execucao.falha = True
+        return funcao(*args, **kwargs)
+
+    em_cache = st.cache_data(executar, max_entries=MAX_ENTRADAS_CACHE)
+
+    @wraps(funcao)
+    def chamar(*args, **kwargs):
+        execucao.falha = False
+        with medir(funcao.__name__):
+            resultado = em_cache(*args, **kwargs)
+        registrar_cache("st.cache_data", funcao.__name__, acerto=not execucao.falha)
+        return resultado
+
+    chamar.clear = em_cache.clear
+    return chamar
+
+def memoria_sessao() -> pd.DataFrame:
+    """Memória dos datasets referenciados pela sessão atual, segundo o registro do processo."""
+    versoes = {
+        valor.versao for valor in st.session_state.to_dict().values() if isinstance(valor, HandleDataset)
+    }
+    relatorio = obter_registro().relatorio()
+    return relatorio.loc[relatorio["Versão"].isin(versoes), ["Dataset", "Memória (MB)", "Linhas"]]
+
+def iniciar_execucao() -> None:
+    """Zera os eventos da execução atual da página e reserva o painel na barra lateral."""
+    if not INSTRUMENTACAO:
+        return
+    st.session_state["eventos_instrumentacao"] = []
+    st.session_state["painel_instrumentacao"] = st.sidebar.expander("⏱️ Desempenho").empty()
+    _exibir_painel()
+
+def _exibir_painel() -> None:
+    painel = st.session_state.get("painel_instrumentacao")
+    if painel is None:
+        return
+
+    eventos = pd.DataFrame(st.session_state.get("eventos_instrumentacao", []))
+    etapas = eventos[eventos["tipo"] == "etapa"] if not eventos.empty else eventos
+    caches = eventos[eventos["tipo"] == "cache"] if not eventos.empty else eventos
+    memoria = memoria_sessao()
+
+    with painel.container():
+        if not etapas.empty:
+            total = etapas.loc[etapas["nivel"] == 0, "duracao_ms"].sum()
+            st.caption(f"Etapas desta execução: {total:,.0f} ms")
+            st.dataframe(
+                pd.DataFrame({
+                    "Etapa": etapas["nivel"].astype(int).map(lambda nivel: "· " * nivel) + etapas["nome"],
+                    "ms": etapas["duracao_ms"],
+                }),
+                hide_index=True,
+            )
+        if not caches.empty:
+            resumo = caches["acerto"].astype(bool).groupby(caches["camada"]).agg(Acertos="sum", Consultas="count")
+            resumo["Falhas"] = resumo["Consultas"] - resumo["Acertos"]
+            st.caption("Caches")
+            st.dataframe(resumo[["Acertos", "Falhas"]])
+        st.caption(f"Datasets da sessão: {memoria['Memória (MB)'].sum():,.1f} MB")
+        if not memoria.empty:
+            st.dataframe(memoria, hide_index=True)
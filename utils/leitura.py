@@ -0,0 +1,466 @@
+import hashlib
+import io
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pandas.tseries.api import guess_datetime_format
+from typing import Union, IO, Callable, List, Optional, Tuple
+from utils.caminho import arquivos_particao, assinatura_arquivo, caminho_particionado
+from utils.cache_colunar import (
+    anexar_cache,
+    gravar_cache,
+    intervalo_datas,
+    ler_cache,
+    ler_manifesto,
+    ler_partes,
+    manifesto_atualizado,
+    manifesto_compativel,
+    manifesto_no_periodo,
+)
+from utils.calendario import chave_data
+from utils.constantes import COLUNAS_VENDAS, FORMATO_DATA_VENDAS, PROCESSOS_LEITURA, TAMANHO_BLOCO_LEITURA_MB
+from utils.esquema import aplicar_esquema_vendas, concatenar_blocos, medir_memoria, relatorio_memoria
+from utils.instrumentacao import registrar_cache
+
+# Tipos declarados para o parser; a compactação final fica em `aplicar_esquema_vendas`
+TIPOS_LEITURA_VENDAS = {
+    "Controle": pa.int64(),
+    "Cliente": pa.int64(),
+    "ProCod": pa.int64(),
+    "Quantidade": pa.float64(),
+    "TotalItem": pa.float64(),
+    "Data": pa.string(),
+    "Bairro": pa.dictionary(pa.int32(), pa.string()),
+}
+
+# Bytes comparados no início e antes da marca d'água para distinguir acréscimo de regravação
+BYTES_VERIFICACAO = 64 * 1024
+
+Progresso = Callable[[float], None]
+
+@dataclass
+class AtualizacaoVendas:
+    """Resultado de uma leitura de vendas: o DataFrame completo e as linhas acrescentadas."""
+    df: pd.DataFrame
+    # Linhas lidas do final do arquivo; None quando o DataFrame foi lido por inteiro
+    novas_linhas: Optional[pd.DataFrame] = None
+
+def _ler_com_cache(caminho: Union[str, IO], leitor: Callable[[Union[str, IO]], pd.DataFrame]) -> pd.DataFrame:
+    """Usa o cache colunar de `caminho` se estiver atualizado; caso contrário, lê e regrava o cache."""
+    if not isinstance(caminho, str):
+        return leitor(caminho)
+
+    df = ler_cache(caminho)
+    registrar_cache("colunar", os.path.basename(caminho), acerto=df is not None)
+    if df is not None:
+        print(f"⚡ Cache colunar utilizado para '{caminho}'.")
+        return df
+
+    assinatura = assinatura_arquivo(caminho)
+    df = leitor(caminho)
+    gravar_cache(caminho, df, assinatura)
+    return df
+
+def _ler_csv_cadastro(caminho: Union[str, IO]) -> pd.DataFrame:
+    return pd.read_csv(caminho, delimiter=";", decimal=".")
+
+class _TrechoArquivo(io.RawIOBase):
+    """Expõe ao parser apenas os bytes [inicio, fim) de um arquivo aberto."""
+
+    def __init__(self, arquivo: IO[bytes], inicio: int, fim: int):
+        self._arquivo = arquivo
+        self._arquivo.seek(inicio)
+        self._tamanho = fim - inicio
+        self._lidos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        quantidade = min(len(buffer), self._tamanho - self._lidos)
+        if quantidade <= 0:
+            return 0
+        dados = self._arquivo.read(quantidade)
+        buffer[:len(dados)] = dados
+        self._lidos += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._lidos
+
+def _colunas_cabecalho(arquivo: IO[bytes]) -> List[str]:
+    """Lê a linha de cabeçalho e volta o arquivo para a posição original."""
+    inicio = arquivo.tell()
+    cabecalho = arquivo.readline()
+    if isinstance(cabecalho, bytes):
+        cabecalho = cabecalho.decode("utf-8-sig", errors="replace")
+    arquivo.seek(inicio)
+    return [c.strip().strip('"') for c in cabecalho.rstrip("\r\n").split(";")]
+
+def _tamanho_restante(arquivo: IO[bytes]) -> Optional[int]:
+    try:
+        inicio = arquivo.tell()
+        fim = arquivo.seek(0, os.SEEK_END)
+        arquivo.seek(inicio)
+        return fim - inicio
+    except (OSError, AttributeError):
+        return None
+
+def _hash_trecho(arquivo: IO[bytes], inicio: int, fim: int) -> str:
+    arquivo.seek(inicio)
+    return hashlib.sha1(arquivo.read(fim - inicio)).hexdigest()
+
+def _continua_em_linha_nova(arquivo: IO[bytes], tamanho: int, marca: int) -> bool:
+    """
+    Indica se o que vem depois da marca d'água começa uma linha nova. Lido até o fim sem
+    quebra de linha final, o arquivo só pode ter recebido linhas novas se a próxima quebra
+    vier logo na marca; senão a última linha lida foi completada e tudo precisa ser relido.
+    """
+    if tamanho == marca or marca == 0:
+        return True
+    arquivo.seek(marca - 1)
+    anterior, seguinte = arquivo.read(2)
+    return anterior == ord("\n") or seguinte in b"\r\n"
+
+def _marca_dagua(arquivo: IO[bytes], fim: int) -> dict:
+    """Posição até onde o arquivo foi lido e os hashes usados para detectar regravações."""
+    return {
+        "marca_dagua": fim,
+        "hash_inicio": _hash_trecho(arquivo, 0, min(fim, BYTES_VERIFICACAO)),
+        "hash_fim": _hash_trecho(arquivo, max(0, fim - BYTES_VERIFICACAO), fim),
+    }
+
+def _apenas_acrescentado(caminho: str, arquivo: IO[bytes], tamanho: int, manifesto: Optional[dict]) -> bool:
+    """Indica se o arquivo só recebeu linhas novas depois da marca d'água do manifesto."""
+    if not manifesto_compativel(caminho, manifesto) or "marca_dagua" not in manifesto:
+        return False
+    if tamanho < manifesto["marca_dagua"]:
+        return False
+    if FORMATO_DATA_VENDAS is not None and manifesto["formato_data"] != FORMATO_DATA_VENDAS:
+        # O formato configurado mudou: as linhas já lidas precisam ser convertidas de novo
+        return False
+    if not _continua_em_linha_nova(arquivo, tamanho, manifesto["marca_dagua"]):
+        return False
+    return _marca_dagua(arquivo, manifesto["marca_dagua"]) == {
+        campo: manifesto[campo] for campo in ("marca_dagua", "hash_inicio", "hash_fim")
+    }
+
+# Acima desta fração de datas inválidas em um bloco, o formato configurado está errado
+MAXIMO_DATAS_INVALIDAS = 0.5
+
+def inferir_formato_data(arquivo: IO[bytes], colunas_arquivo: List[str], com_cabecalho: bool = True) -> str:
+    """
+    Formato de data usado na leitura: DASHBOARD_FORMATO_DATA, se configurado; senão o da
+    primeira data preenchida no início do arquivo, inferido como em `pd.to_datetime` sem
+    `format` ("mixed" se não for reconhecido). Volta o arquivo para a posição original.
+    """
+    if FORMATO_DATA_VENDAS is not None or "Data" not in colunas_arquivo:
+        return FORMATO_DATA_VENDAS or "mixed"
+
+    inicio = arquivo.tell()
+    trecho = arquivo.read(BYTES_VERIFICACAO)
+    arquivo.seek(inicio)
+    linhas = trecho.decode("utf-8-sig", errors="replace").splitlines()
+    if len(trecho) == BYTES_VERIFICACAO:
+        # A última linha do trecho pode estar cortada
+        linhas = linhas[:-1]
+
+    posicao = colunas_arquivo.index("Data")
+    for linha in linhas[1:] if com_cabecalho else linhas:
+        campos = linha.split(";")
+        valor = campos[posicao].strip().strip('"') if len(campos) > posicao else ""
+        if valor:
+            with warnings.catch_warnings():
+                # Aviso de dd/mm com dayfirst=False: o formato escolhido já é informado na leitura
+                warnings.simplefilter("ignore", UserWarning)
+                return guess_datetime_format(valor) or "mixed"
+    return "mixed"
+
+def verificar_datas_invalidas(descartadas: int, total: int, formato: str) -> None:
+    """Falha se mais de MAXIMO_DATAS_INVALIDAS das `total` datas lidas não estiverem no `formato`."""
+    if descartadas > MAXIMO_DATAS_INVALIDAS * total:
+        raise ValueError(
+            f"{descartadas} de {total} datas lidas não estão no formato "
+            f"'{formato}'. Ajuste DASHBOARD_FORMATO_DATA (ex.: %d/%m/%Y)."
+        )
+
+def formato_data_arquivo(caminho: str) -> str:
+    """Formato de data de um CSV de vendas em disco (ver `inferir_formato_data`)."""
+    with open(caminho, "rb") as arquivo:
+        return inferir_formato_data(arquivo, _colunas_cabecalho(arquivo))
+
+def _preparar_bloco(bloco: pd.DataFrame, formato: str) -> Tuple[pd.DataFrame, int]:
+    """
+    Converte a data em 'ChaveData' e compacta os tipos de um bloco lido. Retorna o bloco e
+    quantas linhas foram descartadas por data inválida.
+    """
+    datas = pd.to_datetime(bloco.pop("Data"), format=formato, errors="coerce")
+    validas = datas.notna().to_numpy()
+    descartadas = int(len(validas) - validas.sum())
+    verificar_datas_invalidas(descartadas, len(validas), formato)
+    if descartadas:
+        bloco = bloco[validas].reset_index(drop=True)
+        datas = datas[validas]
+
+    # As linhas guardam só a chave inteira da data; rótulos de período ficam no calendário
+    bloco["ChaveData"] = chave_data(datas)
+    return aplicar_esquema_vendas(bloco), descartadas
+
+def _vendas_vazio() -> pd.DataFrame:
+    """DataFrame de vendas sem linhas, com as colunas e os tipos de uma leitura do arquivo."""
+    colunas = [c for c in COLUNAS_VENDAS if c != "Data"] + ["ChaveData"]
+    return aplicar_esquema_vendas(pd.DataFrame({c: pd.Series([], dtype=object) for c in colunas}))
+
+def _ler_blocos_vendas(
+    arquivo: IO[bytes],
+    colunas_arquivo: List[str],
+    formato: str,
+    com_cabecalho: bool = True,
+    progresso: Optional[Progresso] = None
+) -> pd.DataFrame:
+    """
+    Lê o CSV de vendas em blocos com o parser do Arrow, com as datas no `formato` informado.
+
+    Só as colunas de COLUNAS_VENDAS são lidas, já com tipos declarados; cada bloco é compactado
+    antes do próximo ser lido, então o pico de memória fica próximo do tamanho do DataFrame final.
+    Sem cabeçalho (leitura do final do arquivo), os nomes vêm de `colunas_arquivo`.
+    """
+    colunas = [c for c in COLUNAS_VENDAS if c in colunas_arquivo]
+    if "Data" not in colunas:
+        raise ValueError("Coluna 'Data' não encontrada no arquivo de vendas.")
+
+    tamanho = _tamanho_restante(arquivo)
+    inicio = arquivo.tell()
+    leitor = pa_csv.open_csv(
+        arquivo,
+        read_options=pa_csv.ReadOptions(
+            block_size=TAMANHO_BLOCO_LEITURA_MB * 1024 ** 2,
+            column_names=None if com_cabecalho else colunas_arquivo,
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter=";"),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=colunas,
+            column_types={c: TIPOS_LEITURA_VENDAS[c] for c in colunas},
+            strings_can_be_null=True,
+        ),
+    )
+
+    blocos = []
+    descartadas = 0
+    memoria_antes = memoria_depois = None
+    for lote in leitor:
+        bloco = lote.to_pandas()
+        medida_antes = medir_memoria(bloco)
+        bloco, descartadas_bloco = _preparar_bloco(bloco, formato)
+        descartadas += descartadas_bloco
+        medida_depois = medir_memoria(bloco)
+        if memoria_antes is None:
+            memoria_antes, memoria_depois = medida_antes, medida_depois
+        else:
+            memoria_antes["MB"] += medida_antes["MB"]
+            memoria_depois["MB"] += medida_depois["MB"]
+        blocos.append(bloco)
+
+        if progresso is not None and tamanho:
+            progresso(min((arquivo.tell() - inicio) / tamanho, 1.0))
+
+    if not blocos:
+        raise ValueError("O arquivo de vendas não possui linhas.")
+
+    df = concatenar_blocos(blocos)
+    if descartadas:
+        print(f"⚠️ {descartadas} linhas de vendas descartadas por data inválida (formato '{formato}').")
+    total = relatorio_memoria(memoria_antes, memoria_depois).loc["Total"]
+    print(f"💾 {len(df)} linhas de vendas: {total['MBAntes']:.1f} MB lidos, {total['MBDepois']:.1f} MB após compactar.")
+
+    return df
+
+def _ler_acrescimo(
+    caminho: str,
+    arquivo: IO[bytes],
+    assinatura: Tuple[str, int, int],
+    manifesto: dict,
+    anterior: Optional[Tuple[Tuple[str, int, int], pd.DataFrame]],
+    progresso: Optional[Progresso]
+) -> Optional[AtualizacaoVendas]:
+    """
+    Lê só as linhas após a marca d'água e as junta ao DataFrame já conhecido. Como na leitura
+    completa, o fim do arquivo encerra a última linha; se ela for completada depois, a próxima
+    leitura não é tratada como acréscimo (ver `_continua_em_linha_nova`).
+    """
+    marca = manifesto["marca_dagua"]
+    fim = assinatura[1]
+
+    # Reaproveita o DataFrame em memória se ele corresponder à versão do manifesto
+    if anterior is not None and tuple(anterior[0][1:]) == (manifesto["tamanho"], manifesto["modificado_ns"]):
+        base = anterior[1]
+    else:
+        base = ler_partes(caminho, manifesto)
+        if base is None:
+            return None
+
+    extras = _marca_dagua(arquivo, fim)
+    if fim <= marca:
+        novas = base.iloc[:0]
+        df = base
+    else:
+        novas = _ler_blocos_vendas(
+            _TrechoArquivo(arquivo, marca, fim), manifesto["colunas_arquivo"], manifesto["formato_data"],
+            com_cabecalho=False, progresso=progresso
+        )
+        df = concatenar_blocos([base.copy(deep=False), novas.copy(deep=False)])
+    extras.update(intervalo_datas(df))
+
+    if not anexar_cache(caminho, novas, manifesto, assinatura, extras):
+        gravar_cache(caminho, df, assinatura, dict(
+            extras, colunas_arquivo=manifesto["colunas_arquivo"], formato_data=manifesto["formato_data"]
+        ))
+
+    print(f"➕ {len(novas)} linhas novas lidas do final de '{caminho}'.")
+    return AtualizacaoVendas(df=df, novas_linhas=novas)
+
+def atualizar_df_vendas(
+    caminho: str,
+    anterior: Optional[Tuple[Tuple[str, int, int], pd.DataFrame]] = None,
+    progresso: Optional[Progresso] = None
+) -> AtualizacaoVendas:
+    """
+    Lê o arquivo de vendas aproveitando o cache colunar e leituras anteriores.
+
+    - Cache atualizado: usa o Parquet sem reler o CSV.
+    - Arquivo só acrescido desde o cache: lê apenas as linhas após a marca d'água.
+    - Arquivo regravado (ou sem cache): lê tudo e regrava o cache.
+
+    `anterior` é um par (assinatura, DataFrame) já carregado em memória, usado como base
+    no acréscimo quando corresponder à versão do cache.
+    """
+    with open(caminho, "rb") as arquivo:
+        assinatura = assinatura_arquivo(caminho)
+        manifesto = ler_manifesto(caminho)
+
+        if manifesto_atualizado(caminho, manifesto):
+            df = ler_partes(caminho, manifesto)
+            if df is not None:
+                print(f"⚡ Cache colunar utilizado para '{caminho}'.")
+                registrar_cache("colunar", os.path.basename(caminho), acerto=True)
+                return AtualizacaoVendas(df=df)
+
+        registrar_cache("colunar", os.path.basename(caminho), acerto=False)
+
+        if _apenas_acrescentado(caminho, arquivo, assinatura[1], manifesto):
+            atualizacao = _ler_acrescimo(caminho, arquivo, assinatura, manifesto, anterior, progresso)
+            if atualizacao is not None:
+                return atualizacao
+
+        fim = assinatura[1]
+        arquivo.seek(0)
+        colunas_arquivo = _colunas_cabecalho(arquivo)
+        formato = inferir_formato_data(arquivo, colunas_arquivo)
+        df = _ler_blocos_vendas(_TrechoArquivo(arquivo, 0, fim), colunas_arquivo, formato, progresso=progresso)
+        extras = dict(
+            _marca_dagua(arquivo, fim), colunas_arquivo=colunas_arquivo, formato_data=formato, **intervalo_datas(df)
+        )
+        gravar_cache(caminho, df, assinatura, extras)
+
+    return AtualizacaoVendas(df=df)
+
+def _atualizar_cache_particao(caminho: str) -> None:
+    """Lê uma partição e atualiza o seu cache colunar (executada nos processos de leitura)."""
+    atualizar_df_vendas(caminho)
+
+def _atualizar_particoes(arquivos: List[str], progresso: Optional[Progresso]) -> None:
+    """
+    Atualiza o cache colunar das partições em `arquivos`, em paralelo em um pool de processos.
+    Os processos só gravam os caches; os DataFrames não voltam serializados ao processo principal.
+    """
+    if len(arquivos) == 1 or PROCESSOS_LEITURA == 1:
+        for posicao, arquivo in enumerate(arquivos):
+            atualizar_df_vendas(arquivo)
+            if progresso is not None:
+                progresso((posicao + 1) / len(arquivos))
+        return
+
+    # "spawn": o servidor do Streamlit tem várias threads, e um fork poderia herdar travas ocupadas
+    with ProcessPoolExecutor(min(PROCESSOS_LEITURA, len(arquivos)), mp_context=get_context("spawn")) as pool:
+        tarefas = [pool.submit(_atualizar_cache_particao, arquivo) for arquivo in arquivos]
+        for concluidas, tarefa in enumerate(as_completed(tarefas), start=1):
+            tarefa.result()
+            if progresso is not None:
+                progresso(concluidas / len(arquivos))
+
+def ler_particoes_vendas(
+    caminho: str,
+    progresso: Optional[Progresso] = None,
+    periodo: Optional[Tuple[int, int]] = None
+) -> pd.DataFrame:
+    """
+    Lê as partições de vendas de `caminho` (diretório ou padrão glob) em um único DataFrame,
+    no mesmo esquema de um arquivo só.
+
+    Cada partição tem o seu cache colunar: só as novas ou alteradas são lidas do CSV (em
+    paralelo). Com `periodo` (chaves de data inclusivas), as partições sem nenhuma data no
+    período não são lidas; as demais vêm inteiras e o período ainda precisa ser filtrado.
+    """
+    arquivos = arquivos_particao(caminho)
+    if not arquivos:
+        raise ValueError(f"Nenhum arquivo de vendas encontrado em '{caminho}'.")
+
+    desatualizadas = [arquivo for arquivo in arquivos if not manifesto_atualizado(arquivo, ler_manifesto(arquivo))]
+    for arquivo in arquivos:
+        registrar_cache("colunar", os.path.basename(arquivo), acerto=arquivo not in desatualizadas)
+    if desatualizadas:
+        print(f"📥 Lendo {len(desatualizadas)} de {len(arquivos)} partições de '{caminho}'.")
+        _atualizar_particoes(desatualizadas, progresso)
+
+    partes = []
+    for arquivo in arquivos:
+        manifesto = ler_manifesto(arquivo)
+        if not manifesto_atualizado(arquivo, manifesto):
+            # Cache não gravado (ex.: diretório sem permissão): lê a partição neste processo
+            df = atualizar_df_vendas(arquivo).df
+            if periodo is None or manifesto_no_periodo(intervalo_datas(df), periodo):
+                partes.append(df)
+            continue
+        if manifesto_no_periodo(manifesto, periodo):
+            df = ler_partes(arquivo, manifesto)
+            partes.append(df if df is not None else atualizar_df_vendas(arquivo).df)
+
+    if periodo is not None:
+        print(f"⚡ {len(partes)} de {len(arquivos)} partições com datas no período.")
+    if not partes:
+        # Nenhuma partição no período: um DataFrame vazio, sem ler nenhuma delas
+        return _vendas_vazio()
+    return partes[0] if len(partes) == 1 else concatenar_blocos(partes)
+
+def ler_df_cadastro(caminho: Union[str, IO]) -> pd.DataFrame:
+    """Lê o arquivo de cadastro de produtos."""
+    return _ler_com_cache(caminho, _ler_csv_cadastro)
+
+def ler_df_vendas(
+    caminho: Union[str, IO],
+    progresso: Optional[Progresso] = None,
+    periodo: Optional[Tuple[int, int]] = None
+) -> pd.DataFrame:
+    """
+    Lê o arquivo de vendas, substitui a coluna 'Data' pela chave inteira 'ChaveData'
+    (ver `utils.calendario`) e aplica o esquema de tipos compactos (ver `utils.esquema`).
+
+    `progresso`, se informado, recebe a fração já lida do arquivo (0 a 1). Para um arquivo
+    particionado, `periodo` descarta as partições fora dele (ver `ler_particoes_vendas`).
+    """
+    if caminho_particionado(caminho):
+        return ler_particoes_vendas(caminho, progresso, periodo)
+    if isinstance(caminho, str):
+        return atualizar_df_vendas(caminho, progresso=progresso).df
+    if isinstance(caminho.read(0), str):
+        # O parser do Arrow só lê bytes: um buffer de texto é recodificado em UTF-8
+        caminho = io.BytesIO(caminho.read().encode("utf-8"))
+    colunas_arquivo = _colunas_cabecalho(caminho)
+    return _ler_blocos_vendas(
+        caminho, colunas_arquivo, inferir_formato_data(caminho, colunas_arquivo), progresso=progresso
+    )
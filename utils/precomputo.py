@@ -0,0 +1,142 @@
+import time
+from typing import Dict, List, Tuple
+import pandas as pd
+import utils.analise as analise
+from utils.agregacao import (
+    NIVEIS_TEMPORAIS,
+    construir_df_vendas_agrupado,
+    montar_cubo_produto_dia,
+    montar_grao_dia_cliente,
+    montar_indice_produtos,
+)
+import utils.consultas_duckdb as consultas_duckdb
+from utils.artefatos import gravar_artefatos
+from utils.caminho import assinatura_arquivo
+from utils.calendario import COLUNA_POR_PERIODO
+from utils.constantes import CLIENTE_NAO_IDENTIFICADO
+from utils.leitura import ler_df_cadastro, ler_df_vendas
+
+# Nomes dos agregados gravados por `precomputar`. As páginas usam as mesmas funções para
+# encontrá-los e os calculam na hora (com as mesmas funções de utils.analise) se estiverem
+# desatualizados.
+
+VENDAS = ["vendas"]
+VENDAS_E_CADASTRO = ["vendas", "cadastro"]
+
+def filtro_clientes(ignorar_nao_identificado: bool) -> str:
+    return "sem_99999" if ignorar_nao_identificado else "todos"
+
+def artefato_temporal(nivel: str, ignorar_nao_identificado: bool) -> str:
+    return f"temporal_{filtro_clientes(ignorar_nao_identificado)}_{NIVEIS_TEMPORAIS[nivel][0]}"
+
+def artefato_giro(periodo: str) -> str:
+    return f"giro_{COLUNA_POR_PERIODO[periodo]}"
+
+def artefato_localizacao(campo: str) -> str:
+    return f"vendas_por_{campo}"
+
+def sem_nao_identificado(df: pd.DataFrame) -> pd.DataFrame:
+    """Linhas de clientes identificados (sem o cliente 99999)."""
+    return df[df["Cliente"] != CLIENTE_NAO_IDENTIFICADO]
+
+def montar_intermediarios(df_vendas: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Notas agrupadas, cubo produto × dia e índice de produtos, a partir dos itens de venda."""
+    return (
+        construir_df_vendas_agrupado(df_vendas),
+        montar_cubo_produto_dia(df_vendas),
+        montar_indice_produtos(df_vendas),
+    )
+
+def calcular_artefatos(
+    df_agrupado: pd.DataFrame,
+    cubo: pd.DataFrame,
+    indice_produtos: pd.DataFrame,
+    df_cadastro: pd.DataFrame
+) -> Dict[str, Tuple[pd.DataFrame, List[str]]]:
+    """
+    Calcula todos os agregados exibidos pelas páginas, com os arquivos de que cada um depende.
+
+    Os agregados que dependem do filtro do cliente 99999 são calculados nas duas variações.
+    """
+    artefatos: Dict[str, Tuple[pd.DataFrame, List[str]]] = {}
+
+    def registrar(nome: str, df: pd.DataFrame, dependencias: List[str]) -> None:
+        artefatos[nome] = (df, dependencias)
+
+    grao = montar_grao_dia_cliente(df_agrupado)
+    registrar("df_vendas_agrupado", df_agrupado, VENDAS)
+    registrar("grao_dia_cliente", grao, VENDAS)
+
+    for ignorar in (False, True):
+        filtro = filtro_clientes(ignorar)
+        grao_filtro = sem_nao_identificado(grao) if ignorar else grao
+        agrupado_filtro = sem_nao_identificado(df_agrupado) if ignorar else df_agrupado
+
+        registrar(f"indicadores_{filtro}", analise.resumo_indicadores(grao_filtro), VENDAS)
+        for nivel, tabela in zip(NIVEIS_TEMPORAIS, analise.agrupar_tabelas_temporais(grao_filtro)):
+            registrar(artefato_temporal(nivel, ignorar), tabela, VENDAS)
+
+        _, _, df_clientes = analise.calcular_metricas_clientes(agrupado_filtro)
+        registrar(f"clientes_{filtro}", df_clientes, VENDAS)
+        registrar(f"resumo_clientes_{filtro}", analise.resumo_clientes(agrupado_filtro, df_clientes), VENDAS)
+        registrar(f"coortes_{filtro}", analise.calcular_coortes(agrupado_filtro), VENDAS)
+        registrar(f"intervalos_{filtro}", analise.calcular_intervalos_compras(agrupado_filtro), VENDAS)
+        registrar(f"rfm_{filtro}", analise.calcular_rfm(agrupado_filtro), VENDAS)
+
+    registrar("produtos", analise.preparar_produtos(cubo, df_cadastro), VENDAS_E_CADASTRO)
+    for periodo in COLUNA_POR_PERIODO:
+        registrar(
+            artefato_giro(periodo),
+            analise.detalhar_giro_vendas(cubo, df_cadastro, periodo),
+            VENDAS_E_CADASTRO
+        )
+    registrar("indice_produtos", indice_produtos, VENDAS)
+    registrar(
+        "produtos_nao_vendidos",
+        analise.obter_produtos_nao_vendidos(indice_produtos, df_cadastro),
+        VENDAS_E_CADASTRO
+    )
+
+    registrar(
+        artefato_localizacao("Bairro"),
+        analise.calcular_vendas_por_localizacao(df_agrupado, "Bairro"),
+        VENDAS
+    )
+    registrar("resumo_vendas", analise.resumo_vendas(df_agrupado), VENDAS)
+
+    return artefatos
+
+def precomputar(caminho_vendas: str, caminho_cadastro: str) -> str:
+    """
+    Lê os arquivos configurados e grava todos os agregados das páginas em disco.
+
+    As assinaturas dos arquivos são tomadas antes da leitura: se um deles mudar durante o
+    pré-cálculo, os agregados já nascem desatualizados e as páginas os ignoram.
+    Com o motor DuckDB, os itens não são carregados: as notas, o cubo e o índice de produtos
+    vêm direto das consultas sobre o arquivo. Retorna o diretório dos agregados.
+    """
+    assinaturas = {
+        "vendas": assinatura_arquivo(caminho_vendas),
+        "cadastro": assinatura_arquivo(caminho_cadastro),
+    }
+
+    inicio = time.perf_counter()
+    if consultas_duckdb.usar_duckdb(caminho_vendas):
+        df_agrupado = consultas_duckdb.agrupar_notas(caminho_vendas)
+        cubo = consultas_duckdb.montar_cubo_produto_dia(caminho_vendas)
+        indice_produtos = consultas_duckdb.montar_indice_produtos(caminho_vendas)
+        df_cadastro = ler_df_cadastro(caminho_cadastro)
+        print(f"🦆 Notas, cubo e índice consultados no DuckDB em {time.perf_counter() - inicio:.1f} s.")
+    else:
+        df_vendas = ler_df_vendas(caminho_vendas)
+        df_cadastro = ler_df_cadastro(caminho_cadastro)
+        print(f"📥 Arquivos lidos em {time.perf_counter() - inicio:.1f} s ({len(df_vendas):,} itens).")
+        df_agrupado, cubo, indice_produtos = montar_intermediarios(df_vendas)
+        del df_vendas
+
+    inicio = time.perf_counter()
+    artefatos = calcular_artefatos(df_agrupado, cubo, indice_produtos, df_cadastro)
+    print(f"🧮 {len(artefatos)} agregados calculados em {time.perf_counter() - inicio:.1f} s.")
+
+    origens = {"vendas": caminho_vendas, "cadastro": caminho_cadastro}
+    return gravar_artefatos(origens, assinaturas, artefatos)
@@ -1,16 +1,34 @@
 import pandas as pd
-from typing import Union, IO, Optional
+from typing import Union, IO, Dict, Optional, Tuple, Callable
 import streamlit as st  
-from utils.constantes import DIAS_SEMANA_PT
+import utils.consultas_duckdb as consultas_duckdb
+from utils.agregacao import (
+    atualizar_df_vendas_agrupado,
+    construir_df_vendas_agrupado,
+    montar_cubo_produto_dia,
+    montar_grao_dia_cliente,
+    montar_indice_produtos,
+)
+from utils.analise import calcular_vendas_agrupadas, adicionar_nomes_produtos
+from utils.aquecimento import artefato_ou, construtor_agrupado, construtor_grao
+from utils.caminho import assinatura_arquivo, caminho_particionado, caminho_valido
+from utils.filtros import FiltroGlobal, aplicar_filtro, limites_periodo, montar_indice_datas
+from utils.instrumentacao import medido
+from utils.leitura import atualizar_df_vendas, ler_df_cadastro, ler_df_vendas
+from utils.sessao import DATASETS_SESSAO, ConsultaFiltrada, obter_df, origens_sessao, registrar_dataset
 
-def calcular_vendas_agrupadas(df_vendas: pd.DataFrame) -> pd.DataFrame:
-    if not {"ProCod", "Quantidade", "TotalItem"}.issubset(df_vendas.columns):
-        raise ValueError("Colunas necessárias não estão presentes no DataFrame.")
-    return df_vendas.groupby("ProCod")[["Quantidade", "TotalItem"]].sum().reset_index()
+def _identidade_origem(caminho: Union[str, IO]) -> Tuple:
+    """Identifica a versão da origem: assinatura do arquivo ou o próprio objeto enviado."""
+    if isinstance(caminho, str):
+        return assinatura_arquivo(caminho)
+    return ("io", id(caminho))
 
-def adicionar_nomes_produtos(df_vendidos: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.DataFrame:
-    return pd.merge(df_vendidos, df_cadastro, on="ProCod", how="left")
+def _progresso_leitura(espaco: "st.delta_generator.DeltaGenerator") -> Callable[[float], None]:
+    def progresso(fracao: float) -> None:
+        espaco.progress(fracao, text=f"📥 Lendo arquivo de vendas... {fracao:.0%}")
+    return progresso
 
+@medido
 def carregar_df_cadastro(caminho: Optional[Union[str, IO]] = None) -> None:
     """Carrega o arquivo de cadastro e retorna apenas as colunas de código e nome do produto."""
     
@@ -21,13 +39,21 @@ def carregar_df_cadastro(caminho: Optional[Union[str, IO]] = None) -> None:
         st.error("❌ Caminho para o arquivo de cadastro não foi definido.")
         st.stop()
     
-    df = pd.read_csv(caminho, delimiter=";", decimal=".")
-    st.session_state["df_cadastro"] = df
+    try:
+        chave = ("df_cadastro",) + _identidade_origem(caminho)
+    except OSError as e:
+        st.error(f"❌ Falha ao carregar o arquivo de cadastro: {e}")
+        st.stop()
 
+    registrar_dataset("df_cadastro", chave, lambda: ler_df_cadastro(caminho))
+
+@medido
 def carregar_df_vendas(caminho: Optional[Union[str, IO]] = None) -> None:
     """
     Carrega os dados de vendas a partir de um caminho, adiciona colunas temporais
-    e salva no session_state como 'df_vendas'.
+    e registra o resultado como 'df_vendas'. Leituras posteriores do mesmo arquivo
+    reaproveitam o cache colunar enquanto o CSV não for alterado, e todas as sessões
+    compartilham a mesma cópia em memória.
     """
     # Recupera o caminho padrão da sessão, se não for fornecido diretamente
     if caminho is None:
@@ -37,63 +63,234 @@ def carregar_df_vendas(caminho: Optional[Union[str, IO]] = None) -> None:
         st.error("❌ Caminho para o arquivo de vendas não foi definido.")
         st.stop()
 
+    # A barra só aparece se o arquivo precisar ser lido (sem cache em memória ou em disco)
+    espaco_progresso = st.empty()
+    progresso = _progresso_leitura(espaco_progresso)
+
     try:
-        df = pd.read_csv(caminho, delimiter=";", decimal=".", low_memory=False)
+        chave = ("df_vendas",) + _identidade_origem(caminho)
+        registrar_dataset("df_vendas", chave, lambda: ler_df_vendas(caminho, progresso))
     except Exception as e:
         st.error(f"❌ Falha ao carregar o arquivo de vendas: {e}")
         st.stop()
+    finally:
+        espaco_progresso.empty()
+
+def _vendas_sessao() -> pd.DataFrame:
+    """df_vendas da sessão (carregado se preciso), para os construtores dos agregados."""
+    carregar_df_vendas()
+    df = obter_df("df_vendas")
+    if df is None or "Controle" not in df.columns:
+        st.error("❌ DataFrame de vendas não disponível ou mal formatado.")
+        st.stop()
+    return df
 
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
-    df = df.dropna(subset=["Data"])  # Garante que todas as datas são válidas
+@medido
+def processa_df_venda_agrupado() -> None:
+    """
+    Registra as vendas agrupadas por controle como 'df_vendas_agrupado'.
 
-    # Criação de colunas temporais (vetorizadas)
-    df["Ano"] = df["Data"].dt.year
-    df["Semestre"] = df["Data"].dt.month.apply(lambda m: "S1" if m <= 6 else "S2")
-    df["Trimestre"] = df["Data"].dt.to_period("Q").astype(str)
-    df["MesPeriodo"] = df["Data"].dt.to_period("M").astype(str)
-    df["SemanaInicioDt"] = df["Data"].dt.to_period("W").astype(str)
-    df["Dia"] = df["Data"].dt.strftime("%Y-%m-%d")
-    df["DiaSemana"] = df["Data"].dt.day_name().map(DIAS_SEMANA_PT)
+    Se `precomputar.py` já gravou o agrupado para a versão atual do arquivo de vendas,
+    ele é lido do disco sem carregar o df_vendas; com o motor DuckDB, é agregado direto
+    do arquivo.
+    """
+    caminho = st.session_state.get("caminho_vendas")
 
-    st.session_state["df_vendas"] = df
+    if caminho_valido(caminho):
+        chave = ("df_vendas_agrupado",) + _identidade_origem(caminho)
+        registrar_dataset("df_vendas_agrupado", chave, construtor_agrupado(caminho, origens_sessao(), _vendas_sessao))
+        return
 
-def processa_df_venda_agrupado() -> None:
-    """Agrupa as vendas por controle, com colunas temporais derivadas."""
-    
-    if "df_vendas" not in st.session_state:
+    df = obter_df("df_vendas")
+    if df is None:
         carregar_df_vendas()
-        
-    df = st.session_state.get("df_vendas")
+        df = obter_df("df_vendas")
     
     if df is None or "Controle" not in df.columns:
         st.error("❌ DataFrame de vendas não disponível ou mal formatado.")
         return
 
-    df_vendas_agrupado = (
-        df.groupby("Controle", as_index=False)
-          .agg({
-              "Cliente": "first",
-              "TotalItem": "sum",
-              "Data": "first",
-              "ProCod": "count",
-              "Controle": "first",
-              "Ano": "first",
-              "Semestre": "first",
-              "Trimestre": "first",
-              "MesPeriodo": "first",
-              "SemanaInicioDt": "first",
-              "Dia": "first",
-              "DiaSemana": "first",
-              "Bairro": "first",
-          })
-          .rename(columns={
-              "TotalItem": "TotalVenda",
-              "ProCod": "QuantidadeItens"
-          })
-    )
-
-    df_vendas_agrupado["Ano"] = df_vendas_agrupado["Data"].dt.year
-    df_vendas_agrupado["MesPeriodo"] = df_vendas_agrupado["Data"].dt.to_period("M").astype(str)
-    df_vendas_agrupado["DiaSemana"] = df_vendas_agrupado["Data"].dt.day_name().map(DIAS_SEMANA_PT)
-
-    st.session_state["df_vendas_agrupado"] = df_vendas_agrupado
+    # A versão do agrupado acompanha a versão do df_vendas de origem
+    chave = ("df_vendas_agrupado",) + st.session_state["df_vendas"].chave[1:]
+    registrar_dataset("df_vendas_agrupado", chave, lambda: construir_df_vendas_agrupado(df))
+
+@medido
+def processa_grao_dia_cliente() -> None:
+    """Registra o grão dia × cliente dos indicadores temporais como 'grao_dia_cliente'."""
+
+    caminho = st.session_state.get("caminho_vendas")
+
+    def agrupado() -> pd.DataFrame:
+        processa_df_venda_agrupado()
+        return obter_df("df_vendas_agrupado")
+
+    if caminho_valido(caminho):
+        chave = ("grao_dia_cliente",) + _identidade_origem(caminho)
+        registrar_dataset("grao_dia_cliente", chave, construtor_grao(caminho, origens_sessao(), agrupado))
+        return
+
+    df = obter_df("df_vendas_agrupado")
+    if df is None:
+        processa_df_venda_agrupado()
+        df = obter_df("df_vendas_agrupado")
+
+    if df is None:
+        return
+
+    chave = ("grao_dia_cliente",) + st.session_state["df_vendas_agrupado"].chave[1:]
+    registrar_dataset("grao_dia_cliente", chave, lambda: montar_grao_dia_cliente(df))
+
+@medido
+def processa_cubo_produto_dia() -> None:
+    """Registra o cubo produto × dia (base do giro de vendas) como 'cubo_produto_dia'."""
+
+    caminho = st.session_state.get("caminho_vendas")
+    if consultas_duckdb.usar_duckdb(caminho):
+        chave = ("cubo_produto_dia",) + _identidade_origem(caminho)
+        registrar_dataset("cubo_produto_dia", chave, lambda: consultas_duckdb.montar_cubo_produto_dia(caminho))
+        return
+
+    df = obter_df("df_vendas")
+    if df is None:
+        carregar_df_vendas()
+        df = obter_df("df_vendas")
+
+    if df is None:
+        return
+
+    chave = ("cubo_produto_dia",) + st.session_state["df_vendas"].chave[1:]
+    registrar_dataset("cubo_produto_dia", chave, lambda: montar_cubo_produto_dia(df))
+
+@medido
+def processa_indice_produtos() -> None:
+    """Registra o índice de primeira/última venda por produto como 'indice_produtos'."""
+
+    caminho = st.session_state.get("caminho_vendas")
+
+    def construir() -> pd.DataFrame:
+        if consultas_duckdb.usar_duckdb(caminho):
+            return consultas_duckdb.montar_indice_produtos(caminho)
+        carregar_df_vendas()
+        return montar_indice_produtos(obter_df("df_vendas"))
+
+    if caminho_valido(caminho):
+        chave = ("indice_produtos",) + _identidade_origem(caminho)
+        registrar_dataset("indice_produtos", chave, artefato_ou("indice_produtos", construir, origens_sessao()))
+        return
+
+    df = obter_df("df_vendas")
+    if df is None:
+        carregar_df_vendas()
+        df = obter_df("df_vendas")
+
+    if df is None:
+        return
+
+    chave = ("indice_produtos",) + st.session_state["df_vendas"].chave[1:]
+    registrar_dataset("indice_produtos", chave, lambda: montar_indice_produtos(df))
+
+# Como `consultas_duckdb.CONSULTAS`, mas a partir dos itens de venda já filtrados
+MONTAGENS: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]] = {
+    "df_vendas_agrupado": construir_df_vendas_agrupado,
+    "grao_dia_cliente": lambda df: montar_grao_dia_cliente(construir_df_vendas_agrupado(df)),
+    "cubo_produto_dia": montar_cubo_produto_dia,
+    "indice_produtos": montar_indice_produtos,
+}
+
+def _vendas_do_periodo(caminho: str, filtro: FiltroGlobal) -> pd.DataFrame:
+    """Itens de venda filtrados, lidos só das partições com datas no período do filtro."""
+    df = ler_df_vendas(caminho, periodo=limites_periodo(filtro))
+    return aplicar_filtro(df, filtro, montar_indice_datas(df))
+
+def consulta_filtrada(nome: str) -> Optional[ConsultaFiltrada]:
+    """
+    Consulta que monta o dataset `nome` já com o filtro global, sem carregar df_vendas inteiro:
+    com o motor DuckDB, direto do arquivo de vendas; com vendas particionadas e um período no
+    filtro, só das partições do período. None quando o filtro deve ser aplicado em memória.
+    """
+    caminho = st.session_state.get("caminho_vendas")
+    if consultas_duckdb.usar_duckdb(caminho):
+        consulta = consultas_duckdb.CONSULTAS[nome]
+        return ConsultaFiltrada(_identidade_origem(caminho), lambda filtro: consulta(caminho, filtro))
+
+    filtro_global = st.session_state.get("filtro_global", FiltroGlobal())
+    if caminho_particionado(caminho) and filtro_global.tem_periodo and obter_df("df_vendas") is None:
+        montar = MONTAGENS[nome]
+        return ConsultaFiltrada(_identidade_origem(caminho), lambda filtro: montar(_vendas_do_periodo(caminho, filtro)))
+    return None
+
+@medido
+def atualizar_dados() -> bool:
+    """
+    Atualiza os dados de vendas da sessão após mudanças no arquivo configurado.
+
+    Se o arquivo só recebeu linhas novas, apenas o final é lido e o 'df_vendas_agrupado'
+    é atualizado somente para as notas afetadas; se foi regravado, tudo é refeito.
+    Retorna False se o arquivo não mudou desde a última carga.
+    """
+    caminho = st.session_state.get("caminho_vendas")
+    if consultas_duckdb.usar_duckdb(caminho):
+        # Sem df_vendas em memória: os agregados são refeitos do arquivo quando pedidos
+        handle = st.session_state.get("df_vendas_agrupado")
+        if handle is not None and handle.chave[1:] == _identidade_origem(caminho):
+            return False
+        for nome in DATASETS_SESSAO:
+            if nome != "df_cadastro":
+                st.session_state.pop(nome, None)
+        return True
+
+    if caminho_particionado(caminho):
+        # Cada partição tem o seu cache colunar: só as novas ou alteradas são lidas do CSV
+        handle = st.session_state.get("df_vendas")
+        if handle is not None and handle.chave[1:] == _identidade_origem(caminho):
+            return False
+        for nome in DATASETS_SESSAO:
+            if nome != "df_cadastro":
+                st.session_state.pop(nome, None)
+        carregar_df_vendas()
+        return True
+
+    handle = st.session_state.get("df_vendas")
+    df_anterior = obter_df("df_vendas")
+    if df_anterior is None or not isinstance(caminho, str):
+        carregar_df_vendas()
+        return True
+
+    chave = ("df_vendas",) + _identidade_origem(caminho)
+    if chave == handle.chave:
+        return False
+
+    espaco_progresso = st.empty()
+    atualizacoes = []
+
+    def construir() -> pd.DataFrame:
+        atualizacao = atualizar_df_vendas(
+            caminho,
+            anterior=(handle.chave[1:], df_anterior),
+            progresso=_progresso_leitura(espaco_progresso)
+        )
+        atualizacoes.append(atualizacao)
+        return atualizacao.df
+
+    try:
+        df_vendas = registrar_dataset("df_vendas", chave, construir)
+    finally:
+        espaco_progresso.empty()
+
+    agrupado_anterior = obter_df("df_vendas_agrupado")
+    st.session_state.pop("df_vendas_agrupado", None)
+    st.session_state.pop("grao_dia_cliente", None)
+    st.session_state.pop("cubo_produto_dia", None)
+    st.session_state.pop("indice_produtos", None)
+
+    # Sem as linhas novas (releitura completa ou dataset já atualizado por outra sessão),
+    # o agrupado é refeito por inteiro quando for pedido
+    if agrupado_anterior is not None and atualizacoes and atualizacoes[0].novas_linhas is not None:
+        novas_linhas = atualizacoes[0].novas_linhas
+        registrar_dataset(
+            "df_vendas_agrupado",
+            ("df_vendas_agrupado",) + chave[1:],
+            lambda: atualizar_df_vendas_agrupado(agrupado_anterior, df_vendas, novas_linhas)
+        )
+
+    return True
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Optional, Set, Tuple
+import pandas as pd
+from utils.constantes import MEMORIA_MAXIMA_MB, JANELA_USO_RECENTE_S
+
+ChaveDataset = Tuple[Hashable, ...]
+
+@dataclass
+class EntradaDataset:
+    """DataFrame registrado, com a versão e as estatísticas de uso."""
+    nome: str
+    chave: ChaveDataset
+    df: pd.DataFrame
+    versao: str
+    tamanho_bytes: int
+    criado_em: float
+    ultimo_acesso: float
+    acessos: int = 0
+    sessoes: Dict[str, float] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class HandleDataset:
+    """Referência leve guardada no session_state; o DataFrame fica no registro do processo."""
+    nome: str
+    chave: ChaveDataset
+    versao: str
+
+def _versao_da_chave(chave: ChaveDataset) -> str:
+    return hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()[:12]
+
+class RegistroDatasets:
+    """
+    Mantém uma única cópia de cada dataset por processo, compartilhada entre as sessões.
+
+    Cada dataset é identificado por uma chave com o nome e a versão dos arquivos de origem.
+    Quando a memória total ultrapassa o orçamento, os datasets sem uso recente são descartados,
+    do menos para o mais recentemente usado.
+    """
+
+    def __init__(self, orcamento_bytes: int, janela_uso_recente_s: float):
+        self.orcamento_bytes = orcamento_bytes
+        self.janela_uso_recente_s = janela_uso_recente_s
+        self._entradas: Dict[ChaveDataset, EntradaDataset] = {}
+        self._travas_construcao: Dict[ChaveDataset, threading.Lock] = {}
+        self._trava = threading.RLock()
+
+    def consultar(self, chave: ChaveDataset, sessao: Optional[str] = None) -> Optional[EntradaDataset]:
+        """Retorna a entrada registrada para `chave`, sem construí-la, e marca o acesso."""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._marcar_acesso(entrada, sessao)
+            return entrada
+
+    def contem(self, chave: ChaveDataset) -> bool:
+        """Indica se `chave` está registrada, sem marcar acesso."""
+        with self._trava:
+            return chave in self._entradas
+
+    def obter(
+        self,
+        chave: ChaveDataset,
+        construtor: Callable[[], pd.DataFrame],
+        sessao: Optional[str] = None
+    ) -> EntradaDataset:
+        """
+        Retorna o dataset de `chave`, construindo-o uma única vez se ainda não estiver registrado.
+
+        Sessões que pedem a mesma chave ao mesmo tempo aguardam a mesma construção.
+        """
+        entrada = self.consultar(chave, sessao)
+        if entrada is not None:
+            return entrada
+
+        with self._trava:
+            trava_construcao = self._travas_construcao.setdefault(chave, threading.Lock())
+
+        with trava_construcao:
+            entrada = self.consultar(chave, sessao)
+            if entrada is not None:
+                return entrada
+
+            df = construtor()
+            agora = time.time()
+            entrada = EntradaDataset(
+                nome=str(chave[0]),
+                chave=chave,
+                df=df,
+                versao=_versao_da_chave(chave),
+                tamanho_bytes=int(df.memory_usage(index=True, deep=True).sum()),
+                criado_em=agora,
+                ultimo_acesso=agora,
+            )
+            self._marcar_acesso(entrada, sessao)
+
+            with self._trava:
+                self._entradas[chave] = entrada
+                self._travas_construcao.pop(chave, None)
+                self._aplicar_orcamento(preservar=chave)
+
+            print(f"📦 Dataset '{entrada.nome}' registrado ({entrada.tamanho_bytes / 1024 ** 2:.1f} MB).")
+            return entrada
+
+    def remover(self, chave: ChaveDataset) -> None:
+        with self._trava:
+            self._entradas.pop(chave, None)
+
+    def descartar_origem(self, identidade: Tuple) -> int:
+        """
+        Descarta os datasets construídos a partir da versão `identidade` de um arquivo (a
+        assinatura aparece na chave) e, em cascata, os derivados deles (a chave traz a versão
+        de um dataset descartado). Retorna quantos foram descartados.
+        """
+        tamanho = len(identidade)
+
+        def da_origem(chave: ChaveDataset) -> bool:
+            return any(tuple(chave[i:i + tamanho]) == identidade for i in range(len(chave) - tamanho + 1))
+
+        with self._trava:
+            descartadas = {chave for chave in self._entradas if da_origem(chave)}
+            versoes = {self._entradas[chave].versao for chave in descartadas}
+            while True:
+                derivadas = {
+                    chave for chave in self._entradas
+                    if chave not in descartadas and any(parte in versoes for parte in chave[1:])
+                }
+                if not derivadas:
+                    break
+                descartadas |= derivadas
+                versoes |= {self._entradas[chave].versao for chave in derivadas}
+            for chave in descartadas:
+                entrada = self._entradas.pop(chave)
+                print(f"🧹 Dataset '{entrada.nome}' ({entrada.versao}) descartado: origem alterada.")
+        return len(descartadas)
+
+    def arquivos_em_uso(self) -> Set[str]:
+        """Caminhos absolutos dos arquivos de origem dos datasets registrados."""
+        with self._trava:
+            return {
+                parte for chave in self._entradas for parte in chave[1:]
+                if isinstance(parte, str) and os.path.isabs(parte)
+            }
+
+    def memoria_total(self) -> int:
+        with self._trava:
+            return sum(e.tamanho_bytes for e in self._entradas.values())
+
+    def relatorio(self) -> pd.DataFrame:
+        """Resumo de memória e uso de cada dataset registrado."""
+        agora = time.time()
+        with self._trava:
+            linhas = [
+                {
+                    "Dataset": e.nome,
+                    "Versão": e.versao,
+                    "Memória (MB)": round(e.tamanho_bytes / 1024 ** 2, 1),
+                    "Linhas": len(e.df),
+                    "Acessos": e.acessos,
+                    "Sessões recentes": sum(
+                        1 for t in e.sessoes.values() if agora - t <= self.janela_uso_recente_s
+                    ),
+                    "Último acesso (s)": round(agora - e.ultimo_acesso),
+                }
+                for e in self._entradas.values()
+            ]
+        return pd.DataFrame(linhas, columns=[
+            "Dataset", "Versão", "Memória (MB)", "Linhas",
+            "Acessos", "Sessões recentes", "Último acesso (s)"
+        ])
+
+    def _marcar_acesso(self, entrada: EntradaDataset, sessao: Optional[str]) -> None:
+        agora = time.time()
+        entrada.ultimo_acesso = agora
+        entrada.acessos += 1
+        if sessao is not None:
+            entrada.sessoes[sessao] = agora
+
+    def _aplicar_orcamento(self, preservar: ChaveDataset) -> None:
+        total = sum(e.tamanho_bytes for e in self._entradas.values())
+        if total <= self.orcamento_bytes:
+            return
+
+        limite_uso = time.time() - self.janela_uso_recente_s
+        candidatas = sorted(
+            (e for e in self._entradas.values()
+             if e.chave != preservar and e.ultimo_acesso < limite_uso),
+            key=lambda e: e.ultimo_acesso
+        )
+        for entrada in candidatas:
+            if total <= self.orcamento_bytes:
+                break
+            del self._entradas[entrada.chave]
+            total -= entrada.tamanho_bytes
+            print(f"🧹 Dataset '{entrada.nome}' ({entrada.versao}) descartado do registro.")
+
+        if total > self.orcamento_bytes:
+            print(f"⚠️ Registro acima do orçamento de memória ({total / 1024 ** 2:.0f} MB em uso).")
+
+_registro: Optional[RegistroDatasets] = None
+_trava_registro = threading.Lock()
+
+def obter_registro() -> RegistroDatasets:
+    """Retorna o registro de datasets do processo, criando-o na primeira chamada."""
+    global _registro
+    with _trava_registro:
+        if _registro is None:
+            _registro = RegistroDatasets(
+                orcamento_bytes=MEMORIA_MAXIMA_MB * 1024 ** 2,
+                janela_uso_recente_s=JANELA_USO_RECENTE_S,
+            )
+        return _registro
@@ -1,13 +1,34 @@
 import streamlit as st
+import time
 import traceback
 import pandas as pd
-from typing import Optional, Callable, Tuple
+from dataclasses import dataclass, replace
+from typing import Optional, Callable, Hashable, Tuple
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from utils.caminho import (
     caminho_valido,
+    assinatura_arquivo,
 )
 from utils.constantes import (
     CAMINHO_PADRAO_VENDAS,
     CAMINHO_PADRAO_CADASTRO,
+    MOSTRAR_COPIAS,
+)
+from utils.aquecimento import aquecer, carga_em_andamento
+from utils.artefatos import ler_artefato
+from utils.filtros import FiltroGlobal, aplicar_filtro, montar_indice_datas
+from utils.instrumentacao import iniciar_execucao, medir, registrar_cache, registrar_memoria
+from utils.registro import EntradaDataset, HandleDataset, ChaveDataset, obter_registro
+from utils.vigilancia import alteracoes, vigiar
+
+# Copy-on-write: fatias e visões dos datasets compartilhados não copiam dados até serem
+# alteradas, e uma alteração feita em uma visão nunca chega ao DataFrame de origem. No
+# pandas 3 é sempre assim e a opção foi descontinuada.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+DATASETS_SESSAO = (
+    "df_vendas", "df_cadastro", "df_vendas_agrupado", "grao_dia_cliente", "cubo_produto_dia", "indice_produtos"
 )
 
 def inicializar_app():
@@ -16,13 +37,121 @@ def inicializar_app():
         st.session_state["caminho_vendas"] = CAMINHO_PADRAO_VENDAS
         st.session_state["caminho_cadastro"] = CAMINHO_PADRAO_CADASTRO
         print("⚙️ App inicializado.")
+        # Os arquivos começam a ser lidos antes de a primeira página de análise pedi-los
+        aquecer(CAMINHO_PADRAO_VENDAS, CAMINHO_PADRAO_CADASTRO, id_sessao())
+        _vigiar_caminhos()
+    _avisar_alteracoes()
+
+    # Cada execução da página começa com o contador de cópias zerado
+    st.session_state["bytes_copiados"] = 0
+    st.session_state["painel_copias"] = st.sidebar.empty() if MOSTRAR_COPIAS else None
+    _exibir_copias()
+    iniciar_execucao()
+
+def _vigiar_caminhos() -> None:
+    """Vigia os arquivos da sessão e guarda quantas alterações deles a sessão já conhece."""
+    caminhos = (st.session_state["caminho_vendas"], st.session_state["caminho_cadastro"])
+    vigiar(*caminhos)
+    st.session_state["alteracoes_vistas"] = {caminho: alteracoes(caminho) for caminho in caminhos}
+
+def _avisar_alteracoes() -> None:
+    """Avisa quando um arquivo da sessão mudou no disco desde a última execução da página."""
+    vistas = st.session_state.get("alteracoes_vistas", {})
+    for caminho, contagem in vistas.items():
+        atual = alteracoes(caminho)
+        if atual > contagem:
+            # Os handles da versão anterior já não estão no registro: as páginas recarregam
+            st.toast(f"🔄 '{caminho}' foi alterado; os dados foram recarregados.")
+            vistas[caminho] = atual
+
+def _bytes_df(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+def _exibir_copias() -> None:
+    painel = st.session_state.get("painel_copias")
+    if painel is not None:
+        copiados = st.session_state.get("bytes_copiados", 0)
+        painel.caption(f"📋 Copiado nesta execução: {copiados / 1024 ** 2:.2f} MB")
+
+def contabilizar_copia(nome: str, df: pd.DataFrame) -> None:
+    """Soma ao contador da execução atual os bytes de uma cópia de dados feita a partir de `nome`."""
+    copiados = _bytes_df(df)
+    st.session_state["bytes_copiados"] = st.session_state.get("bytes_copiados", 0) + copiados
+    print(f"📋 Cópia de '{nome}': {copiados / 1024 ** 2:.2f} MB")
+    _exibir_copias()
+
+def id_sessao() -> Optional[str]:
+    """Identificador da sessão Streamlit atual (None fora de uma execução de página)."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+def _obter_entrada(chave: ChaveDataset, construtor: Callable[[], pd.DataFrame]) -> EntradaDataset:
+    """`obter_registro().obter` para a sessão atual, registrando o acerto ou a construção."""
+    nome = str(chave[0])
+    construido = False
+
+    def construir() -> pd.DataFrame:
+        nonlocal construido
+        construido = True
+        with medir(f"construir:{nome}"):
+            return construtor()
+
+    entrada = obter_registro().obter(chave, construir, sessao=id_sessao())
+    registrar_cache("registro", nome, acerto=not construido)
+    return entrada
+
+def _aguardar_aquecimento(chave: ChaveDataset) -> None:
+    """Mostra o andamento enquanto `chave` está sendo construída em segundo plano."""
+    carga = carga_em_andamento(chave)
+    if carga is None:
+        return
+
+    with medir(f"aguardar:{chave[0]}"):
+        espaco = st.empty()
+        while not carga.terminada and not obter_registro().contem(chave):
+            espaco.progress(carga.fracao, text=f"⏳ {carga.etapa}")
+            time.sleep(0.2)
+        espaco.empty()
+
+def registrar_dataset(
+    nome: str,
+    chave: ChaveDataset,
+    construtor: Callable[[], pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Obtém o dataset `chave` do registro do processo (construindo-o se necessário)
+    e guarda na sessão apenas um handle para ele, sob o nome `nome`. Se o aquecimento
+    já estiver construindo `chave`, espera por ele em vez de construir de novo.
+    """
+    _aguardar_aquecimento(chave)
+    entrada = _obter_entrada(chave, construtor)
+    st.session_state[nome] = HandleDataset(nome=nome, chave=chave, versao=entrada.versao)
+    registrar_memoria(nome, entrada.tamanho_bytes)
+    return entrada.df
+
+def obter_df(nome: str) -> Optional[pd.DataFrame]:
+    """
+    Retorna o DataFrame compartilhado referenciado pelo handle `nome` da sessão.
+
+    O DataFrame é compartilhado entre sessões e deve ser tratado como somente leitura.
+    Retorna None se a sessão não tiver o handle ou se o dataset foi descartado do registro.
+    """
+    handle = st.session_state.get(nome)
+    if not isinstance(handle, HandleDataset):
+        return None
+
+    entrada = obter_registro().consultar(handle.chave, sessao=id_sessao())
+    if entrada is None:
+        st.session_state.pop(nome, None)
+        return None
+    return entrada.df
 
 def carregar_arquivo_na_sessao(
     nome_chave: str,
     caminho: Optional[str],
     func_carregamento: Callable[[str], object]
 ) -> bool:
-    if nome_chave in st.session_state:
+    if obter_df(nome_chave) is not None:
         return True
 
     if not caminho_valido(caminho):
@@ -30,8 +159,8 @@ def carregar_arquivo_na_sessao(
         return False
 
     try:
-        df = func_carregamento(caminho)
-        st.session_state[nome_chave] = df
+        chave = (nome_chave,) + assinatura_arquivo(caminho)
+        registrar_dataset(nome_chave, chave, lambda: func_carregamento(caminho))
         return True
     except Exception as e:
         st.error(f"❌ Erro ao carregar '{nome_chave}': {e}")
@@ -50,7 +179,7 @@ def df_em_cache(nome_df: str) -> bool:
     - True se o DataFrame está carregado e não está vazio
     - False caso contrário
     """
-    df = st.session_state.get(nome_df)
+    df = obter_df(nome_df)
     return isinstance(df, pd.DataFrame) and not df.empty
 
 def salvar_caminhos(
@@ -65,25 +194,211 @@ def salvar_caminhos(
         st.error(f"❌ Arquivo de cadastro não encontrado: {caminho_cadastro}")
         return False
 
-    st.cache_data.clear()
-    st.cache_resource.clear()
-
+    # Os caches são por versão dos arquivos: nada é apagado para as outras sessões. Se um
+    # dos arquivos mudou no disco, só os datasets da versão anterior dele são descartados.
     st.session_state["caminho_vendas"] = caminho_vendas
     st.session_state["caminho_cadastro"] = caminho_cadastro
+    _vigiar_caminhos()
 
+    # Os handles da sessão apontam para os arquivos anteriores
+    for nome in DATASETS_SESSAO:
+        st.session_state.pop(nome, None)
+
+    aquecer(caminho_vendas, caminho_cadastro, id_sessao())
     return True
 
 def validar_df(nome: str, carregador: callable) -> pd.DataFrame:
     """
     Valida e retorna um DataFrame do session_state.
     Se não estiver carregado, tenta carregar com a função fornecida.
+
+    O retorno é uma visão sem cópia dos dados (copy-on-write): a página pode criar ou
+    substituir colunas livremente, sem alterar o dataset compartilhado.
     """
-    if nome not in st.session_state:
+    df: Optional[pd.DataFrame] = obter_df(nome)
+    if df is None:
         carregador()
+        df = obter_df(nome)
 
-    df: Optional[pd.DataFrame] = st.session_state.get(nome)
     if not isinstance(df, pd.DataFrame) or df.empty:
         st.error(f"❌ O DataFrame '{nome}' não está disponível ou está vazio.")
         st.stop()
 
-    return df.copy()
\ No newline at end of file
+    return df.copy(deep=False)
+
+@dataclass(frozen=True)
+class DadosVersionados:
+    """
+    DataFrame da sessão com o token da sua versão, derivado da identidade dos arquivos de
+    origem e dos filtros aplicados. Funções com `st.cache_data` recebem o token no lugar do
+    DataFrame (passado como parâmetro `_df`, que o Streamlit não calcula hash).
+    """
+    df: pd.DataFrame
+    versao: str
+
+def versao_df(nome: str) -> str:
+    """Token da versão do dataset `nome` carregado na sessão (ex.: por `validar_df`)."""
+    return st.session_state[nome].versao
+
+def dados_versionados(nome: str, carregador: Callable[[], None]) -> DadosVersionados:
+    """Dataset `nome` sem filtros (ex.: o cadastro), com o token da sua versão."""
+    df = validar_df(nome, carregador)
+    return DadosVersionados(df, versao_df(nome))
+
+def _entrada_visao(
+    nome: str,
+    descricao: Hashable,
+    funcao: Callable[[pd.DataFrame], pd.DataFrame]
+) -> EntradaDataset:
+    handle = st.session_state[nome]
+    df = obter_df(nome)
+
+    def construir() -> pd.DataFrame:
+        visao = funcao(df)
+        contabilizar_copia(f"{nome}[{descricao}]", visao)
+        return visao
+
+    chave = (f"{nome}[{descricao}]",) + handle.chave[1:]
+    return _obter_entrada(chave, construir)
+
+def visao_df(
+    nome: str,
+    descricao: Hashable,
+    funcao: Callable[[pd.DataFrame], pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Retorna `funcao` aplicada ao dataset `nome` (ex.: um filtro de linhas), calculada uma
+    única vez por versão do dataset e compartilhada pelo registro como os demais datasets.
+
+    `descricao` identifica a visão (ex.: "sem_cliente_99999"); o dataset `nome` deve estar
+    carregado na sessão (ex.: por `validar_df`).
+    """
+    return _entrada_visao(nome, descricao, funcao).df.copy(deep=False)
+
+def origens_sessao() -> dict:
+    """Arquivos de origem configurados na sessão, no formato usado pelos agregados em disco."""
+    return {
+        "vendas": st.session_state.get("caminho_vendas"),
+        "cadastro": st.session_state.get("caminho_cadastro"),
+    }
+
+def obter_agregado(nome: str, calcular: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Retorna o agregado `nome` gravado por `precomputar.py`, se estiver atualizado em relação
+    aos arquivos da sessão; caso contrário, retorna `calcular()`.
+
+    O agregado lido do disco fica no registro, compartilhado entre as sessões, até que
+    algum dos arquivos de origem mude.
+    """
+    with medir(f"agregado:{nome}"):
+        origens = origens_sessao()
+        # Os agregados em disco são calculados sem o filtro global
+        if filtro_sessao().ativo or not all(caminho_valido(caminho) for caminho in origens.values()):
+            return calcular()
+
+        chave = (f"artefato[{nome}]",) + assinatura_arquivo(origens["vendas"]) + assinatura_arquivo(origens["cadastro"])
+        registro = obter_registro()
+        entrada = registro.consultar(chave, sessao=id_sessao())
+        if entrada is None:
+            df = ler_artefato(origens, nome)
+            registrar_cache("artefato", nome, acerto=df is not None)
+            if df is None:
+                return calcular()
+            entrada = registro.obter(chave, lambda: df, sessao=id_sessao())
+        return entrada.df.copy(deep=False)
+
+def filtro_sessao(sem_nao_identificado: bool = False) -> FiltroGlobal:
+    """Filtro global da barra lateral, acrescido do filtro do cliente 99999 da página."""
+    filtro = st.session_state.get("filtro_global", FiltroGlobal())
+    return replace(filtro, sem_nao_identificado=sem_nao_identificado)
+
+def _filtrar(nome: str, df: pd.DataFrame, filtro: FiltroGlobal) -> pd.DataFrame:
+    indice = None
+    if filtro.tem_periodo:
+        # O índice de datas é montado uma vez por versão do dataset e vale para qualquer período
+        chave = (f"{nome}[indice_datas]",) + st.session_state[nome].chave[1:]
+        indice = _obter_entrada(chave, lambda: montar_indice_datas(df)).df
+    return aplicar_filtro(df, filtro, indice)
+
+Origem = Tuple[str, Callable[[], None], Callable[[pd.DataFrame], pd.DataFrame]]
+
+@dataclass(frozen=True)
+class ConsultaFiltrada:
+    """
+    Monta um dataset já com o filtro global direto dos arquivos de origem, sem carregar o
+    dataset completo (ex.: motor DuckDB, ou só as partições de vendas do período).
+    `identidade` é a versão dos arquivos, usada na chave do resultado no registro.
+    """
+    identidade: Tuple
+    consultar: Callable[[FiltroGlobal], pd.DataFrame]
+
+def obter_dados(
+    nome: str,
+    carregador: Callable[[], None],
+    sem_nao_identificado: bool = False,
+    origem: Optional[Origem] = None,
+    consulta: Optional[ConsultaFiltrada] = None
+) -> DadosVersionados:
+    """
+    Dataset `nome` com o filtro global (e, com `sem_nao_identificado`, sem o cliente 99999),
+    com o token da sua versão.
+
+    Cada combinação de filtro é calculada uma única vez por versão do dataset e guardada
+    no registro. Se `nome` não tiver as colunas exigidas pelo filtro (ex.: o cubo produto × dia
+    não tem bairro), `origem` = (nome, carregador, montar) indica o dataset a filtrar e a
+    função que monta `nome` a partir dele. Com `consulta`, o filtro é resolvido por ela e
+    `nome` não chega a ser carregado sem filtro.
+    """
+    filtro = filtro_sessao(sem_nao_identificado)
+    if filtro.ativo and consulta is not None:
+        chave = (f"{nome}[{filtro.descricao()}]",) + consulta.identidade
+        entrada = _obter_entrada(chave, lambda: consulta.consultar(filtro))
+        return DadosVersionados(entrada.df.copy(deep=False), entrada.versao)
+
+    df = validar_df(nome, carregador)
+    if not filtro.ativo:
+        return DadosVersionados(df, versao_df(nome))
+
+    if origem is not None and not filtro.colunas_necessarias() <= set(df.columns):
+        nome_origem, carregador_origem, montar = origem
+        validar_df(nome_origem, carregador_origem)
+        entrada = _entrada_visao(
+            nome_origem, f"{filtro.descricao()}>{nome}", lambda d: montar(_filtrar(nome_origem, d, filtro))
+        )
+    else:
+        entrada = _entrada_visao(nome, filtro.descricao(), lambda d: _filtrar(nome, d, filtro))
+    return DadosVersionados(entrada.df.copy(deep=False), entrada.versao)
+
+def dados_filtrados(
+    nome: str,
+    carregador: Callable[[], None],
+    sem_nao_identificado: bool = False,
+    origem: Optional[Origem] = None,
+    consulta: Optional[ConsultaFiltrada] = None
+) -> pd.DataFrame:
+    """Como `obter_dados`, só o DataFrame."""
+    return obter_dados(nome, carregador, sem_nao_identificado, origem, consulta).df
+
+def derivado_filtrado(
+    nome: str,
+    carregador: Callable[[], None],
+    descricao: str,
+    funcao: Callable[[pd.DataFrame], pd.DataFrame],
+    sem_nao_identificado: bool = False,
+    consulta: Optional[ConsultaFiltrada] = None
+) -> pd.DataFrame:
+    """
+    `funcao` aplicada ao dataset `nome` filtrado (`obter_dados`), calculada uma única vez
+    por versão do dataset filtrado e compartilhada pelo registro.
+    """
+    filtro = filtro_sessao(sem_nao_identificado)
+    base = obter_dados(nome, carregador, sem_nao_identificado, consulta=consulta)
+    if filtro.ativo:
+        descricao = f"{filtro.descricao()}>{descricao}"
+
+    def construir() -> pd.DataFrame:
+        derivado = funcao(base.df)
+        contabilizar_copia(f"{nome}[{descricao}]", derivado)
+        return derivado
+
+    return _obter_entrada((f"{nome}[{descricao}]", base.versao), construir).df.copy(deep=False)
@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+from utils.aquecimento import aquecer, atualizar_versao
+from utils.caminho import assinatura_arquivo, caminho_valido
+from utils.constantes import INTERVALO_VIGILANCIA_S
+from utils.registro import obter_registro
+
+# Vigilância dos arquivos configurados nas sessões. Uma thread compara periodicamente a
+# assinatura de cada arquivo (caminho, tamanho e data de modificação; para partições, de
+# todos os arquivos) com a última vista. Quando um arquivo muda, só os datasets da versão
+# antiga dele saem do registro (as vendas, depois de estendidas, se só foram acrescidas) e os
+# pares de arquivos que o usam são aquecidos de novo; as sessões com handles para a versão
+# antiga recarregam na próxima execução.
+
+Assinatura = Tuple[str, int, int]
+
+_assinaturas: Dict[str, Assinatura] = {}
+_pendentes: Dict[str, Assinatura] = {}
+_alteracoes: Dict[str, int] = {}
+_pares: Set[Tuple[str, str]] = set()
+_trava = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+def _assinatura(caminho: str) -> Optional[Assinatura]:
+    try:
+        return assinatura_arquivo(caminho) if caminho_valido(caminho) else None
+    except OSError:
+        # Arquivo sendo regravado ou removido: fica para a próxima verificação
+        return None
+
+def alteracoes(caminho: Optional[str]) -> int:
+    """Quantas vezes o arquivo `caminho` mudou desde que passou a ser vigiado."""
+    with _trava:
+        return _alteracoes.get(caminho, 0)
+
+def _invalidar(caminho: str, anterior: Assinatura, atual: Assinatura) -> None:
+    with _trava:
+        _assinaturas[caminho] = atual
+        _pendentes.pop(caminho, None)
+        _alteracoes[caminho] = _alteracoes.get(caminho, 0) + 1
+        pares = [par for par in _pares if caminho in par]
+
+    print(f"🔄 Arquivo alterado: '{caminho}'.")
+    cadastros = [caminho_cadastro for caminho_vendas, caminho_cadastro in pares if caminho_vendas == caminho]
+    if cadastros:
+        # A versão anterior das vendas só é descartada depois de estendida (arquivo só acrescido),
+        # uma vez para todos os pares, e o aquecimento de cada par só começa depois disso
+        atualizar_versao(caminho, cadastros, anterior)
+        return
+
+    obter_registro().descartar_origem(anterior)
+    for caminho_vendas, caminho_cadastro in pares:
+        aquecer(caminho_vendas, caminho_cadastro)
+
+def verificar(caminho: str, confirmar: bool = False) -> bool:
+    """
+    Compara a assinatura atual de `caminho` com a última vista e, se mudou, invalida a versão
+    anterior. Com `confirmar`, a mudança só vale quando a mesma assinatura é vista em duas
+    verificações seguidas (o arquivo parou de ser gravado). Retorna True se invalidou.
+    """
+    atual = _assinatura(caminho)
+    with _trava:
+        anterior = _assinaturas.setdefault(caminho, atual) if atual is not None else None
+        if anterior is None or anterior == atual:
+            _pendentes.pop(caminho, None)
+            return False
+        if confirmar and _pendentes.get(caminho) != atual:
+            _pendentes[caminho] = atual
+            return False
+
+    _invalidar(caminho, anterior, atual)
+    return True
+
+def _vigiar_continuamente() -> None:
+    while True:
+        time.sleep(INTERVALO_VIGILANCIA_S)
+        with _trava:
+            caminhos = list(_assinaturas)
+        for caminho in caminhos:
+            try:
+                verificar(caminho, confirmar=True)
+            except Exception as e:
+                print(f"⚠️ Falha ao verificar '{caminho}': {e}")
+
+def vigiar(caminho_vendas: Optional[str], caminho_cadastro: Optional[str]) -> None:
+    """
+    Passa a vigiar o par de arquivos de uma sessão e já invalida as versões antigas, se algum
+    deles mudou desde a última verificação. A thread de vigilância começa na primeira chamada.
+    """
+    global _thread
+    if not caminho_valido(caminho_vendas) or not caminho_valido(caminho_cadastro):
+        return
+
+    with _trava:
+        _pares.add((caminho_vendas, caminho_cadastro))
+    for caminho in (caminho_vendas, caminho_cadastro):
+        verificar(caminho)
+
+    with _trava:
+        if INTERVALO_VIGILANCIA_S > 0 and _thread is None:
+            _thread = threading.Thread(target=_vigiar_continuamente, name="vigilancia", daemon=True)
+            _thread.start()
+            print(f"👀 Vigilância de arquivos iniciada (a cada {INTERVALO_VIGILANCIA_S:g} s).")
@@ -1,10 +1,81 @@
+import io
+from typing import Optional, Sequence
 import streamlit as st
 import pandas as pd
+from utils.constantes import FORMATO_TABELAS
+from utils.exportacao import FORMATOS_EXPORTACAO, exportar, gravar_exportacao
+from utils.filtros import FiltroGlobal
+from utils.formatacao import formatar_moeda, formatar_numero, formatar_percentual
+from utils.processamento import processa_df_venda_agrupado
+from utils.registro import HandleDataset
+from utils.sessao import validar_df
 
 LINHAS_POR_PAGINA = 100
 
+def exibir_tabela(
+    df: pd.DataFrame,
+    moeda: Sequence[str] = (),
+    numero: Sequence[str] = (),
+    percentual: Sequence[str] = (),
+    **kwargs
+) -> None:
+    """
+    `st.dataframe` com colunas de moeda, número e percentual (frações) formatadas.
+
+    No formato "numerico" (padrão) as colunas continuam numéricas, são formatadas no
+    navegador e podem ser ordenadas; no formato "texto" são enviadas já formatadas em pt-BR.
+
+    O `NumberColumn` não tem formato de real: os formatos próprios ("R$ %.2f") passam pelo
+    sprintf do navegador, sem separador de milhar e com ponto decimal. Por isso as colunas de
+    moeda usam "localized" (separadores do idioma do navegador) e levam "(R$)" no rótulo.
+    """
+    kwargs.setdefault("width", "stretch")
+
+    if FORMATO_TABELAS == "texto":
+        df = df.assign(
+            **{coluna: formatar_moeda(df[coluna]) for coluna in moeda},
+            **{coluna: formatar_numero(df[coluna]) for coluna in numero},
+            **{coluna: formatar_percentual(df[coluna]) for coluna in percentual},
+        )
+        st.dataframe(df, **kwargs)
+        return
+
+    config = dict(kwargs.pop("column_config", None) or {})
+    for coluna in moeda:
+        rotulo = coluna if "R$" in coluna else f"{coluna} (R$)"
+        config.setdefault(coluna, st.column_config.NumberColumn(rotulo, format="localized", step=0.01))
+    for coluna in numero:
+        config.setdefault(coluna, st.column_config.NumberColumn(format="localized", step=1))
+    for coluna in percentual:
+        config.setdefault(coluna, st.column_config.NumberColumn(format="percent", step=0.001))
+    st.dataframe(df, column_config=config, **kwargs)
+
+def _versao_dataset(nome_df: str) -> Optional[str]:
+    handle = st.session_state.get(nome_df)
+    return handle.versao if isinstance(handle, HandleDataset) else None
+
+def _conteudo_exportacao(df: pd.DataFrame, nome_df: str, versao: Optional[str], formato: str) -> bytes:
+    """
+    Arquivo exportado; com versão, gravado uma única vez em disco e reaproveitado.
+
+    A geração é em blocos, mas o conteúdo volta inteiro: o Streamlit guarda os downloads em
+    memória (mesmo recebendo um arquivo aberto) e não serve arquivos direto do disco.
+    """
+    if versao is None:
+        buffer = io.BytesIO()
+        gravar_exportacao(df, buffer, formato)
+        return buffer.getvalue()
+
+    with open(exportar(df, nome_df, versao, formato), "rb") as f:
+        return f.read()
+
 def mostrar_paginado(df: pd.DataFrame, nome_df: str, linhas_por_pagina: int = LINHAS_POR_PAGINA):
-    """Exibe DataFrame com paginação e botão de download."""
+    """
+    Exibe DataFrame com paginação e botão de download.
+
+    O arquivo de download só é gerado quando o botão é clicado e, para datasets da
+    sessão, fica em disco enquanto a versão do dataset não mudar.
+    """
     if df is None or df.empty:
         st.info(f"O DataFrame '{nome_df}' está vazio ou não foi carregado.")
         return
@@ -23,14 +94,78 @@ def mostrar_paginado(df: pd.DataFrame, nome_df: str, linhas_por_pagina: int = LI
 
     inicio = (pagina - 1) * linhas_por_pagina
     fim = inicio + linhas_por_pagina
-    st.dataframe(df.iloc[inicio:fim], use_container_width=True)
+    st.dataframe(df.iloc[inicio:fim], width="stretch")
     st.caption(f"Exibindo linhas {inicio + 1} a {min(fim, total_linhas)} de {total_linhas}.")
 
-    csv = df.to_csv(index=False).encode("utf-8")
+    formato = st.radio(
+        "Formato do download",
+        list(FORMATOS_EXPORTACAO),
+        horizontal=True,
+        key=f"formato_{nome_df}"
+    )
+    extensao, mime = FORMATOS_EXPORTACAO[formato]
+    versao = _versao_dataset(nome_df)
     st.download_button(
-        label=f"📥 Baixar CSV completo ({nome_df})",
-        data=csv,
-        file_name=f"{nome_df}.csv",
-        mime="text/csv",
+        label=f"📥 Baixar {formato} completo ({nome_df})",
+        data=lambda: _conteudo_exportacao(df, nome_df, versao, formato),
+        file_name=f"{nome_df}.{extensao}",
+        mime=mime,
+        on_click="ignore",
         key=f"download_{nome_df}"
     )
+
+def _ler_clientes(texto: str) -> tuple:
+    codigos = [parte.strip() for parte in texto.replace(";", ",").split(",") if parte.strip()]
+    invalidos = [c for c in codigos if not c.lstrip("-").isdigit()]
+    if invalidos:
+        st.warning(f"⚠️ Códigos de cliente ignorados: {', '.join(invalidos)}")
+    return tuple(sorted({int(c) for c in codigos if c not in invalidos}))
+
+def exibir_filtro_global() -> FiltroGlobal:
+    """
+    Filtro global (período, bairros e clientes) na barra lateral.
+
+    O filtro fica na sessão e vale para todas as páginas de análise; as opções só são
+    carregadas (das vendas por nota) enquanto o filtro estiver ligado.
+    """
+    filtro: FiltroGlobal = st.session_state.get("filtro_global", FiltroGlobal())
+    ligado = st.session_state.get("filtro_ligado", False)
+
+    with st.sidebar.expander("🔎 Filtro global", expanded=ligado):
+        # Os valores vêm do estado da sessão: os widgets não guardam estado entre páginas
+        ligado = st.toggle("Filtrar os dados", value=ligado)
+        st.session_state["filtro_ligado"] = ligado
+        if not ligado:
+            st.session_state["filtro_global"] = FiltroGlobal()
+            return st.session_state["filtro_global"]
+
+        df = validar_df("df_vendas_agrupado", processa_df_venda_agrupado)
+        primeira, ultima = (pd.to_datetime(df["ChaveData"].agg(f), unit="D").date() for f in ("min", "max"))
+        inicio = max(filtro.inicio or primeira, primeira)
+        fim = min(filtro.fim or ultima, ultima)
+        periodo = st.date_input("Período", value=(inicio, fim), min_value=primeira, max_value=ultima)
+        if len(periodo) == 2:
+            inicio, fim = periodo
+
+        bairros = ()
+        if "Bairro" in df.columns:
+            opcoes = sorted(df["Bairro"].cat.categories) if isinstance(df["Bairro"].dtype, pd.CategoricalDtype) \
+                else sorted(df["Bairro"].dropna().unique())
+            bairros = tuple(st.multiselect(
+                "Bairros", options=opcoes, default=[b for b in filtro.bairros if b in opcoes]
+            ))
+
+        clientes = _ler_clientes(st.text_input(
+            "Clientes (códigos separados por vírgula)", value=", ".join(map(str, filtro.clientes))
+        ))
+
+        filtro = FiltroGlobal(
+            inicio=inicio if inicio > primeira else None,
+            fim=fim if fim < ultima else None,
+            bairros=bairros,
+            clientes=clientes
+        )
+        st.session_state["filtro_global"] = filtro
+        if filtro.ativo:
+            st.caption("Os agregados pré-calculados são ignorados enquanto o filtro estiver ativo.")
+    return filtro